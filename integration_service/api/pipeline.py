@@ -1,72 +1,217 @@
 """Pipeline API endpoints."""  
+import asyncio
+import json
 import os  
-import tempfile  
-from typing import List  
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException  
-from fastapi.responses import FileResponse
+import time
+from typing import Any, Dict, List, Optional  
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query, Request  
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from .responses import content_disposition, etag_matches, ranged_file_response
+from ..services.admission import AdmissionRejected
+from ..services.deadlines import DeadlineExceeded, deadline_from_timeout
+from ..services.mining_budget import BudgetTooSmall, TUNED_PARAMETERS
+from ..services.graph_versions import VersionConflict
+from ..services.job_scheduler import EXPIRED, MiningScheduler, PRIORITIES
+from ..services.metrics import metrics, stage_timer
 from ..services.orchestration_service import OrchestrationService  
+from ..services.progress_watcher import progress_hub, read_progress
+from ..services.storage import storage
+from ..services.sweep_service import SweepService, expand_configs
 from ..config.settings import settings  
   
 router = APIRouter()  
+# Answer for requests whose client went away (nginx's "client closed request")
+CLIENT_CLOSED_REQUEST = 499
+# Sampling parameters /mine-patterns uses when the caller leaves them out;
+# lighter than the miner's own defaults so an omitted field never means a long run
+MINE_PATTERNS_DEFAULTS = {
+    'min_pattern_size': 3,
+    'max_pattern_size': 5,
+    'min_neighborhood_size': 3,
+    'max_neighborhood_size': 5,
+    'n_neighborhoods': 500,
+    'n_trials': 100
+}
 orchestration_service = OrchestrationService()  
+mining_scheduler = MiningScheduler(orchestration_service.mine_patterns)
+sweep_service = SweepService(orchestration_service, mining_scheduler)
+
+metrics.gauge(
+    "mining_queue_depth", "Mining jobs waiting for a scheduler slot.",
+    callback=lambda: mining_scheduler.queue_depth
+)
+metrics.gauge(
+    "mining_jobs_in_flight", "Mining jobs currently running.",
+    callback=lambda: mining_scheduler.in_flight
+)
+metrics.gauge(
+    "miner_requests_in_flight", "Requests outstanding per miner replica.", ["miner"],
+    callback=lambda: {e.url: e.in_flight for e in orchestration_service.miner_service.pool.endpoints}
+)
+metrics.gauge(
+    "miner_available", "Miner replicas that are healthy and admitting requests.",
+    callback=lambda: orchestration_service.miner_service.pool.available
+)
+metrics.gauge(
+    "job_storage_bytes", "Bytes of job data on disk as of the last storage sweep.",
+    callback=lambda: (orchestration_service.job_storage.last_sweep or {}).get("total_bytes", 0)
+)
+# Queued and running jobs (sweep configs included) keep their data
+orchestration_service.job_storage.protect(lambda: mining_scheduler.active_job_ids())
+
+def current_tenant(request: Request) -> str:
+    """Tenant a request is made for, from the ``TENANT_HEADER`` header."""
+    return request.headers.get(settings.tenant_header) or settings.default_tenant
+
+def request_deadline(request: Request) -> Optional[float]:
+    """Deadline of a request, from the ``DEADLINE_HEADER`` header or ``REQUEST_TIMEOUT``."""
+    try:
+        return deadline_from_timeout(request.headers.get(settings.deadline_header))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _admission_error(e: AdmissionRejected) -> HTTPException:
+    headers = {"Retry-After": str(e.retry_after)} if e.retry_after is not None else None
+    return HTTPException(status_code=e.status_code, detail=str(e), headers=headers)
+
+async def _await_client(request: Request, awaitable) -> Any:
+    """Await ``awaitable`` for as long as the client is still connected.
+
+    If the client disconnects first the work is cancelled and None returned.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=settings.disconnect_poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                return None
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
   
 @router.post("/generate-graph")  
 async def generate_graph(  
+    request: Request,
     files: List[UploadFile] = File(...),  
     config: str = Form(...),  
     schema_json: str = Form(...),  
     writer_type: str = Form("networkx"),
-    graph_type: str = Form("directed")
+    graph_type: str = Form("directed"),
+    tenant_id: str = Depends(current_tenant),
+    deadline: Optional[float] = Depends(request_deadline)
 ):  
-    """Generate NetworkX graph from CSV files."""  
+    """Generate NetworkX graph from CSV files.
+
+    The AtomSpace load is abandoned if the client disconnects or the
+    request's deadline passes (504).
+    """  
     # Validate all files are CSV  
     for file in files:  
         if not file.filename.endswith('.csv'):  
             raise HTTPException(status_code=400, detail="Only CSV files are allowed")  
-      
-    # Save uploaded files to temporary directory  
-    temp_dir = tempfile.mkdtemp()  
-    csv_file_paths = []  
-      
-    try:  
-        for file in files:  
-            file_path = os.path.join(temp_dir, file.filename)  
-            with open(file_path, "wb") as f:  
-                content = await file.read()  
-                f.write(content)  
-            csv_file_paths.append(file_path)  
-          
-        result = await orchestration_service.generate_networkx(
-            csv_files=csv_file_paths,
+
+    # Uploads are streamed straight to AtomSpace in chunks rather than being
+    # read into memory and re-written to a temporary directory.
+    try:
+        result = await _await_client(request, orchestration_service.generate_networkx(
+            csv_files=files,
             config=config,
             schema_json=schema_json,
             writer_type=writer_type,
             graph_type=graph_type,
-            tenant_id="default"
+            tenant_id=tenant_id,
+            deadline=deadline
+        ))
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    if result is None:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    return result
+
+@router.post("/update-graph")
+async def update_graph(
+    job_id: str = Form(...),
+    files: List[UploadFile] = File(...),
+    base_version: int = Form(None)
+):
+    """Append delta CSVs to an existing job's graph as a new graph version.
+
+    Node files have an ``id`` column, edge files ``source`` and ``target``;
+    an optional ``op`` column marks rows ``add`` (default) or ``remove``.
+    Pass ``base_version`` to reject the update if another one landed first.
+    """
+    for file in files:
+        if not file.filename.endswith('.csv'):
+            raise HTTPException(status_code=400, detail="Only CSV files are allowed")
+    try:
+        return await orchestration_service.update_graph(
+            job_id,
+            [(file.filename, file.file) for file in files],
+            base_version=base_version
         )
-          
-        return result
-          
-    finally:  
-        import shutil  
-        if os.path.exists(temp_dir):  
-            shutil.rmtree(temp_dir)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/graph-versions/{job_id}")
+async def list_graph_versions(job_id: str):
+    """List the graph versions of a job, oldest first."""
+    try:
+        return await orchestration_service.graph_versions.index(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @router.post("/mine-patterns")
 async def mine_patterns(
+    request: Request,
     job_id: str = Form(...),
-    min_pattern_size: int = Form(3),
-    max_pattern_size: int = Form(5),
-    min_neighborhood_size: int = Form(3),
-    max_neighborhood_size: int = Form(5),
-    n_neighborhoods: int = Form(500),
-    n_trials: int = Form(100),
+    min_pattern_size: int = Form(None),
+    max_pattern_size: int = Form(None),
+    min_neighborhood_size: int = Form(None),
+    max_neighborhood_size: int = Form(None),
+    n_neighborhoods: int = Form(None),
+    n_trials: int = Form(None),
+    time_budget: float = Form(None),
     graph_type: str = Form(None),
     search_strategy: str = Form("greedy"),
     sample_method: str = Form("tree"),
-    graph_output_format: str = Form("representative")
+    graph_output_format: str = Form("representative"),
+    seed: int = Form(None),
+    reuse_unseeded_results: bool = Form(None),
+    partition_shards: int = Form(None),
+    graph_version: int = Form(None),
+    async_mode: bool = Form(False),
+    priority: str = Form("normal"),
+    tenant_id: str = Depends(current_tenant),
+    deadline: Optional[float] = Depends(request_deadline)
 ):
-    """ Mine patterns from NetworkX graph with custom configuration."""
+    """ Mine patterns from NetworkX graph with custom configuration.
+
+    Jobs run through the mining scheduler so only a bounded number reach the
+    miner at once. With ``async_mode`` the request returns 202 with a job
+    handle right away; poll or cancel it via ``/mining-jobs/{task_id}``.
+    Requests over the tenant's quota get 429 with ``Retry-After``; a job
+    whose estimated runtime exceeds ``MINING_MAX_JOB_SECONDS`` gets 422.
+    A job still unfinished at the request's deadline is stopped (504 when
+    waited for); a waiting client that disconnects cancels its job.
+
+    Parameters left out take ``MINE_PATTERNS_DEFAULTS``. With
+    ``time_budget`` (seconds) the unset sampling parameters are chosen
+    so the run should finish within it, and the run is stopped once it
+    takes ``MINING_BUDGET_GRACE`` times as long; the response's ``budget``
+    shows the plan. A budget too small for the graph gets 422.
+    """
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"priority must be one of {list(PRIORITIES)}")
     
     # Auto-detect graph_type from metadata if not provided
     if graph_type is None:
@@ -82,34 +227,190 @@ async def mine_patterns(
         'graph_type': graph_type,
         'search_strategy': search_strategy,
         'sample_method': sample_method,
-        'graph_output_format': graph_output_format
+        'graph_output_format': graph_output_format,
+        'seed': seed,
+        'reuse_unseeded_results': reuse_unseeded_results,
+        'partition_shards': partition_shards,
+        'graph_version': graph_version
     }
+    mining_config = {key: value for key, value in mining_config.items() if value is not None}
+    # Unset parameters take the endpoint defaults, except those a time budget chooses
+    for key, value in MINE_PATTERNS_DEFAULTS.items():
+        if time_budget is None or key not in TUNED_PARAMETERS:
+            mining_config.setdefault(key, value)
+
+    def admit_calibration(sample_id: str, config: Dict[str, Any], nodes: int, edges: int):
+        # A calibration pass is mining work of this tenant's like any other
+        estimate = mining_scheduler.estimator.estimate_for_size(config, nodes, edges)
+        return mining_scheduler.track(sample_id, config, tenant_id=tenant_id, priority=priority, estimate=estimate)
+
+    if time_budget is not None:
+        budget_deadline = time.time() + time_budget * settings.mining_budget_grace
+        deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+        try:
+            plan = await _await_client(request, orchestration_service.plan_mining_budget(
+                job_id, mining_config, time_budget, deadline=deadline, admit=admit_calibration
+            ))
+        except AdmissionRejected as e:
+            raise _admission_error(e)
+        except BudgetTooSmall as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        if plan is None:
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+        mining_config.update(plan['parameters'], graph_version=plan['graph_version'], budget_plan=plan)
     
-    result = await orchestration_service.mine_patterns(
-        job_id=job_id,
-        mining_config=mining_config
-    )
-    
-    return result
+    try:
+        job = await mining_scheduler.submit(
+            job_id, mining_config, priority=priority, tenant_id=tenant_id, deadline=deadline
+        )
+    except AdmissionRejected as e:
+        raise _admission_error(e)
+
+    if async_mode:
+        return JSONResponse(status_code=202, content=_job_handle(job))
+
+    task_id = job.task_id
+    job = await _await_client(request, mining_scheduler.wait(task_id))
+    if job is None:
+        # Nobody is waiting for the result any more; free the miner for others
+        await mining_scheduler.cancel(task_id)
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    if job.state == EXPIRED:
+        raise HTTPException(status_code=504, detail=job.error)
+    if job.result is not None:
+        return job.result
+    return {"status": "error", "error": job.error or f"Mining job {job.state}"}
+
+class SweepRequest(BaseModel):
+    job_id: str
+    base_config: Dict[str, Any] = {}
+    grid: Dict[str, List[Any]] = {}
+    configs: List[Dict[str, Any]] = []
+    max_concurrency: Optional[int] = None
+    priority: str = "normal"
+
+@router.post("/mine-patterns/sweep")
+async def mine_patterns_sweep(request: SweepRequest, tenant_id: str = Depends(current_tenant)):
+    """Mine one graph with many configs and stream results as NDJSON.
+
+    Configs come from ``grid`` (every combination) and/or ``configs`` (an
+    explicit list), each applied on top of ``base_config``. Equivalent
+    configs are mined once. One ``result`` line is written per unique config
+    as it finishes, followed by a ``summary`` line.
+    """
+    if request.priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"priority must be one of {list(PRIORITIES)}")
+    try:
+        configs = expand_configs(request.base_config, request.grid, request.configs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(configs) > settings.sweep_max_configs:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep has {len(configs)} configs; the limit is {settings.sweep_max_configs}"
+        )
+    if not await storage.exists(storage.shared_path(request.job_id, "networkx_graph.pkl")):
+        raise HTTPException(status_code=404, detail=f"NetworkX file not found for job_id: {request.job_id}")
+    versions = {int(config['graph_version']) for config in configs if config.get('graph_version') is not None}
+    if versions:
+        latest = (await orchestration_service.graph_versions.index(request.job_id))["latest"]
+        unknown = sorted(v for v in versions if not 0 <= v <= latest)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown graph versions {unknown}; the latest is {latest}")
+
+    if any('graph_type' not in config for config in configs):
+        graph_type = await orchestration_service.get_graph_type_from_metadata(request.job_id)
+        configs = [{'graph_type': graph_type, **config} for config in configs]
+
+    async def lines():
+        async for event in sweep_service.run(
+            request.job_id,
+            configs,
+            max_concurrency=request.max_concurrency,
+            priority=request.priority,
+            tenant_id=tenant_id
+        ):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def _job_handle(job) -> dict:
+    handle = job.to_dict()
+    handle["position"] = mining_scheduler.position(job.task_id)
+    handle["status_url"] = f"/api/mining-jobs/{job.task_id}"
+    return handle
+
+@router.get("/mining-jobs")
+async def list_mining_jobs():
+    """Scheduler queue depth, in-flight count and known jobs."""
+    return {
+        "scheduler": mining_scheduler.stats(),
+        "jobs": [_job_handle(job) for job in mining_scheduler.jobs.values()]
+    }
+
+@router.get("/mining-jobs/{task_id}")
+async def get_mining_job(task_id: str):
+    """Poll the state of a scheduled mining job."""
+    job = mining_scheduler.get(task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown mining job: {task_id}")
+    return _job_handle(job)
+
+@router.delete("/mining-jobs/{task_id}")
+async def cancel_mining_job(task_id: str):
+    """Cancel a queued or running mining job."""
+    try:
+        cancelled = await mining_scheduler.cancel(task_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown mining job: {task_id}")
+    if not cancelled:
+        raise HTTPException(status_code=409, detail=f"Mining job {task_id} has already finished")
+    return _job_handle(mining_scheduler.get(task_id))
 
 @router.get("/download-result")
-async def download_result(job_id: str, filename: str = None):
+async def download_result(request: Request, job_id: str, filename: str = None):
     try:
         if filename:
             # Download specific file
-            file_path = orchestration_service.get_result_file_path(job_id, filename)
-            return FileResponse(
-                path=file_path,
+            file_path = await storage.run(orchestration_service.get_result_file_path, job_id, filename)
+            return await ranged_file_response(
+                request,
+                file_path,
                 filename=os.path.basename(file_path),
                 media_type='application/octet-stream'
             )
         else:
             # Download entire job as ZIP
-            zip_path = orchestration_service.create_job_archive(job_id)
-            return FileResponse(
-                path=zip_path,
+            archive = await orchestration_service.prepare_job_archive(job_id)
+            etag = archive["etag"]
+            if etag_matches(request.headers.get('if-none-match'), etag):
+                return Response(status_code=304, headers={'ETag': etag})
+
+            if not archive["cached"] and not request.headers.get('range'):
+                # Stream while compressing; the archive is cached once complete
+                return StreamingResponse(
+                    orchestration_service.stream_job_archive(job_id, archive),
+                    media_type='application/zip',
+                    headers={
+                        'ETag': etag,
+                        'Content-Disposition': content_disposition(f"{job_id}.zip")
+                    }
+                )
+
+            # Byte ranges need the finished archive
+            await orchestration_service.build_job_archive(job_id, archive)
+            return await ranged_file_response(
+                request,
+                archive["path"],
                 filename=f"{job_id}.zip",
-                media_type='application/zip'
+                media_type='application/zip',
+                etag=etag
             )
             
     except PermissionError as e:
@@ -119,27 +420,77 @@ async def download_result(job_id: str, filename: str = None):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/results/{job_id}/patterns")
+async def list_patterns(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1),
+    sort: str = "count",
+    order: str = "desc",
+    min_size: int = None,
+    max_size: int = None,
+    min_count: int = None,
+    node_label: str = None,
+    edge_label: str = None
+):
+    """A page of a job's mined patterns, filtered and sorted, without instances.
+
+    Results are parsed into an index on first use; later pages and
+    filters are served from it. ``facets`` counts patterns per size and label.
+    """
+    if limit > settings.results_page_max:
+        raise HTTPException(status_code=400, detail=f"limit must be at most {settings.results_page_max}")
+    try:
+        return await orchestration_service.query_patterns(
+            job_id,
+            offset=offset,
+            limit=limit,
+            sort=sort,
+            order=order,
+            min_size=min_size,
+            max_size=max_size,
+            min_count=min_count,
+            node_label=node_label,
+            edge_label=edge_label
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"No mining results for job_id: {job_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/results/{job_id}/patterns/{pattern_id}")
+async def get_pattern(
+    job_id: str,
+    pattern_id: int,
+    instance_offset: int = Query(0, ge=0),
+    instance_limit: int = Query(100, ge=1)
+):
+    """One mined pattern with a page of its instances."""
+    if instance_limit > settings.results_page_max:
+        raise HTTPException(status_code=400, detail=f"instance_limit must be at most {settings.results_page_max}")
+    try:
+        return await orchestration_service.get_pattern(
+            job_id,
+            pattern_id,
+            instance_offset=instance_offset,
+            instance_limit=instance_limit
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"No mining results for job_id: {job_id}")
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown pattern {pattern_id} for job_id: {job_id}")
+
 @router.get("/mining-status/{job_id}")
 async def get_mining_status(job_id: str):
     """Get the current progress of a mining job."""
     try:
-        # Define path to progress file in shared volume
-        # Note: We access it via the shared volume path
-        progress_path = f"/shared/output/{job_id}/progress.json"
-        
-        if not os.path.exists(progress_path):
-            # If no progress file yet, return pending status
-            return {
-                "status": "pending", 
-                "progress": 0, 
-                "message": "Waiting for miner to start..."
-            }
-            
-        import json
-        with open(progress_path, 'r') as f:
-            status_data = json.load(f)
-            
-        return status_data
+        # Served from the job's live watcher when one exists, otherwise read
+        # once off the event loop.
+        async with stage_timer('status'):
+            snapshot = progress_hub.snapshot(job_id)
+            if snapshot is not None:
+                return snapshot
+            return await read_progress(job_id)
         
     except Exception as e:
         # Don't fail the request, just return error status
@@ -147,4 +498,81 @@ async def get_mining_status(job_id: str):
             "status": "error", 
             "progress": 0, 
             "message": f"Error checking status: {str(e)}"
-        }
\ No newline at end of file
+        }
+
+@router.get("/mining-status/{job_id}/stream")
+async def stream_mining_status(job_id: str):
+    """Server-Sent Events stream of a mining job's progress.
+
+    Emits the current state immediately, then one ``progress`` event per
+    change, ending after a terminal status. All viewers of a job share a
+    single file watcher.
+    """
+    async def events():
+        updates = progress_hub.subscribe(job_id)
+        try:
+            next_update = asyncio.ensure_future(updates.__anext__())
+            while True:
+                done, _ = await asyncio.wait({next_update}, timeout=settings.progress_heartbeat_interval)
+                if not done:
+                    yield ": keep-alive\n\n"
+                    continue
+                try:
+                    progress = next_update.result()
+                except StopAsyncIteration:
+                    return
+                yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+                next_update = asyncio.ensure_future(updates.__anext__())
+        finally:
+            next_update.cancel()
+            await updates.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Hit/miss counters and sizes of the integration service caches."""
+    return {
+        "ingest": orchestration_service.ingest_cache.stats(),
+        "mining": orchestration_service.mining_cache.stats()
+    }
+
+@router.get("/storage")
+async def get_job_storage():
+    """Disk usage of job data per job, the budget and eviction counters."""
+    jobs = await storage.run(orchestration_service.job_storage.usage)
+    protected = orchestration_service.job_storage.protected()
+    return {
+        **orchestration_service.job_storage.stats(),
+        "total_bytes": sum(job["size"] for job in jobs.values()),
+        "jobs": [
+            {
+                "job_id": job_id,
+                "size": job["size"],
+                "freeable": job["freeable"],
+                "last_access": job["last_access"],
+                "protected": job_id in protected
+            }
+            for job_id, job in sorted(jobs.items(), key=lambda item: item[1]["last_access"])
+        ]
+    }
+
+@router.delete("/jobs/{job_id}")
+async def evict_job(job_id: str):
+    """Remove all data of a job: its directories, derived jobs and archive."""
+    job_storage = orchestration_service.job_storage
+    usage = (await storage.run(job_storage.usage)).get(job_id)
+    if usage is None:
+        raise HTTPException(status_code=404, detail=f"No data for job_id: {job_id}")
+    if not await job_storage.evict(job_id, usage=usage):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is queued, running or being written")
+    return {"job_id": job_id, "status": "evicted", "freed_bytes": usage["freeable"]}
+
+@router.get("/miners")
+async def get_miners():
+    """Health, circuit breaker state and load of each miner replica."""
+    return orchestration_service.miner_service.pool.stats()
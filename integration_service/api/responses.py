@@ -0,0 +1,110 @@
+"""Conditional and ranged file responses (ETag / If-None-Match / Range)."""
+import os
+from typing import Optional, Tuple
+from urllib.parse import quote
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from ..services.storage import storage
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    strip = lambda tag: tag.strip().removeprefix('W/')
+    return strip(etag) in {strip(tag) for tag in header.split(',')}
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into an inclusive (start, end) pair.
+
+    Returns None for headers we don't honour (other units, multiple ranges,
+    malformed values), in which case the full body is sent. Raises
+    ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, sep, last = spec.strip().partition('-')
+    if not sep:
+        return None
+    if not (first or last).isdigit() or (last and not last.isdigit()):
+        return None
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise ValueError("range starts past end of file")
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+async def ranged_file_response(
+    request: Request,
+    path: str,
+    filename: str,
+    media_type: str,
+    etag: str = None
+) -> Response:
+    """Serve ``path`` honouring If-None-Match, Range and If-Range.
+
+    ``etag`` defaults to one derived from the file's size and mtime.
+    """
+    stat_result = await storage.run(os.stat, path)
+    etag = etag or file_etag(stat_result)
+    headers = {'ETag': etag, 'Accept-Ranges': 'bytes'}
+
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get('range')
+    if_range = request.headers.get('if-range')
+    if range_header and (if_range is None or if_range.strip() == etag):
+        size = stat_result.st_size
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            headers['Content-Range'] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers.update({
+                'Content-Range': f"bytes {start}-{end}/{size}",
+                'Content-Length': str(end - start + 1),
+                'Content-Disposition': content_disposition(filename)
+            })
+            return StreamingResponse(
+                storage.iter_chunks(path, CHUNK_SIZE, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers=headers
+            )
+
+    return FileResponse(
+        path=path,
+        filename=filename,
+        media_type=media_type,
+        headers=headers,
+        stat_result=stat_result
+    )
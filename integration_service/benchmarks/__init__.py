@@ -0,0 +1,4 @@
+"""Load benchmarks for the integration service against local fake upstreams.
+
+Run ``python -m integration_service.benchmarks --help`` for options.
+"""
@@ -0,0 +1,63 @@
+"""Command line entry point: run a benchmark, save the JSON report, optionally compare."""
+import argparse
+import json
+import sys
+from .loadgen import compare_reports
+from .runner import run_benchmark
+
+
+def _key_values(pairs):
+    values = {}
+    for pair in pairs or []:
+        key, _, value = pair.partition('=')
+        values[key] = value
+    return values
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pipelines', type=int, default=20, help='end-to-end runs to perform')
+    parser.add_argument('--concurrency', type=int, default=4, help='runs in flight at once')
+    parser.add_argument('--csv-mb', type=float, default=1.0, help='size of the uploaded edge CSV')
+    parser.add_argument('--miners', type=int, default=1, help='fake miner replicas')
+    parser.add_argument('--repeat-inputs', action='store_true', help='upload identical inputs so caches hit')
+    parser.add_argument('--fake', action='append', metavar='BENCH_VAR=VALUE', help='fake upstream setting')
+    parser.add_argument('--service', action='append', metavar='SETTING=VALUE', help='integration service setting')
+    parser.add_argument('--output', default='benchmark.json', help='where to write the JSON report')
+    parser.add_argument('--compare', metavar='BASELINE', help='report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed slowdown before failing, as a fraction')
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        pipelines=args.pipelines,
+        concurrency=args.concurrency,
+        csv_bytes=int(args.csv_mb * 1024 * 1024),
+        miner_replicas=args.miners,
+        distinct_inputs=not args.repeat_inputs,
+        fake_env=_key_values(args.fake),
+        service_env=_key_values(args.service)
+    )
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'operation':<16}{'count':>7}{'errors':>8}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, op in report['operations'].items():
+        cells = [f"{op[q]:9.3f}" if op[q] is not None else f"{'-':>9}" for q in ('p50', 'p95', 'p99')]
+        print(f"{name:<16}{op['count']:>7}{op['errors']:>8}{''.join(cells)}")
+    print(f"throughput: {report['throughput']['pipelines_per_second']:.2f} pipelines/s, "
+          f"service peak RSS: {(report['resources']['service_peak_rss_bytes'] or 0) / 2 ** 20:.1f} MiB")
+    print(f"report written to {args.output}")
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    changes = compare_reports(baseline, report, args.tolerance)
+    for change in changes:
+        flag = 'REGRESSION' if change['regression'] else ''
+        print(f"{change['field']:<36}{change['baseline']:>14.4g}{change['current']:>14.4g}{change['change']:>+9.1%} {flag}")
+    return 1 if any(change['regression'] for change in changes) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Fake AtomSpace and miner servers for benchmarks.
+
+Both apps are configured through ``BENCH_*`` environment variables (see
+:data:`DEFAULTS`) and write realistic output to ``BENCH_SHARED_DIR``: AtomSpace
+a pickled NetworkX graph plus metadata, the miner ``results/``, ``plots/``
+and a ``progress.json`` that advances while the run is in flight.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import random
+import uuid
+from typing import Any, Dict, List, Optional
+import networkx as nx
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+
+DEFAULTS = {
+    "BENCH_SHARED_DIR": "",
+    "BENCH_SEED": "0",
+    # AtomSpace: fixed latency, time per MiB uploaded, failure rate and graph size
+    "BENCH_ATOMSPACE_LATENCY": "0.05",
+    "BENCH_ATOMSPACE_SECONDS_PER_MB": "0.01",
+    "BENCH_ATOMSPACE_FAILURE_RATE": "0",
+    "BENCH_GRAPH_NODES": "2000",
+    "BENCH_GRAPH_EDGES": "8000",
+    # Miner: run time (+/- jitter fraction), concurrent runs, failure rate, output size
+    "BENCH_MINER_LATENCY": "0.5",
+    "BENCH_MINER_JITTER": "0.2",
+    "BENCH_MINER_SLOTS": "4",
+    "BENCH_MINER_FAILURE_RATE": "0",
+    "BENCH_MINER_SEES_VOLUME": "true",
+    "BENCH_MINER_PATTERNS": "20",
+    "BENCH_MINER_RESULT_KB": "256",
+    "BENCH_MINER_PLOTS": "10",
+    "BENCH_MINER_PLOT_KB": "64",
+    "BENCH_MINER_PROGRESS_STEPS": "5",
+}
+
+
+def _env(name: str) -> str:
+    return os.getenv(name, DEFAULTS[name])
+
+
+def _fails(rate_name: str, rng: random.Random) -> bool:
+    return rng.random() < float(_env(rate_name))
+
+
+def _job_dir(job_id: str) -> str:
+    shared_dir = _env("BENCH_SHARED_DIR")
+    if not shared_dir:
+        raise HTTPException(status_code=500, detail="BENCH_SHARED_DIR is not set")
+    return os.path.join(shared_dir, job_id)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write_json(path: str, payload: Any) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+# --- AtomSpace ---
+
+atomspace_app = FastAPI(title="Benchmark AtomSpace")
+_atomspace_rng = random.Random(int(_env("BENCH_SEED")))
+
+
+@atomspace_app.get("/health")
+async def atomspace_health():
+    return {"status": "healthy"}
+
+
+def _write_graph(job_dir: str, graph_type: str, seed: int) -> None:
+    os.makedirs(job_dir, exist_ok=True)
+    graph = nx.gnm_random_graph(
+        int(_env("BENCH_GRAPH_NODES")),
+        int(_env("BENCH_GRAPH_EDGES")),
+        seed=seed,
+        directed=graph_type == "directed"
+    )
+    for node in graph.nodes:
+        graph.nodes[node]["label"] = f"type_{node % 5}"
+    with open(os.path.join(job_dir, "networkx_graph.pkl"), "wb") as f:
+        pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+    _write_json(os.path.join(job_dir, "networkx_metadata.json"), {
+        "graph_type": graph_type,
+        "nodes": graph.number_of_nodes(),
+        "edges": graph.number_of_edges()
+    })
+
+
+@atomspace_app.post("/api/load")
+async def atomspace_load(
+    files: List[UploadFile] = File(...),
+    config: str = Form(...),
+    schema_json: str = Form(...),
+    writer_type: str = Form("networkx"),
+    graph_type: str = Form("directed"),
+    tenant_id: str = Form("default")
+):
+    received = 0
+    for upload in files:
+        while True:
+            chunk = await upload.read(1024 * 1024)
+            if not chunk:
+                break
+            received += len(chunk)
+
+    delay = float(_env("BENCH_ATOMSPACE_LATENCY"))
+    delay += float(_env("BENCH_ATOMSPACE_SECONDS_PER_MB")) * received / (1024 * 1024)
+    await asyncio.sleep(delay)
+    if _fails("BENCH_ATOMSPACE_FAILURE_RATE", _atomspace_rng):
+        raise HTTPException(status_code=503, detail="benchmark failure injection")
+
+    job_id = str(uuid.uuid4())
+    seed = _atomspace_rng.randrange(2 ** 31)
+    await asyncio.to_thread(_write_graph, _job_dir(job_id), graph_type, seed)
+    return {"job_id": job_id, "status": "success", "bytes_received": received}
+
+
+# --- Miner ---
+
+miner_app = FastAPI(title="Benchmark miner")
+_miner_rng = random.Random(int(_env("BENCH_SEED")) + 1)
+_miner_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+@miner_app.get("/health")
+async def miner_health():
+    return {"status": "healthy"}
+
+
+@miner_app.get("/capabilities")
+async def miner_capabilities():
+    modes = ["upload"]
+    if _env("BENCH_MINER_SEES_VOLUME").lower() == "true":
+        modes.append("path")
+    return {"transfer_modes": modes}
+
+
+def _write_results(job_dir: str, job_id: str, min_pattern_size: int, seed: int) -> None:
+    rng = random.Random(seed)
+    results_dir = os.path.join(job_dir, "results")
+    plots_dir = os.path.join(job_dir, "plots")
+    os.makedirs(results_dir, exist_ok=True)
+    os.makedirs(plots_dir, exist_ok=True)
+
+    patterns_count = int(_env("BENCH_MINER_PATTERNS"))
+    # Pad instances so the results file reaches roughly BENCH_MINER_RESULT_KB
+    budget = int(_env("BENCH_MINER_RESULT_KB")) * 1024
+    per_instance = 24 * min_pattern_size
+    instances = max(1, budget // max(1, patterns_count * per_instance))
+    patterns = []
+    for index in range(patterns_count):
+        size = min_pattern_size + index % 3
+        patterns.append({
+            "nodes": [{"id": n, "label": f"type_{rng.randrange(5)}"} for n in range(size)],
+            "edges": [[n, n + 1] for n in range(size - 1)],
+            "count": instances,
+            "instances": [
+                {"nodes": [rng.randrange(10 ** 6) for _ in range(size)]}
+                for _ in range(instances)
+            ]
+        })
+    _write_json(os.path.join(results_dir, "patterns.json"), {"job_id": job_id, "patterns": patterns})
+
+    plot_bytes = int(_env("BENCH_MINER_PLOT_KB")) * 1024
+    for index in range(int(_env("BENCH_MINER_PLOTS"))):
+        with open(os.path.join(plots_dir, f"pattern_{index}.png"), "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n" + rng.randbytes(max(0, plot_bytes - 8)))
+
+
+@miner_app.post("/mine")
+async def miner_mine(
+    job_id: str = Form(...),
+    graph_path: Optional[str] = Form(None),
+    graph_sha256: Optional[str] = Form(None),
+    graph_file: Optional[UploadFile] = File(None),
+    min_pattern_size: int = Form(5)
+):
+    if graph_file is not None:
+        await graph_file.read()
+    elif graph_path is not None:
+        if _env("BENCH_MINER_SEES_VOLUME").lower() != "true" or not os.path.exists(graph_path):
+            raise HTTPException(status_code=404, detail=f"Graph not visible: {graph_path}")
+        content = await asyncio.to_thread(_read_file, graph_path)
+        if graph_sha256 and hashlib.sha256(content).hexdigest() != graph_sha256:
+            raise HTTPException(status_code=409, detail="Checksum mismatch")
+    else:
+        raise HTTPException(status_code=400, detail="No graph provided")
+
+    if _fails("BENCH_MINER_FAILURE_RATE", _miner_rng):
+        raise HTTPException(status_code=503, detail="benchmark failure injection")
+
+    job_dir = _job_dir(job_id)
+    os.makedirs(job_dir, exist_ok=True)
+    progress_file = os.path.join(job_dir, "progress.json")
+    jitter = float(_env("BENCH_MINER_JITTER"))
+    run_time = float(_env("BENCH_MINER_LATENCY")) * (1 + _miner_rng.uniform(-jitter, jitter))
+    steps = max(1, int(_env("BENCH_MINER_PROGRESS_STEPS")))
+
+    if "slots" not in _miner_slots:
+        _miner_slots["slots"] = asyncio.Semaphore(int(_env("BENCH_MINER_SLOTS")))
+    _write_json(progress_file, {"status": "queued", "progress": 0, "message": "Waiting for a slot"})
+    async with _miner_slots["slots"]:
+        for step in range(steps):
+            _write_json(progress_file, {
+                "status": "running",
+                "progress": int(100 * step / steps),
+                "message": f"Search step {step + 1}/{steps}"
+            })
+            await asyncio.sleep(run_time / steps)
+        await asyncio.to_thread(_write_results, job_dir, job_id, min_pattern_size, _miner_rng.randrange(2 ** 31))
+    _write_json(progress_file, {"status": "completed", "progress": 100, "message": "Mining complete"})
+
+    return {
+        "status": "success",
+        "results_path": f"/shared/output/{job_id}/results",
+        "plots_path": f"/shared/output/{job_id}/plots"
+    }
@@ -0,0 +1,239 @@
+"""Concurrent load generator for the integration service and its JSON report.
+
+Each simulated pipeline uploads CSVs to ``/api/generate-graph``, mines the
+graph through ``/api/mine-patterns``, checks ``/api/mining-status`` and
+downloads the job ZIP and its results file. Latencies are recorded per
+operation and summarised as percentiles.
+"""
+import asyncio
+import math
+import os
+import platform
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional
+import httpx
+
+OPERATIONS = ('generate_graph', 'mine_patterns', 'mining_status', 'download_zip', 'download_file', 'pipeline')
+
+# Report fields compared between runs: (path, True when higher is better)
+COMPARED_FIELDS = [
+    *((('operations', op, q), False) for op in OPERATIONS for q in ('p50', 'p95', 'p99')),
+    (('throughput', 'pipelines_per_second'), True),
+    (('resources', 'service_peak_rss_bytes'), False),
+]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Percentile ``q`` (0-100) of ``values`` with linear interpolation."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies: List[float], errors: int, transferred: int) -> Dict[str, Any]:
+    count = len(latencies) + errors
+    return {
+        "count": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": sum(latencies) / len(latencies) if latencies else None,
+        "max": max(latencies) if latencies else None,
+        "bytes": transferred
+    }
+
+
+def peak_rss_bytes(pid: int) -> Optional[int]:
+    """High-water-mark resident set size of a process (Linux ``VmHWM``)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid == os.getpid():
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    return None
+
+
+def stage_breakdown(metrics_text: str) -> Dict[str, Dict[str, float]]:
+    """Mean duration per stage from the service's ``/metrics`` output."""
+    sums: Dict[str, float] = {}
+    counts: Dict[str, float] = {}
+    for line in metrics_text.splitlines():
+        for suffix, target in (("_sum", sums), ("_count", counts)):
+            prefix = f'pipeline_stage_duration_seconds{suffix}{{stage="'
+            if line.startswith(prefix):
+                stage, value = line[len(prefix):].split('"} ')
+                target[stage] = float(value)
+    return {
+        stage: {"count": counts[stage], "mean_seconds": sums[stage] / counts[stage] if counts[stage] else None}
+        for stage in sorted(counts)
+        if stage in sums
+    }
+
+
+class LoadGenerator:
+    """Drives ``pipelines`` end-to-end runs against ``base_url``, ``concurrency`` at a time.
+
+    All pipelines upload the same ``edges_csv``; with ``distinct_inputs``
+    each also sends a small unique file so ingest and mining caches miss,
+    otherwise repeat runs measure the cached path.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        edges_csv: str,
+        pipelines: int,
+        concurrency: int,
+        mining_config: Dict[str, Any] = None,
+        distinct_inputs: bool = True,
+        timeout: float = 600.0
+    ):
+        self.base_url = base_url
+        self.edges_csv = edges_csv
+        self.pipelines = pipelines
+        self.concurrency = concurrency
+        self.mining_config = mining_config or {}
+        self.distinct_inputs = distinct_inputs
+        self.timeout = timeout
+        self._latencies: Dict[str, List[float]] = {op: [] for op in OPERATIONS}
+        self._errors: Dict[str, int] = {op: 0 for op in OPERATIONS}
+        self._bytes: Dict[str, int] = {op: 0 for op in OPERATIONS}
+        self._error_samples: List[str] = []
+
+    def _record(self, operation: str, started: float, ok: bool, transferred: int = 0, detail: str = "") -> bool:
+        if ok:
+            self._latencies[operation].append(time.perf_counter() - started)
+        else:
+            self._errors[operation] += 1
+            if len(self._error_samples) < 20:
+                self._error_samples.append(f"{operation}: {detail}"[:300])
+        self._bytes[operation] += transferred
+        return ok
+
+    async def _call(self, operation: str, request) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await request()
+        except httpx.HTTPError as e:
+            self._record(operation, started, False, detail=repr(e))
+            return None
+        ok = response.status_code < 400
+        if ok and response.headers.get("content-type", "").startswith("application/json"):
+            body = response.json()
+            ok = not (isinstance(body, dict) and body.get("status") == "error")
+        transferred = int(response.request.headers.get("content-length") or 0) + len(response.content)
+        self._record(operation, started, ok, transferred, detail=f"{response.status_code} {response.text[:200]}")
+        return response if ok else None
+
+    async def _pipeline(self, client: httpx.AsyncClient, index: int) -> None:
+        started = time.perf_counter()
+        with open(self.edges_csv, "rb") as edges:
+            files = [("files", ("edges.csv", edges, "text/csv"))]
+            if self.distinct_inputs:
+                files.append(("files", (f"nodes_{index}.csv", f"id,run\n{index},{time.time_ns()}\n".encode(), "text/csv")))
+            data = {"config": "{}", "schema_json": "{}", "writer_type": "networkx", "graph_type": "directed"}
+            response = await self._call(
+                'generate_graph', lambda: client.post("/api/generate-graph", files=files, data=data)
+            )
+        if response is None:
+            return self._record('pipeline', started, False, detail="generate_graph failed")
+        job_id = response.json()["job_id"]
+
+        form = {"job_id": job_id, **{k: str(v) for k, v in self.mining_config.items()}}
+        if await self._call('mine_patterns', lambda: client.post("/api/mine-patterns", data=form)) is None:
+            return self._record('pipeline', started, False, detail="mine_patterns failed")
+
+        await self._call('mining_status', lambda: client.get(f"/api/mining-status/{job_id}"))
+        archive = await self._call('download_zip', lambda: client.get("/api/download-result", params={"job_id": job_id}))
+        result = await self._call(
+            'download_file',
+            lambda: client.get("/api/download-result", params={"job_id": job_id, "filename": "results/patterns.json"})
+        )
+        self._record('pipeline', started, archive is not None and result is not None, detail="download failed")
+
+    async def run(self) -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=self.concurrency * 2, max_keepalive_connections=self.concurrency * 2)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            async def bounded(index: int) -> None:
+                async with semaphore:
+                    await self._pipeline(client, index)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(bounded(i) for i in range(self.pipelines)))
+            duration = time.perf_counter() - started
+
+            try:
+                metrics_text = (await client.get("/metrics")).text
+            except httpx.HTTPError:
+                metrics_text = ""
+
+        completed = len(self._latencies['pipeline'])
+        requests = sum(len(v) + self._errors[k] for k, v in self._latencies.items() if k != 'pipeline')
+        uploaded = self._bytes['generate_graph']
+        downloaded = self._bytes['download_zip'] + self._bytes['download_file']
+        return {
+            "duration_seconds": duration,
+            "throughput": {
+                "pipelines_per_second": completed / duration if duration else 0.0,
+                "requests_per_second": requests / duration if duration else 0.0,
+                "upload_bytes_per_second": uploaded / duration if duration else 0.0,
+                "download_bytes_per_second": downloaded / duration if duration else 0.0
+            },
+            "operations": {
+                op: summarize(self._latencies[op], self._errors[op], self._bytes[op]) for op in OPERATIONS
+            },
+            "stages": stage_breakdown(metrics_text),
+            "error_samples": self._error_samples
+        }
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+
+def _lookup(report: Dict[str, Any], path) -> Optional[float]:
+    value: Any = report
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value if isinstance(value, (int, float)) else None
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.1) -> List[Dict[str, Any]]:
+    """Fields that changed between two reports, with ``regression`` set where
+    ``current`` is worse than ``baseline`` by more than ``tolerance`` (a fraction)."""
+    changes = []
+    for path, higher_is_better in COMPARED_FIELDS:
+        before, after = _lookup(baseline, path), _lookup(current, path)
+        if before is None or after is None or before == 0:
+            continue
+        change = (after - before) / before
+        worse = -change if higher_is_better else change
+        changes.append({
+            "field": ".".join(path),
+            "baseline": before,
+            "current": after,
+            "change": round(change, 4),
+            "regression": worse > tolerance
+        })
+    return changes
@@ -0,0 +1,170 @@
+"""Launches the fakes and the integration service, runs the load generator, builds the report."""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+import httpx
+from .loadgen import LoadGenerator, environment, peak_rss_bytes
+
+PACKAGE = __package__.rsplit('.', 1)[0]
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """A uvicorn subprocess serving ``app_path``."""
+
+    def __init__(self, app_path: str, env: Dict[str, str]):
+        self.app_path = app_path
+        self.env = env
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.proc: Optional[subprocess.Popen] = None
+        self.peak_rss = 0
+        self._stop = threading.Event()
+
+    def _sample_rss(self) -> None:
+        # VmHWM covers the whole lifetime; sampling is a fallback where it is missing
+        while not self._stop.wait(0.2):
+            self.peak_rss = max(self.peak_rss, peak_rss_bytes(self.proc.pid) or 0)
+
+    @contextmanager
+    def running(self, timeout: float = 30.0) -> Iterator["Server"]:
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", self.app_path, "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning"],
+            cwd=str(PACKAGE_ROOT),
+            env={**os.environ, **self.env}
+        )
+        sampler = threading.Thread(target=self._sample_rss, daemon=True)
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    if httpx.get(f"{self.url}/health", timeout=1.0).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if self.proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"{self.app_path} failed to start")
+                time.sleep(0.05)
+            sampler.start()
+            yield self
+        finally:
+            self._stop.set()
+            if sampler.is_alive():
+                sampler.join()
+            self.peak_rss = max(self.peak_rss, peak_rss_bytes(self.proc.pid) or 0)
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+def write_csv(path: str, size_bytes: int) -> int:
+    """Write an edge-list CSV of about ``size_bytes``."""
+    written = 0
+    row = 0
+    with open(path, "w") as f:
+        f.write("source,target,label,weight\n")
+        while written < size_bytes:
+            lines = "".join(
+                f"n{(row + i) % 100003},n{(row + i) * 7 % 100003},rel_{(row + i) % 7},{(row + i) % 97 / 97:.4f}\n"
+                for i in range(1000)
+            )
+            f.write(lines)
+            written += len(lines)
+            row += 1000
+    return os.path.getsize(path)
+
+
+def run_benchmark(
+    pipelines: int = 20,
+    concurrency: int = 4,
+    csv_bytes: int = 1024 * 1024,
+    miner_replicas: int = 1,
+    distinct_inputs: bool = True,
+    mining_config: Dict[str, Any] = None,
+    fake_env: Dict[str, str] = None,
+    service_env: Dict[str, str] = None,
+    workdir: str = None
+) -> Dict[str, Any]:
+    """Run one benchmark and return its report.
+
+    ``fake_env`` tunes the fakes (``BENCH_*`` variables, see ``fakes.DEFAULTS``);
+    ``service_env`` overrides integration service settings.
+    """
+    mining_config = mining_config or {"min_pattern_size": 3, "max_pattern_size": 5, "graph_type": "directed"}
+    with ExitStack() as stack:
+        root = workdir or stack.enter_context(tempfile.TemporaryDirectory(prefix="integration-bench-"))
+        shared = os.path.join(root, "shared")
+        os.makedirs(shared, exist_ok=True)
+        edges_csv = os.path.join(root, "edges.csv")
+        csv_size = write_csv(edges_csv, csv_bytes)
+
+        fakes_env = {"BENCH_SHARED_DIR": shared, **(fake_env or {})}
+        atomspace = stack.enter_context(Server(f"{PACKAGE}.benchmarks.fakes:atomspace_app", fakes_env).running())
+        miners = [
+            stack.enter_context(Server(f"{PACKAGE}.benchmarks.fakes:miner_app", fakes_env).running())
+            for _ in range(miner_replicas)
+        ]
+        env = {
+            "ATOMSPACE_API_URL": atomspace.url,
+            "NEURAL_MINER_URL": miners[0].url,
+            "NEURAL_MINER_URLS": ",".join(m.url for m in miners),
+            "SHARED_VOLUME_PATH": shared,
+            "MINER_SHARED_VOLUME_PATH": shared,
+            "LOCAL_OUTPUT_DIR": os.path.join(root, "output"),
+            "CSV_CACHE_DIR": os.path.join(root, "cache"),
+            **(service_env or {})
+        }
+        service = stack.enter_context(Server(f"{PACKAGE}.main:app", env).running())
+
+        generator = LoadGenerator(
+            service.url,
+            edges_csv,
+            pipelines=pipelines,
+            concurrency=concurrency,
+            mining_config=mining_config,
+            distinct_inputs=distinct_inputs
+        )
+        started_at = datetime.now(timezone.utc).isoformat()
+        results = asyncio.run(generator.run())
+        # Leaving the stack stops the servers and takes their final RSS readings
+        stack.close()
+
+    return {
+        "started_at": started_at,
+        "config": {
+            "pipelines": pipelines,
+            "concurrency": concurrency,
+            "csv_bytes": csv_size,
+            "miner_replicas": miner_replicas,
+            "distinct_inputs": distinct_inputs,
+            "mining_config": mining_config,
+            "fake_env": fake_env or {},
+            "service_env": service_env or {}
+        },
+        "environment": environment(),
+        **results,
+        "resources": {
+            "service_peak_rss_bytes": service.peak_rss or None,
+            "atomspace_peak_rss_bytes": atomspace.peak_rss or None,
+            "miner_peak_rss_bytes": max(m.peak_rss for m in miners) or None,
+            "loadgen_peak_rss_bytes": peak_rss_bytes(os.getpid())
+        }
+    }
@@ -14,12 +14,143 @@ class Settings:
           
         # Timeouts 
         self.atomspace_timeout = int(os.getenv('ATOMSPACE_TIMEOUT', '600'))  
-        self.miner_timeout = int(os.getenv('MINER_TIMEOUT', '1800'))  
-          
+        self.miner_timeout = int(os.getenv('MINER_TIMEOUT', '1800'))
+
+        # Per-phase timeouts; read/write fall back to the service timeout above
+        self.atomspace_connect_timeout = float(os.getenv('ATOMSPACE_CONNECT_TIMEOUT', '10'))
+        self.atomspace_read_timeout = float(os.getenv('ATOMSPACE_READ_TIMEOUT', str(self.atomspace_timeout)))
+        self.atomspace_write_timeout = float(os.getenv('ATOMSPACE_WRITE_TIMEOUT', str(self.atomspace_timeout)))
+        self.miner_connect_timeout = float(os.getenv('MINER_CONNECT_TIMEOUT', '10'))
+        self.miner_read_timeout = float(os.getenv('MINER_READ_TIMEOUT', str(self.miner_timeout)))
+        self.miner_write_timeout = float(os.getenv('MINER_WRITE_TIMEOUT', str(self.miner_timeout)))
+
+        # Shared HTTP connection pool
+        self.http_max_connections = int(os.getenv('HTTP_MAX_CONNECTIONS', '100'))
+        self.http_max_keepalive_connections = int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '20'))
+        self.http_keepalive_expiry = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '60'))
+        self.http_pool_timeout = float(os.getenv('HTTP_POOL_TIMEOUT', '30'))
+        self.http2_enabled = os.getenv('HTTP2_ENABLED', 'false').lower() == 'true'
+
+        # Streaming uploads
+        self.upload_chunk_size = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+        self.atomspace_upload_gzip = os.getenv('ATOMSPACE_UPLOAD_GZIP', 'false').lower() == 'true'
+
+        # Graph handoff to the miner: auto (negotiate), path or upload
+        self.miner_transfer_mode = os.getenv('MINER_TRANSFER_MODE', 'auto').lower()
+        self.miner_transfer_fallback = os.getenv('MINER_TRANSFER_FALLBACK', 'true').lower() == 'true'
+        self.miner_shared_volume_path = os.getenv(
+            'MINER_SHARED_VOLUME_PATH',
+            os.getenv('SHARED_VOLUME_PATH', '/shared/output')
+        )
+
+        # Miner pool: comma-separated replicas, defaulting to the single NEURAL_MINER_URL
+        self.miner_urls = [
+            url.strip().rstrip('/')
+            for url in os.getenv('NEURAL_MINER_URLS', self.miner_url).split(',')
+            if url.strip()
+        ]
+        self.miner_health_interval = float(os.getenv('MINER_HEALTH_INTERVAL', '10'))
+        self.miner_breaker_threshold = int(os.getenv('MINER_BREAKER_THRESHOLD', '3'))
+        self.miner_breaker_reset = float(os.getenv('MINER_BREAKER_RESET', '30'))
+        self.miner_retry_delay = float(os.getenv('MINER_RETRY_DELAY', '1'))
+
+        # Mining job scheduler; MINER_MAX_IN_FLIGHT is per miner replica and also caps the
+        # requests in flight to the miners (shards and calibration runs included)
+        self.miner_max_in_flight = int(os.getenv('MINER_MAX_IN_FLIGHT', '2'))
+        self.scheduler_history_limit = int(os.getenv('SCHEDULER_HISTORY_LIMIT', '500'))
+
+        # Parameter sweeps: configs of one sweep queued/running at once, and max configs
+        self.sweep_max_concurrency = int(os.getenv('SWEEP_MAX_CONCURRENCY', '4'))
+        self.sweep_max_configs = int(os.getenv('SWEEP_MAX_CONFIGS', '256'))
+
+        # Partitioned mining: default shard count (0/1 = off) and smallest graph to split
+        self.partition_shards = int(os.getenv('PARTITION_SHARDS', '0'))
+        self.partition_min_nodes = int(os.getenv('PARTITION_MIN_NODES', '5000'))
+
+        # Mining progress streaming
+        self.progress_poll_interval = float(os.getenv('PROGRESS_POLL_INTERVAL', '1.0'))
+        self.progress_use_inotify = os.getenv('PROGRESS_USE_INOTIFY', 'true').lower() == 'true'
+        self.progress_heartbeat_interval = float(os.getenv('PROGRESS_HEARTBEAT_INTERVAL', '15'))
+
+        # Result materialization: auto, reflink, hardlink, symlink, serve or copy
+        self.materialize_strategy = os.getenv('MATERIALIZE_STRATEGY', 'auto').lower()
+        self.materialize_workers = int(os.getenv('MATERIALIZE_WORKERS', '4'))
+
+        # Shared-volume I/O pool and cache of small JSON files (job metadata)
+        self.storage_io_workers = int(os.getenv('STORAGE_IO_WORKERS', '8'))
+        self.storage_json_cache_size = int(os.getenv('STORAGE_JSON_CACHE_SIZE', '256'))
+
+        # Job ZIP downloads: deflate level 0-9 and threads building archives
+        self.archive_compression_level = int(os.getenv('ARCHIVE_COMPRESSION_LEVEL', '6'))
+        self.archive_workers = int(os.getenv('ARCHIVE_WORKERS', '2'))
+
+        # Metrics: event-loop lag sampling interval (0 = off) and per-job timings.json
+        self.metrics_loop_lag_interval = float(os.getenv('METRICS_LOOP_LAG_INTERVAL', '0.5'))
+        self.job_timings_enabled = os.getenv('JOB_TIMINGS_ENABLED', 'true').lower() == 'true'
+
+        # Pattern query API: parsed results indexes kept in memory (LRU) and max page size
+        self.results_index_cache_size = int(os.getenv('RESULTS_INDEX_CACHE_SIZE', '32'))
+        self.results_page_max = int(os.getenv('RESULTS_PAGE_MAX', '500'))
+
         # CSV caching  
         self.csv_cache_dir = os.getenv('CSV_CACHE_DIR', './cache')  
+        self.ingest_cache_enabled = os.getenv('INGEST_CACHE_ENABLED', 'true').lower() == 'true'
+        self.csv_cache_max_bytes = int(os.getenv('CSV_CACHE_MAX_BYTES', str(10 * 1024 ** 3)))
+
+        # Mining result caching; unseeded (stochastic) runs are only reused on opt-in
+        self.mining_cache_enabled = os.getenv('MINING_CACHE_ENABLED', 'true').lower() == 'true'
+        self.mining_cache_dir = os.getenv('MINING_CACHE_DIR', os.path.join(self.csv_cache_dir, 'mining'))
+        self.mining_cache_max_bytes = int(os.getenv('MINING_CACHE_MAX_BYTES', str(5 * 1024 ** 3)))
+        self.mining_cache_unseeded = os.getenv('MINING_CACHE_UNSEEDED', 'false').lower() == 'true'
+
+        # Tenants: identifying header and fair-share weights ("team-a=2,team-b=1", default 1)
+        self.tenant_header = os.getenv('TENANT_HEADER', 'X-Tenant-ID')
+        self.default_tenant = os.getenv('DEFAULT_TENANT', 'default')
+        self.tenant_weights = os.getenv('TENANT_WEIGHTS', '')
+
+        # Mining admission: per-tenant quotas on queued+running jobs and their estimated
+        # seconds, and the largest single job admitted (0 = no limit)
+        self.tenant_max_active_jobs = int(os.getenv('TENANT_MAX_ACTIVE_JOBS', '8'))
+        self.tenant_max_pending_seconds = float(os.getenv('TENANT_MAX_PENDING_SECONDS', '3600'))
+        self.mining_max_job_seconds = float(os.getenv('MINING_MAX_JOB_SECONDS', '0'))
+
+        # Deadlines: default and largest seconds a request may take (0 = no limit), the
+        # header clients ask for less with, and how often waiting requests check for disconnects
+        self.request_timeout = float(os.getenv('REQUEST_TIMEOUT', '0'))
+        self.request_max_timeout = float(os.getenv('REQUEST_MAX_TIMEOUT', '0'))
+        self.deadline_header = os.getenv('DEADLINE_HEADER', 'X-Request-Timeout')
+        self.disconnect_poll_interval = float(os.getenv('DISCONNECT_POLL_INTERVAL', '0.5'))
+        # Miner endpoint told to stop a job nobody waits for any more ('' = do not tell)
+        self.miner_cancel_path = os.getenv('MINER_CANCEL_PATH', '/cancel')
+
+        # Time-budgeted mining: share of the budget planned for (the rest absorbs estimate
+        # error), how far past it a run may go before it is stopped, and the calibration pass
+        self.mining_budget_headroom = float(os.getenv('MINING_BUDGET_HEADROOM', '0.8'))
+        self.mining_budget_grace = float(os.getenv('MINING_BUDGET_GRACE', '1.5'))
+        self.mining_calibration_nodes = int(os.getenv('MINING_CALIBRATION_NODES', '500'))
+        self.mining_calibration_timeout = float(os.getenv('MINING_CALIBRATION_TIMEOUT', '120'))
+
+        # Mining cost model: starting seconds per work unit, recalibrated from the runtime log
+        self.cost_seconds_per_unit = float(os.getenv('COST_SECONDS_PER_UNIT', '0.001'))
+        self.cost_calibration_log = os.getenv(
+            'COST_CALIBRATION_LOG', os.path.join(self.csv_cache_dir, 'cost_calibration.jsonl')
+        )
           
         # Shared volume  
         self.shared_volume_path = os.getenv('SHARED_VOLUME_PATH', '/shared/output')  
+
+        # Local output directory (results materialized for download, job archives)
+        self.local_output_dir = os.getenv('LOCAL_OUTPUT_DIR', '/app/output')
+
+        # Job data lifecycle across the shared volume and local output: disk budget (0 = no
+        # limit), idle seconds before a job is evicted (0 = never), how long a used job is
+        # kept regardless, how often to sweep, and where last-access times are kept
+        self.job_storage_max_bytes = int(os.getenv('JOB_STORAGE_MAX_BYTES', '0'))
+        self.job_ttl_seconds = float(os.getenv('JOB_TTL_SECONDS', '0'))
+        self.job_storage_min_idle = float(os.getenv('JOB_STORAGE_MIN_IDLE', '600'))
+        self.job_storage_sweep_interval = float(os.getenv('JOB_STORAGE_SWEEP_INTERVAL', '300'))
+        self.job_storage_index = os.getenv(
+            'JOB_STORAGE_INDEX', os.path.join(self.csv_cache_dir, 'job_storage.json')
+        )
   
 settings = Settings()
\ No newline at end of file
@@ -1,13 +1,38 @@
 """FastAPI application for Integration Service."""  
+from contextlib import asynccontextmanager
 from fastapi import FastAPI  
 from fastapi.middleware.cors import CORSMiddleware  
-from .api.pipeline import router  
+from fastapi.responses import PlainTextResponse
+from .api.pipeline import router, mining_scheduler, orchestration_service
 from .config.settings import settings  
+from .services.http_client import http_clients
+from .services.metrics import loop_lag_monitor, metrics
+from .services.progress_watcher import progress_hub
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared upstream clients, miner health probes, loop-lag sampling and job storage sweeps on startup; stop jobs and close clients on shutdown."""
+    await http_clients.start()
+    await orchestration_service.miner_service.pool.start()
+    await loop_lag_monitor.start()
+    await orchestration_service.job_storage.start()
+    try:
+        yield
+    finally:
+        await orchestration_service.job_storage.stop()
+        await loop_lag_monitor.stop()
+        await mining_scheduler.stop()
+        await orchestration_service.miner_service.pool.stop()
+        await progress_hub.close()
+        await http_clients.close()
+
   
 app = FastAPI(  
     title="NeuroGraph Integration Service",  
     description="Orchestration service for Neural Subgraph Mining pipeline",  
-    version="1.0.0"  
+    version="1.0.0",
+    lifespan=lifespan
 )  
   
 # CORS middleware  
@@ -26,6 +51,11 @@ app.include_router(router, prefix="/api")
 async def health_check():  
     """Health check endpoint."""  
     return {"status": "healthy", "service": "integration-service"}  
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Pipeline metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
   
 if __name__ == "__main__":  
     import uvicorn  
@@ -0,0 +1,126 @@
+"""Per-tenant admission control for mining jobs.
+
+Each tenant may have at most ``TENANT_MAX_ACTIVE_JOBS`` jobs queued or
+running, holding at most ``TENANT_MAX_PENDING_SECONDS`` of estimated work
+between them. A request over either limit is deferred: it is rejected with
+a hint for when capacity should free up. A single job estimated above
+``MINING_MAX_JOB_SECONDS`` is rejected outright. Dispatch order between
+admitted jobs is weighted fair share; see :class:`MiningScheduler`.
+"""
+import math
+import time
+from typing import Any, Dict, Iterable, Optional
+from .metrics import metrics
+from ..config.settings import settings
+
+REJECTIONS = metrics.counter(
+    "mining_admission_rejections_total", "Mining requests rejected or deferred at admission.", ["tenant", "reason"]
+)
+
+
+class AdmissionRejected(Exception):
+    """A mining request was not admitted.
+
+    ``retry_after`` (seconds) is set when the request may succeed later;
+    ``status_code`` is the HTTP status to answer with.
+    """
+
+    def __init__(self, detail: str, retry_after: Optional[float] = None, status_code: int = 429):
+        super().__init__(detail)
+        self.retry_after = None if retry_after is None else max(1, math.ceil(retry_after))
+        self.status_code = status_code
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse ``"team-a=2,team-b=0.5"`` into a weight per tenant."""
+    weights = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        tenant, _, weight = item.partition('=')
+        try:
+            weights[tenant.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid tenant weight '{item.strip()}', expected tenant=weight")
+    return weights
+
+
+def remaining_seconds(job, now: float = None) -> float:
+    """Estimated work left in a queued or running job."""
+    estimate = job.estimate["seconds"] if job.estimate else 0.0
+    if job.started_at is None:
+        return estimate
+    return max(0.0, estimate - ((now or time.time()) - job.started_at))
+
+
+class AdmissionController:
+    """Checks a tenant's queued and running work against its quota."""
+
+    def __init__(
+        self,
+        weights: Dict[str, float] = None,
+        max_active_jobs: int = None,
+        max_pending_seconds: float = None,
+        max_job_seconds: float = None
+    ):
+        self.weights = parse_weights(settings.tenant_weights) if weights is None else weights
+        self.max_active_jobs = max_active_jobs if max_active_jobs is not None else settings.tenant_max_active_jobs
+        self.max_pending_seconds = (
+            max_pending_seconds if max_pending_seconds is not None else settings.tenant_max_pending_seconds
+        )
+        self.max_job_seconds = max_job_seconds if max_job_seconds is not None else settings.mining_max_job_seconds
+
+    def weight(self, tenant_id: str) -> float:
+        return max(self.weights.get(tenant_id, 1.0), 1e-6)
+
+    def check(self, tenant_id: str, estimated_seconds: float, active_jobs: Iterable[Any]) -> None:
+        """Raise :class:`AdmissionRejected` unless the tenant may submit a job of this size.
+
+        ``active_jobs`` are the scheduler's queued and running jobs (of all tenants).
+        """
+        if self.max_job_seconds and estimated_seconds > self.max_job_seconds:
+            REJECTIONS.inc(tenant_id, "job_too_large")
+            raise AdmissionRejected(
+                f"Estimated mining time {estimated_seconds:.0f}s exceeds the per-job limit of "
+                f"{self.max_job_seconds:.0f}s; reduce n_neighborhoods, n_trials or max_pattern_size",
+                status_code=422
+            )
+
+        now = time.time()
+        own = [job for job in active_jobs if job.tenant_id == tenant_id]
+        remaining = [remaining_seconds(job, now) for job in own]
+        running = [r for job, r in zip(own, remaining) if job.started_at is not None]
+
+        if self.max_active_jobs and len(own) >= self.max_active_jobs:
+            REJECTIONS.inc(tenant_id, "active_jobs")
+            # A slot frees when the tenant's nearest job finishes
+            raise AdmissionRejected(
+                f"Tenant '{tenant_id}' already has {len(own)} mining jobs queued or running "
+                f"(limit {self.max_active_jobs})",
+                retry_after=min(running) if running else min(remaining, default=1.0)
+            )
+
+        pending = sum(remaining)
+        # A tenant with nothing pending is always admitted, however large the job
+        if own and self.max_pending_seconds and pending + estimated_seconds > self.max_pending_seconds:
+            REJECTIONS.inc(tenant_id, "pending_seconds")
+            overflow = pending + estimated_seconds - self.max_pending_seconds
+            raise AdmissionRejected(
+                f"Tenant '{tenant_id}' has {pending:.0f}s of mining pending; this job ({estimated_seconds:.0f}s) "
+                f"would exceed the quota of {self.max_pending_seconds:.0f}s",
+                retry_after=overflow / max(1, len(running))
+            )
+
+    def usage(self, active_jobs: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """Queued/running counts and pending estimated seconds per tenant."""
+        now = time.time()
+        tenants: Dict[str, Dict[str, Any]] = {}
+        for job in active_jobs:
+            entry = tenants.setdefault(job.tenant_id, {
+                "queued": 0, "running": 0, "pending_seconds": 0.0, "weight": self.weight(job.tenant_id)
+            })
+            entry["running" if job.started_at is not None else "queued"] += 1
+            entry["pending_seconds"] += remaining_seconds(job, now)
+        for entry in tenants.values():
+            entry["pending_seconds"] = round(entry["pending_seconds"], 1)
+        return tenants
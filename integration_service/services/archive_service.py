@@ -0,0 +1,182 @@
+"""Streaming, cached ZIP archives of job output."""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+from ..config.settings import settings
+
+# Formats that are already compressed; deflating them again only burns CPU
+STORED_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.svgz',
+    '.gz', '.tgz', '.zip', '.bz2', '.xz', '.7z', '.zst'
+}
+
+CHUNK_SIZE = 64 * 1024
+# Chunks allowed in flight between the zip thread and the response
+MAX_PENDING_CHUNKS = 16
+
+ArchiveFiles = List[Tuple[str, str]]
+
+
+class _ChunkWriter:
+    """Unseekable file object handed to ZipFile; batches writes into chunks."""
+
+    def __init__(self, emit: Callable[[bytes], None]):
+        self._emit = emit
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        if len(self._buffer) >= CHUNK_SIZE:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            chunk = bytes(self._buffer)
+            self._buffer.clear()
+            self._emit(chunk)
+
+    def close(self) -> None:
+        self.flush()
+
+
+class _Aborted(Exception):
+    pass
+
+
+class ArchiveService:
+    """Builds job archives, streaming them while they are generated.
+
+    Each archive is identified by an ETag derived from the names, sizes and
+    modification times of the files in it plus the compression level. A
+    finished archive is kept next to the job output (``<job_id>.zip`` with a
+    ``.etag`` sidecar) and reused until the directory content changes.
+    """
+
+    def __init__(self, compression_level: int = None, max_workers: int = None):
+        self.compression_level = (
+            compression_level if compression_level is not None else settings.archive_compression_level
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.archive_workers,
+            thread_name_prefix="archive"
+        )
+
+    def etag_for(self, files: ArchiveFiles) -> str:
+        digest = hashlib.sha256()
+        for path, arcname in files:
+            stat = os.stat(path)
+            digest.update(f"{arcname}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+        return f'"{digest.hexdigest()[:32]}-z{self.compression_level}"'
+
+    @staticmethod
+    def _sidecar(zip_path: str) -> str:
+        return f"{zip_path}.etag"
+
+    def cached_etag(self, zip_path: str) -> Optional[str]:
+        """ETag of the archive cached at ``zip_path``, if it is complete."""
+        try:
+            with open(self._sidecar(zip_path), 'r') as f:
+                etag = json.load(f)['etag']
+        except (OSError, ValueError, KeyError):
+            return None
+        return etag if os.path.exists(zip_path) else None
+
+    def _compress_type(self, arcname: str) -> int:
+        if os.path.splitext(arcname)[1].lower() in STORED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+    def _write_zip(self, fileobj, files: ArchiveFiles, should_abort: Callable[[], bool] = None) -> None:
+        with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED, compresslevel=self.compression_level) as archive:
+            for path, arcname in files:
+                if should_abort is not None and should_abort():
+                    raise _Aborted()
+                archive.write(path, arcname, compress_type=self._compress_type(arcname))
+
+    def _commit(self, tmp_path: str, zip_path: str, etag: str) -> None:
+        os.replace(tmp_path, zip_path)
+        sidecar_tmp = f"{self._sidecar(zip_path)}.tmp"
+        with open(sidecar_tmp, 'w') as f:
+            json.dump({'etag': etag}, f)
+        os.replace(sidecar_tmp, self._sidecar(zip_path))
+
+    def build(self, files: ArchiveFiles, zip_path: str, etag: str) -> str:
+        """Write the whole archive to ``zip_path`` (blocking) and record its ETag."""
+        if self.cached_etag(zip_path) == etag:
+            return zip_path
+        os.makedirs(os.path.dirname(zip_path) or '.', exist_ok=True)
+        tmp_path = f"{zip_path}.{threading.get_ident()}.part"
+        try:
+            with open(tmp_path, 'wb') as f:
+                self._write_zip(f, files)
+            self._commit(tmp_path, zip_path, etag)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return zip_path
+
+    async def build_async(self, files: ArchiveFiles, zip_path: str, etag: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.build, files, zip_path, etag)
+
+    async def stream(self, files: ArchiveFiles, zip_path: str, etag: str) -> AsyncIterator[bytes]:
+        """Yield the archive as it is compressed, caching it at ``zip_path`` when complete.
+
+        The first bytes go out as soon as the first file header is written. If
+        the consumer stops early the partial archive is discarded.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        credits = threading.Semaphore(MAX_PENDING_CHUNKS)
+        aborted = threading.Event()
+        done = object()
+
+        def emit(chunk: bytes) -> None:
+            # Back-pressure: wait for the response to drain before producing more
+            while not credits.acquire(timeout=0.5):
+                if aborted.is_set():
+                    raise _Aborted()
+            if aborted.is_set():
+                raise _Aborted()
+            loop.call_soon_threadsafe(queue.put_nowait, chunk)
+
+        def produce() -> None:
+            os.makedirs(os.path.dirname(zip_path) or '.', exist_ok=True)
+            tmp_path = f"{zip_path}.{threading.get_ident()}.part"
+            try:
+                with open(tmp_path, 'wb') as part:
+                    def tee(chunk: bytes) -> None:
+                        part.write(chunk)
+                        emit(chunk)
+                    self._write_zip(_ChunkWriter(tee), files, aborted.is_set)
+                self._commit(tmp_path, zip_path, etag)
+            except BaseException as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+                return
+            finally:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        producer = loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                credits.release()
+                yield item
+        finally:
+            aborted.set()
+            await asyncio.shield(asyncio.wait({producer}))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
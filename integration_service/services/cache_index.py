@@ -0,0 +1,93 @@
+"""Persistent, size-bounded LRU index shared by the on-disk caches."""
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+class CacheIndex:
+    """Maps cache keys to entry metadata and evicts least-recently-used entries.
+
+    Every entry records its ``size`` in bytes; when the total exceeds
+    ``max_bytes`` the oldest entries are dropped and returned to the caller,
+    which is responsible for deleting the data they point at. The index is
+    persisted as JSON so it survives restarts.
+    """
+
+    def __init__(self, index_path: str, max_bytes: int):
+        self.index_path = index_path
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            # A corrupt index only costs us cache hits; start over.
+            return
+        for key, entry in sorted(entries.items(), key=lambda item: item[1].get('last_access', 0)):
+            self.entries[key] = entry
+
+    def save(self) -> None:
+        """Atomically write the index to disk."""
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.index_path)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry.get('size', 0) for entry in self.entries.values())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for ``key`` and mark it recently used, counting hit/miss."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry['last_access'] = time.time()
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Insert or replace an entry and return the entries evicted to fit the budget."""
+        entry = dict(entry)
+        entry.setdefault('size', 0)
+        entry.setdefault('created_at', time.time())
+        entry['last_access'] = time.time()
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+
+        evicted = []
+        total = self.total_bytes
+        while total > self.max_bytes and len(self.entries) > 1:
+            old_key, old_entry = self.entries.popitem(last=False)
+            total -= old_entry.get('size', 0)
+            evicted.append(dict(old_entry, key=old_key))
+        self.evictions += len(evicted)
+        return evicted
+
+    def remove(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0
+        }
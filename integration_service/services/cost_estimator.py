@@ -0,0 +1,169 @@
+"""Runtime estimates for mining jobs, recalibrated from observed runtimes.
+
+A job's cost is measured in work units derived from the mining parameters
+and the graph size in the job metadata: sampling and embedding
+``n_neighborhoods`` neighborhoods, scoring every search step (``n_trials``
+runs growing patterns from ``min_pattern_size`` to ``max_pattern_size``)
+against all of them, and loading the graph. Units convert to seconds with
+a single factor that follows observed runtimes (an exponentially weighted
+average). Every observation is appended to the calibration log so the
+model can be refitted offline and the factor survives restarts.
+"""
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+from .graph_versions import version_metadata_path
+from .metrics import metrics
+from .miner_service import DEFAULT_MINING_CONFIG
+from .storage import storage
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Relative cost of one search step per strategy
+SEARCH_FACTORS = {'greedy': 1.0, 'mcts': 2.0, 'beam': 4.0}
+# Units per node or edge for loading and indexing the graph
+GRAPH_UNIT_WEIGHT = 0.01
+# Weight of the newest observation in the seconds-per-unit average
+CALIBRATION_ALPHA = 0.2
+# Observations replayed from the log on start-up
+CALIBRATION_REPLAY = 500
+
+NODE_KEYS = ('nodes', 'num_nodes', 'node_count', 'number_of_nodes')
+EDGE_KEYS = ('edges', 'num_edges', 'edge_count', 'number_of_edges')
+
+ESTIMATE_RATIO = metrics.histogram(
+    "mining_runtime_estimate_ratio", "Actual over estimated runtime of completed mining jobs.",
+    buckets=(0.25, 0.5, 0.8, 1.0, 1.25, 2.0, 4.0)
+)
+
+
+def graph_size(metadata: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """``(nodes, edges)`` from job metadata, or None if it does not say."""
+    def first(keys):
+        for key in keys:
+            if isinstance(metadata.get(key), (int, float)):
+                return int(metadata[key])
+        return None
+
+    nodes, edges = first(NODE_KEYS), first(EDGE_KEYS)
+    if nodes is None or edges is None:
+        return None
+    # Versioned metadata carries the base counts plus the changes since the base
+    changes = metadata.get('changes_since_base') or metadata.get('changes') or {}
+    nodes += changes.get('nodes_added', 0) - changes.get('nodes_removed', 0)
+    edges += changes.get('edges_added', 0) - changes.get('edges_removed', 0)
+    return max(nodes, 0), max(edges, 0)
+
+
+def work_units(mining_config: Dict[str, Any], nodes: int = 0, edges: int = 0) -> float:
+    """Size of a mining job in work units; see the module docstring."""
+    config = {**DEFAULT_MINING_CONFIG, **{k: v for k, v in mining_config.items() if v is not None}}
+    n_neighborhoods = int(config['n_neighborhoods'])
+    min_size, max_size = int(config['min_pattern_size']), int(config['max_pattern_size'])
+    pattern_steps = sum(range(min_size, max_size + 1))
+    search_factor = SEARCH_FACTORS.get(str(config['search_strategy']).lower(), 1.0)
+
+    sampling = n_neighborhoods * int(config['max_neighborhood_size'])
+    search = int(config['n_trials']) * pattern_steps * n_neighborhoods / 100 * search_factor
+    graph = (nodes + edges) * GRAPH_UNIT_WEIGHT
+    return sampling + search + graph
+
+
+class CostEstimator:
+    """Estimates mining runtimes and learns seconds per unit from completed jobs."""
+
+    def __init__(self, seconds_per_unit: float = None, log_path: str = None):
+        self.seconds_per_unit = seconds_per_unit or settings.cost_seconds_per_unit
+        self.log_path = settings.cost_calibration_log if log_path is None else log_path
+        self.observations = 0
+        self._replay()
+
+    def _replay(self) -> None:
+        if not self.log_path or not os.path.exists(self.log_path):
+            return
+        try:
+            with open(self.log_path, 'r') as f:
+                lines = f.readlines()[-CALIBRATION_REPLAY:]
+        except OSError:
+            return
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                self._learn(entry['units'], entry['actual_seconds'])
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    def _learn(self, units: float, actual_seconds: float) -> None:
+        if units <= 0 or actual_seconds <= 0:
+            return
+        observed = actual_seconds / units
+        self.seconds_per_unit += CALIBRATION_ALPHA * (observed - self.seconds_per_unit)
+        self.observations += 1
+
+    async def estimate(self, job_id: str, mining_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Estimated runtime of mining ``job_id`` with ``mining_config``.
+
+        ``graph_known`` is False when the job metadata has no graph size;
+        such estimates cover the mining parameters only.
+        """
+        size = None
+        metadata_path = version_metadata_path(job_id, int(mining_config.get('graph_version') or 0))
+        try:
+            size = graph_size(await storage.read_json(metadata_path, cached=True))
+        except (OSError, ValueError, AttributeError):
+            pass
+        nodes, edges = size or (0, 0)
+        return self.estimate_for_size(mining_config, nodes, edges, graph_known=size is not None)
+
+    def estimate_for_size(
+        self, mining_config: Dict[str, Any], nodes: int, edges: int, graph_known: bool = True
+    ) -> Dict[str, Any]:
+        """Estimated runtime of mining a graph of the given size with ``mining_config``."""
+        units = work_units(mining_config, nodes, edges)
+        return {
+            "seconds": units * self.seconds_per_unit,
+            "units": units,
+            "graph_known": graph_known,
+            "nodes": nodes,
+            "edges": edges
+        }
+
+    async def observe(
+        self,
+        job_id: str,
+        tenant_id: str,
+        estimate: Dict[str, Any],
+        actual_seconds: float,
+        mining_config: Dict[str, Any]
+    ) -> None:
+        """Log a completed job's estimated and actual runtime and recalibrate."""
+        ESTIMATE_RATIO.observe(actual_seconds / estimate["seconds"] if estimate["seconds"] else 0.0)
+        self._learn(estimate["units"], actual_seconds)
+        if not self.log_path:
+            return
+        entry = {
+            "time": time.time(),
+            "job_id": job_id,
+            "tenant_id": tenant_id,
+            "units": estimate["units"],
+            "estimated_seconds": round(estimate["seconds"], 3),
+            "actual_seconds": round(actual_seconds, 3),
+            "nodes": estimate["nodes"],
+            "edges": estimate["edges"],
+            "config": {k: mining_config.get(k) for k in DEFAULT_MINING_CONFIG if k in mining_config},
+            "seconds_per_unit": self.seconds_per_unit
+        }
+        try:
+            await storage.run(self._append, json.dumps(entry, default=str))
+        except OSError as e:
+            logger.warning("Could not write cost calibration log %s: %s", self.log_path, e)
+
+    def _append(self, line: str) -> None:
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.log_path, 'a') as f:
+            f.write(line + "\n")
@@ -0,0 +1,93 @@
+"""Request deadlines, carried from the API down to the upstream calls.
+
+A deadline is an absolute ``time.time()`` timestamp. Clients ask for one
+with the ``DEADLINE_HEADER`` header (seconds from now); ``REQUEST_TIMEOUT``
+is the default and ``REQUEST_MAX_TIMEOUT`` caps what a client may ask for.
+Work run under :func:`within` is cancelled when the deadline passes, which
+closes any in-flight httpx request, and :func:`deadline_headers` forwards
+the time left to upstreams so they can bound their own work.
+"""
+import asyncio
+import contextvars
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from .metrics import metrics
+from ..config.settings import settings
+
+_current: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('request_deadline', default=None)
+
+UPSTREAM_CANCELLATIONS = metrics.counter(
+    "upstream_cancellations_total",
+    "Upstream requests abandoned because the client went away or the deadline passed.",
+    ["upstream"]
+)
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before its work finished."""
+
+
+def deadline_from_timeout(timeout: Optional[str]) -> Optional[float]:
+    """Absolute deadline for a request asking for ``timeout`` seconds (None = default).
+
+    Raises ``ValueError`` for a value that is not a positive number.
+    """
+    seconds = settings.request_timeout
+    if timeout not in (None, ''):
+        try:
+            seconds = float(timeout)
+        except ValueError:
+            raise ValueError(f"{settings.deadline_header} must be a number of seconds, got '{timeout}'")
+        if not seconds > 0:
+            raise ValueError(f"{settings.deadline_header} must be positive, got '{timeout}'")
+    if settings.request_max_timeout:
+        seconds = min(seconds, settings.request_max_timeout) if seconds else settings.request_max_timeout
+    return time.time() + seconds if seconds else None
+
+
+def current_deadline() -> Optional[float]:
+    return _current.get()
+
+
+def remaining(deadline: Optional[float] = None) -> Optional[float]:
+    """Seconds left before ``deadline`` (default: the current one), or None without one."""
+    deadline = current_deadline() if deadline is None else deadline
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.time())
+
+
+def deadline_headers() -> Dict[str, str]:
+    """Header telling an upstream how long the caller will still wait."""
+    left = remaining()
+    if left is None:
+        return {}
+    return {settings.deadline_header: f"{left:.3f}"}
+
+
+@asynccontextmanager
+async def within(deadline: Optional[float]) -> AsyncIterator[None]:
+    """Run the block under ``deadline``, cancelling it and raising ``DeadlineExceeded`` once it passes.
+
+    Nested blocks keep the earlier of the two deadlines. ``None`` means no
+    deadline of its own.
+    """
+    outer = current_deadline()
+    if deadline is None or (outer is not None and outer <= deadline):
+        yield
+        return
+
+    left = deadline - time.time()
+    if left <= 0:
+        raise DeadlineExceeded("Deadline exceeded before the work started")
+    token = _current.set(deadline)
+    try:
+        async with asyncio.timeout(left) as timeout:
+            yield
+    except TimeoutError:
+        if not timeout.expired():
+            raise
+        raise DeadlineExceeded(f"Deadline of {left:.1f}s exceeded")
+    finally:
+        _current.reset(token)
@@ -0,0 +1,41 @@
+"""Content fingerprints for files on the shared volume."""
+import hashlib
+import os
+from typing import Dict, Tuple
+from .storage import storage
+
+_CHUNK_SIZE = 1024 * 1024
+
+# (path, size, mtime_ns) -> hex digest; avoids rehashing unchanged graphs
+_digest_cache: Dict[Tuple[str, int, int], str] = {}
+_DIGEST_CACHE_LIMIT = 256
+
+
+def _sha256_sync(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def file_sha256(path: str) -> str:
+    """Return the SHA-256 of a file, hashed on the storage pool in chunks.
+
+    Results are memoized on (path, size, mtime) so repeated requests for an
+    unchanged file cost a single stat.
+    """
+    stat = await storage.run(os.stat, path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    cached = _digest_cache.get(key)
+    if cached is not None:
+        return cached
+
+    digest = await storage.run(_sha256_sync, path)
+    if len(_digest_cache) >= _DIGEST_CACHE_LIMIT:
+        _digest_cache.pop(next(iter(_digest_cache)))
+    _digest_cache[key] = digest
+    return digest
@@ -0,0 +1,278 @@
+"""Versioned job graphs: CSV deltas applied on top of the graph AtomSpace built.
+
+Layout inside a job directory on the shared volume::
+
+    networkx_graph.pkl              version 0, as built by AtomSpace
+    networkx_metadata.json          metadata of version 0
+    versions.json                   index of all versions
+    networkx_metadata.v<N>.json     metadata of version N (version 0's sizes plus the changes since)
+    deltas/v<N>.json                parsed delta that turns version N-1 into N
+    versions/v<N>/networkx_graph.pkl  version N, once materialized
+
+Adding a version only parses and stores the delta, so its cost scales
+with the delta rather than the graph. The full graph of a version is
+materialized on first use from the nearest materialized ancestor.
+"""
+import asyncio
+import csv
+import io
+import json
+import os
+import time
+from typing import Any, BinaryIO, Dict, Hashable, List, Optional, Tuple
+import networkx as nx
+from .graph_partition import load_graph, save_graph
+from .metrics import stage_timer
+from .storage import storage
+
+GRAPH_FILE = "networkx_graph.pkl"
+METADATA_FILE = "networkx_metadata.json"
+VERSIONS_FILE = "versions.json"
+
+# Values of the optional ``op`` column
+ADD_OPS = ('', 'add', 'added', 'insert', '+')
+REMOVE_OPS = ('remove', 'removed', 'delete', 'deleted', '-')
+
+DeltaFile = Tuple[str, BinaryIO]
+
+
+class VersionConflict(Exception):
+    """The delta was based on a version that is no longer the latest."""
+
+
+def delta_path(job_id: str, version: int) -> str:
+    return storage.shared_path(job_id, "deltas", f"v{version}.json")
+
+
+def version_graph_path(job_id: str, version: int) -> str:
+    if version == 0:
+        return storage.shared_path(job_id, GRAPH_FILE)
+    return storage.shared_path(job_id, "versions", f"v{version}", GRAPH_FILE)
+
+
+def version_metadata_path(job_id: str, version: int) -> str:
+    if version == 0:
+        return storage.shared_path(job_id, METADATA_FILE)
+    return storage.shared_path(job_id, f"networkx_metadata.v{version}.json")
+
+
+def _coerce(value: str) -> Any:
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _empty_delta() -> Dict[str, list]:
+    return {"nodes_added": [], "nodes_removed": [], "edges_added": [], "edges_removed": []}
+
+
+def parse_delta_csv(name: str, fileobj: BinaryIO, delta: Dict[str, list]) -> None:
+    """Append the rows of one delta CSV to ``delta`` (blocking).
+
+    Edge files have ``source`` and ``target`` columns, node files an ``id``
+    column. An optional ``op`` column says ``add`` (the default) or
+    ``remove``; every other non-empty column becomes an attribute.
+    """
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        _parse_rows(name, csv.DictReader(text), delta)
+    finally:
+        # Leave the caller's file open
+        text.detach()
+
+
+def _parse_rows(name: str, reader: csv.DictReader, delta: Dict[str, list]) -> None:
+    columns = {c.strip().lower(): c for c in reader.fieldnames or []}
+    if 'source' in columns and 'target' in columns:
+        kind, keys = 'edges', (columns['source'], columns['target'])
+    elif 'id' in columns:
+        kind, keys = 'nodes', (columns['id'],)
+    else:
+        raise ValueError(f"{name}: delta CSVs need an 'id' column (nodes) or 'source' and 'target' columns (edges)")
+    op_column = columns.get('op')
+
+    for line, row in enumerate(reader, start=2):
+        op = (row.get(op_column) or '').strip().lower() if op_column else ''
+        ids = [(row.get(key) or '').strip() for key in keys]
+        if not all(ids):
+            raise ValueError(f"{name}:{line}: missing {' or '.join(keys)}")
+        if op in ADD_OPS:
+            attrs = {
+                column: _coerce(value)
+                for column, value in row.items()
+                if column not in keys and column != op_column and column is not None and value not in (None, '')
+            }
+            delta[f"{kind}_added"].append([*ids, attrs])
+        elif op in REMOVE_OPS:
+            delta[f"{kind}_removed"].append(ids)
+        else:
+            raise ValueError(f"{name}:{line}: unknown op '{op}'")
+
+
+def _resolve(graph: nx.Graph, raw: str, int_ids: bool) -> Hashable:
+    """Map a CSV id onto the graph's node ids, which may be ints."""
+    if raw in graph:
+        return raw
+    try:
+        number = int(raw)
+    except ValueError:
+        return raw
+    return number if int_ids or number in graph else raw
+
+
+def apply_delta(graph: nx.Graph, delta: Dict[str, list]) -> Dict[str, int]:
+    """Apply a parsed delta in place: removals first, then additions.
+
+    Removing and re-adding an element in one delta therefore replaces it.
+    Removals of elements that do not exist are counted as skipped.
+    """
+    # New ids follow the type of the existing ones
+    int_ids = isinstance(next(iter(graph), None), int)
+    skipped = 0
+    for source, target in delta["edges_removed"]:
+        u, v = _resolve(graph, source, int_ids), _resolve(graph, target, int_ids)
+        if graph.has_edge(u, v):
+            graph.remove_edge(u, v)
+        else:
+            skipped += 1
+    for (node,) in delta["nodes_removed"]:
+        node = _resolve(graph, node, int_ids)
+        if node in graph:
+            graph.remove_node(node)
+        else:
+            skipped += 1
+    for node, attrs in delta["nodes_added"]:
+        graph.add_node(_resolve(graph, node, int_ids), **attrs)
+    for source, target, attrs in delta["edges_added"]:
+        graph.add_edge(_resolve(graph, source, int_ids), _resolve(graph, target, int_ids), **attrs)
+    return {"skipped": skipped}
+
+
+def _base_entry(job_id: str) -> Dict[str, Any]:
+    stat = os.stat(version_graph_path(job_id, 0))
+    return {"version": 0, "parent": None, "created_at": stat.st_mtime, "graph_file": GRAPH_FILE}
+
+
+class GraphVersions:
+    """Adds versions to job graphs and materializes them on demand."""
+
+    def __init__(self):
+        self._job_locks: Dict[str, asyncio.Lock] = {}
+        self._build_locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+
+    def _job_lock(self, job_id: str) -> asyncio.Lock:
+        return self._job_locks.setdefault(job_id, asyncio.Lock())
+
+    async def index(self, job_id: str) -> Dict[str, Any]:
+        """The job's version index; a job without deltas has only version 0."""
+        if not await storage.exists(version_graph_path(job_id, 0)):
+            raise FileNotFoundError(f"NetworkX file not found for job_id: {job_id}")
+        try:
+            return await storage.read_json(storage.shared_path(job_id, VERSIONS_FILE))
+        except FileNotFoundError:
+            return {"job_id": job_id, "latest": 0, "versions": [await storage.run(_base_entry, job_id)]}
+
+    async def _save_index(self, job_id: str, index: Dict[str, Any]) -> None:
+        await storage.write_json(storage.shared_path(job_id, VERSIONS_FILE), index)
+
+    async def add_delta(self, job_id: str, files: List[DeltaFile], base_version: int = None) -> Dict[str, Any]:
+        """Record ``files`` (delta CSVs) as a new version of the job's graph.
+
+        With ``base_version`` the update is rejected with
+        :class:`VersionConflict` unless that is still the latest version.
+        """
+        async with stage_timer('graph_update', job_id), self._job_lock(job_id):
+            index = await self.index(job_id)
+            parent = index["latest"]
+            if base_version is not None and base_version != parent:
+                raise VersionConflict(f"Version {base_version} is not the latest version ({parent}) of job {job_id}")
+
+            delta = _empty_delta()
+            for name, fileobj in files:
+                await storage.run(parse_delta_csv, name, fileobj, delta)
+            version = parent + 1
+            await storage.write_json(delta_path(job_id, version), {"version": version, "parent": parent, **delta})
+
+            changes = {key: len(rows) for key, rows in delta.items()}
+            entry = {
+                "version": version,
+                "parent": parent,
+                "created_at": time.time(),
+                "delta_file": f"deltas/v{version}.json",
+                "source_files": [name for name, _ in files],
+                "changes": changes,
+                "graph_file": None
+            }
+            try:
+                metadata = await storage.read_json(version_metadata_path(job_id, parent))
+            except FileNotFoundError:
+                metadata = {}
+            # The size fields stay those of version 0, so carry the changes of every version since
+            previous = (metadata.get('changes_since_base') or metadata.get('changes') or {}) if parent else {}
+            since_base = {key: count + previous.get(key, 0) for key, count in changes.items()}
+            metadata.update(
+                graph_version=version, parent_version=parent, changes=changes, changes_since_base=since_base
+            )
+            await storage.write_json(version_metadata_path(job_id, version), metadata)
+
+            index["versions"].append(entry)
+            index["latest"] = version
+            await self._save_index(job_id, index)
+            return entry
+
+    async def graph_file(self, job_id: str, version: Optional[int] = None) -> Tuple[int, str]:
+        """Return ``(version, path)`` of a version's graph, materializing it if needed.
+
+        ``version`` defaults to the latest one.
+        """
+        index = await self.index(job_id)
+        if version is None:
+            version = index["latest"]
+        if not 0 <= version <= index["latest"]:
+            raise ValueError(f"Job {job_id} has no graph version {version} (latest is {index['latest']})")
+
+        path = version_graph_path(job_id, version)
+        if await storage.exists(path):
+            return version, path
+
+        lock = self._build_locks.setdefault((job_id, version), asyncio.Lock())
+        async with lock:
+            if not await storage.exists(path):
+                await self._materialize(job_id, version, index)
+        return version, path
+
+    async def _materialize(self, job_id: str, version: int, index: Dict[str, Any]) -> None:
+        base = version
+        while base > 0 and not await storage.exists(version_graph_path(job_id, base)):
+            base -= 1
+
+        async with stage_timer('graph_materialize', job_id):
+            def build() -> Dict[str, Any]:
+                graph = load_graph(version_graph_path(job_id, base))
+                skipped = 0
+                for step in range(base + 1, version + 1):
+                    with open(delta_path(job_id, step), 'rb') as f:
+                        skipped += apply_delta(graph, json.load(f))["skipped"]
+                path = version_graph_path(job_id, version)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                save_graph(graph, path)
+                return {"nodes": graph.number_of_nodes(), "edges": graph.number_of_edges(), "skipped": skipped}
+
+            built = await storage.run(build)
+
+        async with self._job_lock(job_id):
+            index = await self.index(job_id)
+            for entry in index["versions"]:
+                if entry["version"] == version:
+                    entry.update(
+                        graph_file=os.path.relpath(version_graph_path(job_id, version), storage.shared_path(job_id)),
+                        nodes=built["nodes"],
+                        edges=built["edges"],
+                        skipped_removals=built["skipped"],
+                        materialized_from=base
+                    )
+            await self._save_index(job_id, index)
+
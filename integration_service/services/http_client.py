@@ -0,0 +1,83 @@
+"""Shared, pooled HTTP clients for upstream services."""
+import logging
+from typing import Dict
+import httpx
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+UPSTREAMS = ('atomspace', 'miner')
+
+
+class HTTPClientManager:
+    """Owns one long-lived AsyncClient per upstream service.
+
+    Clients are opened in the application lifespan and reused by every
+    request so connections, pools and DNS lookups are kept warm.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _timeout(self, upstream: str) -> httpx.Timeout:
+        if upstream == 'atomspace':
+            connect = settings.atomspace_connect_timeout
+            read = settings.atomspace_read_timeout
+            write = settings.atomspace_write_timeout
+        elif upstream == 'miner':
+            connect = settings.miner_connect_timeout
+            read = settings.miner_read_timeout
+            write = settings.miner_write_timeout
+        else:
+            raise ValueError(f"Unknown upstream: {upstream}")
+
+        return httpx.Timeout(
+            connect=connect,
+            read=read,
+            write=write,
+            pool=settings.http_pool_timeout
+        )
+
+    def _http2_available(self) -> bool:
+        if not settings.http2_enabled:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1")
+            return False
+        return True
+
+    def _build_client(self, upstream: str) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        )
+        return httpx.AsyncClient(
+            timeout=self._timeout(upstream),
+            limits=limits,
+            http2=self._http2_available()
+        )
+
+    def get(self, upstream: str) -> httpx.AsyncClient:
+        """Return the shared client for an upstream, creating it on first use."""
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            client = self._build_client(upstream)
+            self._clients[upstream] = client
+        return client
+
+    async def start(self) -> None:
+        """Open a client for every known upstream."""
+        for upstream in UPSTREAMS:
+            self.get(upstream)
+
+    async def close(self) -> None:
+        """Close all clients and release their connections."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+http_clients = HTTPClientManager()
@@ -0,0 +1,137 @@
+"""Content-addressed cache of AtomSpace ingests, stored under CSV_CACHE_DIR."""
+import hashlib
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+from .cache_index import CacheIndex
+from .multipart import iter_source, source_filename
+from .storage import storage
+from ..config.settings import settings
+
+GRAPH_FILE = "networkx_graph.pkl"
+METADATA_FILE = "networkx_metadata.json"
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hardlink ``src`` to ``dst``, copying when they live on different filesystems."""
+    if os.path.exists(dst):
+        os.unlink(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class IngestCache:
+    """Maps a hash of the ingest inputs to a previously built AtomSpace job.
+
+    The key is a streaming SHA-256 over every CSV (name and content), the
+    config, schema, writer type, graph type and tenant. A copy of the job's
+    ``networkx_graph.pkl`` (hardlinked when possible) is kept under
+    ``<CSV_CACHE_DIR>/graphs/<key>`` so a hit survives the original job
+    directory being removed.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or settings.csv_cache_dir
+        self.index = CacheIndex(
+            os.path.join(self.cache_dir, "ingest_index.json"),
+            max_bytes if max_bytes is not None else settings.csv_cache_max_bytes
+        )
+
+    async def key_for(
+        self,
+        csv_files: List[Any],
+        config: str,
+        schema_json: str,
+        writer_type: str,
+        graph_type: str,
+        tenant_id: str
+    ) -> str:
+        """Hash the ingest inputs without loading any CSV fully into memory."""
+        digest = hashlib.sha256()
+        for value in (config, schema_json, writer_type, graph_type, tenant_id):
+            encoded = (value or '').encode('utf-8')
+            digest.update(len(encoded).to_bytes(8, 'big'))
+            digest.update(encoded)
+
+        for source in csv_files:
+            digest.update(source_filename(source).encode('utf-8') + b"\0")
+            async for chunk in iter_source(source, settings.upload_chunk_size):
+                digest.update(chunk)
+            digest.update(b"\0")
+
+        return digest.hexdigest()
+
+    def _blob_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "graphs", key)
+
+    def _restore(self, key: str, job_id: str) -> bool:
+        """Make sure the cached job's graph exists on the shared volume."""
+        job_dir = os.path.join(settings.shared_volume_path, job_id)
+        if os.path.exists(os.path.join(job_dir, GRAPH_FILE)):
+            return True
+
+        blob_dir = self._blob_dir(key)
+        if not os.path.exists(os.path.join(blob_dir, GRAPH_FILE)):
+            return False
+
+        os.makedirs(job_dir, exist_ok=True)
+        for name in (GRAPH_FILE, METADATA_FILE):
+            if os.path.exists(os.path.join(blob_dir, name)):
+                _link_or_copy(os.path.join(blob_dir, name), os.path.join(job_dir, name))
+        return True
+
+    async def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached job for ``key``, or None on a miss."""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+
+        if not await storage.run(self._restore, key, entry['job_id']):
+            # Both the job and our copy are gone; treat as a miss.
+            self.index.hits -= 1
+            self.index.misses += 1
+            self.index.remove(key)
+            await storage.run(self.index.save)
+            return None
+
+        await storage.run(self.index.save)
+        return entry
+
+    def _store_blob(self, key: str, job_id: str) -> int:
+        job_dir = os.path.join(settings.shared_volume_path, job_id)
+        blob_dir = self._blob_dir(key)
+        os.makedirs(blob_dir, exist_ok=True)
+
+        size = 0
+        for name in (GRAPH_FILE, METADATA_FILE):
+            src = os.path.join(job_dir, name)
+            if os.path.exists(src):
+                _link_or_copy(src, os.path.join(blob_dir, name))
+                size += os.path.getsize(src)
+        return size
+
+    def _evict(self, evicted: List[Dict[str, Any]]) -> None:
+        for entry in evicted:
+            shutil.rmtree(self._blob_dir(entry['key']), ignore_errors=True)
+        self.index.save()
+
+    async def store(self, key: str, job_id: str) -> None:
+        """Record a freshly built job under ``key`` and evict to stay within budget."""
+        graph_path = os.path.join(settings.shared_volume_path, job_id, GRAPH_FILE)
+        if not await storage.exists(graph_path):
+            return
+
+        size = await storage.run(self._store_blob, key, job_id)
+        evicted = self.index.put(key, {'job_id': job_id, 'size': size})
+        await storage.run(self._evict, evicted)
+
+    async def forget_job(self, job_id: str) -> None:
+        """Drop the entries that point at ``job_id``, e.g. once its graph has changed."""
+        keys = [key for key, entry in self.index.entries.items() if entry.get('job_id') == job_id]
+        if keys:
+            await storage.run(self._evict, [dict(self.index.remove(key), key=key) for key in keys])
+
+    def stats(self) -> Dict[str, Any]:
+        return self.index.stats()
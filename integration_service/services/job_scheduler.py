@@ -0,0 +1,343 @@
+"""Asynchronous scheduler for mining jobs with priority lanes and bounded concurrency."""
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from .admission import AdmissionController
+from .cost_estimator import CostEstimator
+from .deadlines import DeadlineExceeded, within
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {'high': 0, 'normal': 1, 'low': 2}
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+EXPIRED = 'expired'
+FINISHED_STATES = (DONE, FAILED, CANCELLED, EXPIRED)
+
+
+class ScheduledJob:
+    """A mining request tracked by the scheduler."""
+
+    def __init__(
+        self,
+        job_id: str,
+        mining_config: Dict[str, Any],
+        priority: str,
+        tenant_id: str = None,
+        estimate: Dict[str, Any] = None,
+        deadline: float = None
+    ):
+        self.task_id = uuid.uuid4().hex
+        self.job_id = job_id
+        self.mining_config = mining_config
+        self.priority = priority
+        self.tenant_id = tenant_id or settings.default_tenant
+        self.estimate = estimate
+        # Absolute time.time() by which the caller needs the result, if any
+        self.deadline = deadline
+        # Virtual start time under weighted fair share; set by the scheduler
+        self.fair_tag = 0.0
+        self.state = QUEUED
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self.finished = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "task_id": self.task_id,
+            "job_id": self.job_id,
+            "state": self.state,
+            "priority": self.priority,
+            "tenant_id": self.tenant_id,
+            "estimated_seconds": round(self.estimate["seconds"], 1) if self.estimate else None,
+            "deadline": self.deadline,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class MiningScheduler:
+    """Queues mining jobs and runs at most ``max_in_flight`` of them at once.
+
+    Jobs are taken from the ``high`` lane before ``normal`` before ``low``.
+    Within a lane tenants get weighted fair share (start-time fair queuing
+    over estimated runtimes): each job is tagged with the virtual time at
+    which its tenant's earlier work ends, so a tenant that submits many or
+    expensive jobs does not delay others, and one tenant's jobs stay
+    first-in first-out. Submissions go through admission control first.
+    A job with a deadline expires when it passes, whether queued or running.
+
+    ``run_job`` is called as ``run_job(job_id, mining_config)`` and should
+    return the pipeline's result dict; a result with ``status == 'error'``
+    marks the job failed.
+    """
+
+    def __init__(
+        self,
+        run_job: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        max_in_flight: int = None,
+        history_limit: int = None,
+        admission: AdmissionController = None,
+        estimator: CostEstimator = None
+    ):
+        self.run_job = run_job
+        self.max_in_flight = max_in_flight or settings.miner_max_in_flight * len(settings.miner_urls)
+        self.history_limit = history_limit or settings.scheduler_history_limit
+        self.admission = admission or AdmissionController()
+        self.estimator = estimator or CostEstimator()
+        self.jobs: "OrderedDict[str, ScheduledJob]" = OrderedDict()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._tenant_tags: Dict[str, float] = {}
+
+    def _ensure_started(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"mining-worker-{i}")
+            for i in range(self.max_in_flight)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel workers and any running or queued jobs."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for job in self.jobs.values():
+            if job.state == QUEUED:
+                self._finish(job, CANCELLED)
+        self._queue = None
+
+    async def submit(
+        self,
+        job_id: str,
+        mining_config: Dict[str, Any],
+        priority: str = 'normal',
+        tenant_id: str = None,
+        deadline: float = None
+    ) -> ScheduledJob:
+        """Queue a job and return its handle immediately.
+
+        Raises ``AdmissionRejected`` when the tenant is over its quota.
+        A job still unfinished at ``deadline`` (a ``time.time()`` timestamp)
+        is stopped and ends ``expired``.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {list(PRIORITIES)}")
+
+        tenant_id = tenant_id or settings.default_tenant
+        estimate = await self.estimator.estimate(job_id, mining_config)
+        self.admission.check(tenant_id, estimate["seconds"], self._active_jobs())
+
+        self._ensure_started()
+        job = ScheduledJob(job_id, mining_config, priority, tenant_id, estimate, deadline)
+        start = max(self._virtual_time, self._tenant_tags.get(tenant_id, 0.0))
+        job.fair_tag = start
+        self._tenant_tags[tenant_id] = start + max(estimate["seconds"], 1e-3) / self.admission.weight(tenant_id)
+        self.jobs[job.task_id] = job
+        self._queue.put_nowait((PRIORITIES[priority], job.fair_tag, next(self._sequence), job.task_id))
+        self._trim_history()
+        if deadline is not None:
+            # Running jobs are stopped by their own timeout; this only catches queued ones
+            asyncio.get_running_loop().call_later(max(0.0, deadline - time.time()), self._expire, job)
+        return job
+
+    @asynccontextmanager
+    async def track(
+        self,
+        job_id: str,
+        mining_config: Dict[str, Any],
+        tenant_id: str = None,
+        priority: str = 'normal',
+        estimate: Dict[str, Any] = None
+    ) -> AsyncIterator[ScheduledJob]:
+        """Admit and account for mining work run outside the queue, e.g. a calibration pass.
+
+        The work goes through the tenant's admission check like a submitted
+        job (raising ``AdmissionRejected``) and counts as one of its running
+        jobs until the block exits. It takes no dispatch slot; the miner
+        pool's own limit still applies to its requests. ``estimate``
+        defaults to the cost model's estimate for ``job_id``.
+        """
+        tenant_id = tenant_id or settings.default_tenant
+        if estimate is None:
+            estimate = await self.estimator.estimate(job_id, mining_config)
+        self.admission.check(tenant_id, estimate["seconds"], self._active_jobs())
+
+        job = ScheduledJob(job_id, mining_config, priority, tenant_id, estimate)
+        job.state = RUNNING
+        job.started_at = time.time()
+        job.task = asyncio.current_task()
+        self.jobs[job.task_id] = job
+        self._trim_history()
+        try:
+            yield job
+        except asyncio.CancelledError:
+            self._finish(job, CANCELLED)
+            raise
+        except DeadlineExceeded as e:
+            self._finish(job, EXPIRED, error=str(e))
+            raise
+        except Exception as e:
+            self._finish(job, FAILED, error=str(e))
+            raise
+        self._finish(job, DONE)
+
+    def _expire(self, job: ScheduledJob) -> None:
+        if job.state == QUEUED:
+            self._finish(job, EXPIRED, error="Deadline exceeded while queued")
+
+    def _active_jobs(self) -> List[ScheduledJob]:
+        return [job for job in self.jobs.values() if job.state in (QUEUED, RUNNING)]
+
+    def active_job_ids(self) -> List[str]:
+        """Ids of the jobs (graph jobs, not tasks) that are queued or running."""
+        return [job.job_id for job in self._active_jobs()]
+
+    def get(self, task_id: str) -> Optional[ScheduledJob]:
+        return self.jobs.get(task_id)
+
+    async def wait(self, task_id: str) -> ScheduledJob:
+        job = self.jobs[task_id]
+        await job.finished.wait()
+        return job
+
+    async def cancel(self, task_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if it had already finished."""
+        job = self.jobs.get(task_id)
+        if job is None:
+            raise KeyError(task_id)
+        if job.state in FINISHED_STATES:
+            return False
+
+        if job.state == QUEUED:
+            # The worker skips cancelled entries when it dequeues them.
+            self._finish(job, CANCELLED)
+        elif job.task is not None:
+            job.task.cancel()
+            await job.finished.wait()
+        return True
+
+    def position(self, task_id: str) -> Optional[int]:
+        """Zero-based position of a queued job in dispatch order."""
+        job = self.jobs.get(task_id)
+        if job is None or job.state != QUEUED:
+            return None
+        queued = sorted(
+            (j for j in self.jobs.values() if j.state == QUEUED),
+            key=lambda j: (PRIORITIES[j.priority], j.fair_tag, j.submitted_at)
+        )
+        return queued.index(job)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.state == QUEUED)
+
+    @property
+    def in_flight(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.state == RUNNING)
+
+    def stats(self) -> Dict[str, Any]:
+        lanes = {name: 0 for name in PRIORITIES}
+        for job in self.jobs.values():
+            if job.state == QUEUED:
+                lanes[job.priority] += 1
+        return {
+            "queued": self.queue_depth,
+            "running": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "lanes": lanes,
+            "tenants": self.admission.usage(self._active_jobs()),
+            "seconds_per_unit": self.estimator.seconds_per_unit
+        }
+
+    def _finish(self, job: ScheduledJob, state: str, result: Dict[str, Any] = None, error: str = None) -> None:
+        job.state = state
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.finished.set()
+
+    def _trim_history(self) -> None:
+        excess = len(self.jobs) - self.history_limit
+        if excess <= 0:
+            return
+        for task_id in [tid for tid, job in self.jobs.items() if job.state in FINISHED_STATES][:excess]:
+            del self.jobs[task_id]
+
+    async def _worker(self) -> None:
+        while True:
+            _, fair_tag, _, task_id = await self._queue.get()
+            job = self.jobs.get(task_id)
+            if job is None or job.state != QUEUED:
+                continue
+            self._virtual_time = max(self._virtual_time, fair_tag)
+
+            job.state = RUNNING
+            job.started_at = time.time()
+            job.task = asyncio.create_task(self._run(job))
+            try:
+                await asyncio.wait({job.task})
+            except asyncio.CancelledError:
+                # The scheduler is shutting down; take the running job with it.
+                job.task.cancel()
+                await asyncio.gather(job.task, return_exceptions=True)
+                self._finish(job, CANCELLED)
+                raise
+
+            if job.task.cancelled():
+                self._finish(job, CANCELLED)
+            elif isinstance(job.task.exception(), DeadlineExceeded):
+                self._finish(job, EXPIRED, error=str(job.task.exception()))
+            elif job.task.exception() is not None:
+                logger.exception("Mining job %s failed", job.task_id, exc_info=job.task.exception())
+                self._finish(job, FAILED, error=str(job.task.exception()))
+            else:
+                result = job.task.result()
+                if isinstance(result, dict) and result.get('status') == 'error':
+                    self._finish(job, FAILED, result=result, error=result.get('error'))
+                else:
+                    self._finish(job, DONE, result=result)
+                    await self._calibrate(job)
+
+    async def _run(self, job: ScheduledJob) -> Dict[str, Any]:
+        async with within(job.deadline):
+            return await self.run_job(job.job_id, job.mining_config)
+
+    async def _calibrate(self, job: ScheduledJob) -> None:
+        """Feed a completed run into the cost model.
+
+        Cache hits never reached the miner, coalesced jobs joined a run
+        part-way, and jobs without a known graph size would skew the fit, so
+        none of them is recorded.
+        """
+        result = job.result or {}
+        if not job.estimate or not job.estimate["graph_known"] or result.get('cache_hit') or result.get('coalesced'):
+            return
+        try:
+            await self.estimator.observe(
+                job.job_id, job.tenant_id, job.estimate, job.finished_at - job.started_at, job.mining_config
+            )
+        except Exception:
+            logger.exception("Could not record the runtime of mining job %s", job.task_id)
@@ -0,0 +1,267 @@
+"""Disk budget for job data on the shared volume and in the local output directory.
+
+Everything a job leaves behind is named after its id: ``<root>/<job_id>``,
+the derived jobs of shards, sweeps and calibration (``<job_id>__*``) and the
+download archive with its sidecars (``<job_id>.zip*``). :class:`JobStorage`
+groups those paths per job, keeps each job's last access in a small JSON
+index and evicts jobs that have been idle longer than ``JOB_TTL_SECONDS``,
+then the least recently used ones until the total fits
+``JOB_STORAGE_MAX_BYTES``. Jobs a guard reports as queued or running, and
+jobs used within ``JOB_STORAGE_MIN_IDLE``, are never evicted.
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from .metrics import metrics
+from .storage import storage
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Separates a job id from the suffix of the jobs derived from it
+DERIVED_SEPARATOR = "__"
+ARCHIVE_MARKER = ".zip"
+
+EVICTIONS = metrics.counter(
+    "job_storage_evictions_total", "Jobs whose data was removed to free disk space.", ["reason"]
+)
+EVICTED_BYTES = metrics.counter(
+    "job_storage_evicted_bytes_total", "Disk space freed by evicting job data.", ["reason"]
+)
+
+
+def base_job_id(name: str) -> str:
+    """Job a directory or archive under an output root belongs to."""
+    if ARCHIVE_MARKER in name:
+        name = name.split(ARCHIVE_MARKER, 1)[0]
+    return name.split(DERIVED_SEPARATOR, 1)[0]
+
+
+def _scan_path(path: str, inodes: Dict[Tuple[int, int], List[int]]) -> None:
+    """Record every inode under ``path`` as ``[size, links, links seen]``, not following symlinks."""
+    def record(entry: str) -> None:
+        try:
+            stat = os.lstat(entry)
+        except OSError:
+            return
+        key = (stat.st_dev, stat.st_ino)
+        if key not in inodes:
+            # A directory goes with the job whatever its link count says
+            links = 1 if os.path.isdir(entry) and not os.path.islink(entry) else stat.st_nlink
+            inodes[key] = [stat.st_size, links, 0]
+        inodes[key][2] += 1
+
+    record(path)
+    if not os.path.isdir(path) or os.path.islink(path):
+        return
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            record(os.path.join(root, name))
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class JobStorage:
+    """Tracks per-job disk usage under the output roots and evicts idle jobs.
+
+    ``roots`` returns the directories job data lives in; it is called on
+    every scan so configuration changes (and tests) take effect. Guards
+    added with :meth:`protect` return ids of jobs that must be kept, derived
+    ids included; callbacks added with :meth:`on_evict` drop state kept
+    elsewhere for an evicted job. ``lock_for`` gives the lock held by
+    everything that writes a job's output, so a job is never removed while
+    it is being written.
+    """
+
+    def __init__(
+        self,
+        roots: Callable[[], Sequence[str]],
+        lock_for: Callable[[str], asyncio.Lock] = None,
+        index_path: str = None
+    ):
+        self.roots = roots
+        self.lock_for = lock_for
+        self.index_path = index_path or settings.job_storage_index
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.last_sweep: Optional[Dict[str, Any]] = None
+        self._guards: List[Callable[[], Iterable[str]]] = []
+        self._evict_callbacks: List[Callable[[str], None]] = []
+        self._last_access: Dict[str, float] = {}
+        self._sweep_task: Optional[asyncio.Task] = None
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, 'r') as f:
+                self._last_access = {job: float(t) for job, t in json.load(f).items()}
+        except (OSError, ValueError, TypeError, AttributeError):
+            # Without the index jobs fall back to their modification times
+            self._last_access = {}
+
+    def save(self) -> None:
+        """Atomically write the last-access index to disk."""
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._last_access, f)
+        os.replace(tmp_path, self.index_path)
+
+    def protect(self, guard: Callable[[], Iterable[str]]) -> None:
+        self._guards.append(guard)
+
+    def on_evict(self, callback: Callable[[str], None]) -> None:
+        self._evict_callbacks.append(callback)
+
+    def touch(self, job_id: str) -> None:
+        """Mark a job (or the job a derived id belongs to) as just used."""
+        self._last_access[base_job_id(job_id)] = time.time()
+
+    def protected(self) -> set:
+        jobs = set()
+        for guard in self._guards:
+            jobs.update(base_job_id(job_id) for job_id in guard())
+        return jobs
+
+    def usage(self) -> Dict[str, Dict[str, Any]]:
+        """Scan the roots: per job its ``paths``, ``size`` and ``freeable`` bytes and ``last_access``.
+
+        ``freeable`` leaves out files also linked from outside the job (the
+        ingest cache hardlinks graphs), as removing the job frees nothing
+        of them. Blocking; call through the storage pool.
+        """
+        jobs: Dict[str, Dict[str, Any]] = {}
+        for root in self.roots():
+            try:
+                entries = list(os.scandir(root))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith('.') or not (entry.is_dir() or ARCHIVE_MARKER in entry.name):
+                    continue
+                job = jobs.setdefault(base_job_id(entry.name), {"paths": [], "size": 0, "modified": 0.0})
+                job["paths"].append(entry.path)
+                try:
+                    job["modified"] = max(job["modified"], entry.stat(follow_symlinks=False).st_mtime)
+                except OSError:
+                    pass
+
+        for job_id, job in jobs.items():
+            # Hard links between a job's local and shared copies are counted once
+            inodes: Dict[Tuple[int, int], List[int]] = {}
+            for path in job["paths"]:
+                _scan_path(path, inodes)
+            job["size"] = sum(size for size, _, _ in inodes.values())
+            job["freeable"] = sum(size for size, links, seen in inodes.values() if seen >= links)
+            job["last_access"] = max(self._last_access.get(job_id, 0.0), job.pop("modified"))
+        return jobs
+
+    async def evict(self, job_id: str, reason: str = 'manual', usage: Dict[str, Any] = None) -> bool:
+        """Remove all data of ``job_id`` and its derived jobs.
+
+        Returns False if the job is protected, being written or has no data.
+        """
+        job_id = base_job_id(job_id)
+        if job_id in self.protected():
+            return False
+        lock = self.lock_for(job_id) if self.lock_for else asyncio.Lock()
+        if lock.locked():
+            return False
+        async with lock:
+            if usage is None:
+                usage = (await storage.run(self.usage)).get(job_id)
+            if not usage:
+                return False
+            for path in usage["paths"]:
+                await storage.run(_remove, path)
+
+        self._last_access.pop(job_id, None)
+        for callback in self._evict_callbacks:
+            callback(job_id)
+        self.evictions += 1
+        self.evicted_bytes += usage["freeable"]
+        EVICTIONS.inc(reason)
+        EVICTED_BYTES.inc(reason, amount=usage["freeable"])
+        logger.info("Evicted job %s (%s, %d bytes freed)", job_id, reason, usage["freeable"])
+        return True
+
+    async def sweep(self) -> List[Dict[str, Any]]:
+        """Evict expired jobs, then least recently used ones until within the budget."""
+        jobs = await storage.run(self.usage)
+        now = time.time()
+        protected = self.protected()
+        total = sum(job["size"] for job in jobs.values())
+        candidates = sorted(
+            (
+                (job_id, job) for job_id, job in jobs.items()
+                if job_id not in protected and now - job["last_access"] >= settings.job_storage_min_idle
+            ),
+            key=lambda item: item[1]["last_access"]
+        )
+
+        evicted = []
+        for job_id, job in candidates:
+            expired = settings.job_ttl_seconds > 0 and now - job["last_access"] > settings.job_ttl_seconds
+            over_budget = 0 < settings.job_storage_max_bytes < total
+            if not (expired or over_budget):
+                continue
+            reason = 'ttl' if expired else 'budget'
+            if await self.evict(job_id, reason, usage=job):
+                # Bytes still linked from elsewhere stay on disk and count against the budget
+                total -= job["freeable"]
+                evicted.append({"job_id": job_id, "size": job["size"], "freed_bytes": job["freeable"], "reason": reason})
+
+        # Forget jobs whose data is gone, however it went
+        for job_id in set(self._last_access) - set(jobs):
+            del self._last_access[job_id]
+        await storage.run(self.save)
+
+        if total > settings.job_storage_max_bytes > 0:
+            logger.warning(
+                "Job data uses %d bytes, over the %d byte budget; the rest is in use",
+                total, settings.job_storage_max_bytes
+            )
+        self.last_sweep = {"time": now, "jobs": len(jobs) - len(evicted), "total_bytes": total, "evicted": evicted}
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_bytes": settings.job_storage_max_bytes,
+            "ttl_seconds": settings.job_ttl_seconds,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+            "last_sweep": self.last_sweep
+        }
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Job storage sweep failed")
+            await asyncio.sleep(settings.job_storage_sweep_interval)
+
+    async def start(self) -> None:
+        limited = settings.job_storage_max_bytes > 0 or settings.job_ttl_seconds > 0
+        if settings.job_storage_sweep_interval <= 0 or not limited:
+            return
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep_loop(), name="job-storage-sweep")
+
+    async def stop(self) -> None:
+        task, self._sweep_task = self._sweep_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
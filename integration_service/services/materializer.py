@@ -0,0 +1,194 @@
+"""Materialize miner output from the shared volume into the local output directory."""
+import asyncio
+import contextvars
+import errno
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Set
+from .metrics import record_bytes
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+# ioctl request number for FICLONE (Linux, btrfs/xfs/overlay-on-those)
+FICLONE = 0x40049409
+
+STRATEGIES = ('auto', 'reflink', 'hardlink', 'symlink', 'serve', 'copy')
+
+# Errors meaning "this way of placing the file is not possible here"
+_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EMLINK, errno.ENOSYS}
+
+
+def _reflink(src: str, dst: str) -> None:
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflink not supported on this platform")
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    shutil.copystat(src, dst)
+
+
+def _copy(src: str, dst: str) -> None:
+    shutil.copy2(src, dst)
+
+
+def _is_current(src_stat: os.stat_result, dst: str, method: str) -> bool:
+    """Whether ``dst`` already holds ``src`` and can be left alone."""
+    try:
+        dst_stat = os.lstat(dst)
+    except FileNotFoundError:
+        return False
+    if method == 'hardlink':
+        return (dst_stat.st_ino, dst_stat.st_dev) == (src_stat.st_ino, src_stat.st_dev)
+    return (
+        not os.path.islink(dst)
+        and dst_stat.st_size == src_stat.st_size
+        and dst_stat.st_mtime_ns == src_stat.st_mtime_ns
+    )
+
+
+class Materializer:
+    """Places ``results/`` and ``plots/`` where downloads are served from.
+
+    Strategies (``MATERIALIZE_STRATEGY``):
+
+    * ``reflink`` – copy-on-write clone, falling back to copy.
+    * ``hardlink`` – hard links, falling back to copy across filesystems.
+    * ``auto`` – reflink, then hardlink, then copy, per file.
+    * ``copy`` – incremental copy of new or changed files only.
+    * ``symlink`` – the local directory becomes a link to the shared one.
+    * ``serve`` – nothing is placed locally; files are served from the
+      shared volume directly.
+
+    All file work runs on a dedicated thread pool so the event loop keeps
+    serving requests while large plot directories are synced.
+    """
+
+    def __init__(self, strategy: str = None, max_workers: int = None):
+        self.strategy = (strategy or settings.materialize_strategy).lower()
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown materialize strategy '{self.strategy}', expected one of {STRATEGIES}")
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.materialize_workers,
+            thread_name_prefix="materialize"
+        )
+
+    @property
+    def serves_shared(self) -> bool:
+        return self.strategy == 'serve'
+
+    async def materialize(self, src_dir: str, dst_dir: str) -> Optional[str]:
+        """Mirror ``src_dir`` at ``dst_dir``; returns the method used, or None if src is missing."""
+        loop = asyncio.get_running_loop()
+        # Run in the caller's context so copied bytes count towards its stage
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, context.run, self.materialize_sync, src_dir, dst_dir)
+
+    def materialize_sync(self, src_dir: str, dst_dir: str) -> Optional[str]:
+        if not os.path.isdir(src_dir):
+            return None
+        if self.strategy == 'serve':
+            return 'serve'
+        if self.strategy == 'symlink':
+            self._symlink_dir(src_dir, dst_dir)
+            return 'symlink'
+        return self._sync_tree(src_dir, dst_dir)
+
+    def _symlink_dir(self, src_dir: str, dst_dir: str) -> None:
+        target = os.path.abspath(src_dir)
+        if os.path.islink(dst_dir) and os.readlink(dst_dir) == target:
+            return
+        os.makedirs(os.path.dirname(dst_dir), exist_ok=True)
+        tmp_link = f"{dst_dir}.link-tmp"
+        if os.path.lexists(tmp_link):
+            os.unlink(tmp_link)
+        os.symlink(target, tmp_link)
+        if os.path.isdir(dst_dir) and not os.path.islink(dst_dir):
+            shutil.rmtree(dst_dir)
+        os.replace(tmp_link, dst_dir)
+
+    def _methods(self):
+        if self.strategy == 'auto':
+            return ['reflink', 'hardlink', 'copy']
+        if self.strategy in ('reflink', 'hardlink'):
+            return [self.strategy, 'copy']
+        return ['copy']
+
+    def _sync_tree(self, src_dir: str, dst_dir: str) -> str:
+        if os.path.islink(dst_dir):
+            os.unlink(dst_dir)
+        os.makedirs(dst_dir, exist_ok=True)
+
+        methods = self._methods()
+        used: Set[str] = set()
+        expected_dirs = {dst_dir}
+        expected_files = set()
+
+        for root, dirs, files in os.walk(src_dir):
+            rel_root = os.path.relpath(root, src_dir)
+            target_root = os.path.normpath(os.path.join(dst_dir, rel_root))
+            expected_dirs.add(target_root)
+            os.makedirs(target_root, exist_ok=True)
+
+            for name in files:
+                src = os.path.join(root, name)
+                dst = os.path.join(target_root, name)
+                expected_files.add(dst)
+                methods = self._place(src, dst, methods, used)
+
+        # Drop anything the miner no longer produces
+        for root, dirs, files in os.walk(dst_dir, topdown=False):
+            for name in files:
+                path = os.path.join(root, name)
+                if path not in expected_files:
+                    os.unlink(path)
+            for name in dirs:
+                path = os.path.join(root, name)
+                if path not in expected_dirs:
+                    if os.path.islink(path):
+                        os.unlink(path)
+                    else:
+                        shutil.rmtree(path, ignore_errors=True)
+
+        if not used:
+            return 'unchanged'
+        return '+'.join(m for m in ('reflink', 'hardlink', 'copy') if m in used)
+
+    def _place(self, src: str, dst: str, methods, used: Set[str]):
+        """Place one file, dropping methods that turn out to be unsupported."""
+        src_stat = os.stat(src)
+        if any(_is_current(src_stat, dst, method) for method in methods):
+            return methods
+
+        tmp = f"{dst}.materialize-tmp"
+        while True:
+            method = methods[0]
+            if os.path.lexists(tmp):
+                os.unlink(tmp)
+            try:
+                if method == 'reflink':
+                    _reflink(src, tmp)
+                elif method == 'hardlink':
+                    os.link(src, tmp)
+                else:
+                    _copy(src, tmp)
+            except OSError as e:
+                if method == 'copy' or e.errno not in _UNSUPPORTED:
+                    raise
+                # Not possible on this filesystem pair; don't try it for the remaining files
+                methods = methods[1:]
+                continue
+            os.replace(tmp, dst)
+            used.add(method)
+            if method == 'copy':
+                record_bytes(received=src_stat.st_size)
+            return methods
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,421 @@
+"""Pipeline metrics in the Prometheus text format, plus per-job stage timings.
+
+Stages are timed with :func:`stage_timer`; bytes moved inside a stage are
+attributed to it with :func:`record_bytes`, which finds the running stage
+through a context variable so lower layers (multipart bodies, the
+materializer) need no extra plumbing. When a stage belongs to a job, its
+time and bytes are also accumulated in ``<shared volume>/<job_id>/timings.json``.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .storage import storage
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TIMINGS_FILE = "timings.json"
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple[Any, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(label) for label in labels)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    """Point-in-time value, either set directly or read from ``callback`` at scrape time.
+
+    A callback returns a number, or a dict of label-value tuples to numbers
+    for labelled gauges.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Optional[Callable[[], Any]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        if self.callback is not None:
+            try:
+                current = self.callback()
+            except Exception:
+                logger.exception("Gauge callback for %s failed", self.name)
+                return []
+            if isinstance(current, dict):
+                items = sorted((self._key(k if isinstance(k, tuple) else (k,)), v) for k, v in current.items())
+            else:
+                items = [((), current)]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = STAGE_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            # One count per bucket, then sum and count
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return int(series[-1]) if series else 0
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        samples = []
+        for key, series in items:
+            for bound, value in zip(self.buckets, series):
+                labels = _format_labels(self.labelnames + ('le',), key + (_format_value(bound),))
+                samples.append((f"{self.name}_bucket", labels, value))
+            labels = _format_labels(self.labelnames, key)
+            samples.append((f"{self.name}_sum", labels, series[-2]))
+            samples.append((f"{self.name}_count", labels, series[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """A named collection of metrics rendered together for ``/metrics``."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        # Re-registering (e.g. a re-created scheduler) replaces the old metric
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Optional[Callable[[], Any]] = None
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = STAGE_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "pipeline_stage_duration_seconds", "Latency of pipeline stages.", ["stage"]
+)
+STAGE_FAILURES = metrics.counter(
+    "pipeline_stage_failures_total", "Pipeline stages that raised.", ["stage"]
+)
+STAGE_BYTES = metrics.counter(
+    "pipeline_stage_bytes_total", "Bytes sent to or received from upstreams and disks per stage.", ["stage", "direction"]
+)
+RETRIES = metrics.counter(
+    "pipeline_retries_total", "Upstream calls retried after a failure.", ["stage"]
+)
+LOOP_LAG = metrics.histogram(
+    "pipeline_event_loop_lag_seconds", "Delay of the event loop in waking a periodic timer.", buckets=LAG_BUCKETS
+)
+LOOP_LAG_LAST = metrics.gauge(
+    "pipeline_event_loop_lag_last_seconds", "Most recent event loop lag sample."
+)
+
+
+# --- Per-job timings ---
+
+class JobTimings:
+    """Accumulates stage durations and bytes per job in ``timings.json``.
+
+    Entries are only written for jobs whose shared-volume directory already
+    exists; writes are serialised so concurrent stages of one job do not
+    lose updates.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path(job_id: str) -> str:
+        return storage.shared_path(job_id, TIMINGS_FILE)
+
+    def read(self, job_id: str) -> Dict[str, Any]:
+        try:
+            with open(self.path(job_id), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"job_id": job_id, "stages": {}}
+
+    def record_sync(
+        self,
+        job_id: str,
+        stage: str,
+        seconds: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        failed: bool = False
+    ) -> None:
+        if not settings.job_timings_enabled or not os.path.isdir(storage.shared_path(job_id)):
+            return
+        with self._lock:
+            timings = self.read(job_id)
+            entry = timings.setdefault("stages", {}).setdefault(stage, {
+                "runs": 0, "failures": 0, "total_seconds": 0.0, "bytes_sent": 0, "bytes_received": 0
+            })
+            entry["runs"] += 1
+            entry["failures"] += int(failed)
+            entry["total_seconds"] = round(entry["total_seconds"] + seconds, 6)
+            entry["last_seconds"] = round(seconds, 6)
+            entry["bytes_sent"] += bytes_sent
+            entry["bytes_received"] += bytes_received
+            timings["updated_at"] = time.time()
+
+            path = self.path(job_id)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(timings, f, indent=2)
+            os.replace(tmp_path, path)
+
+    async def record(self, job_id: str, stage: str, seconds: float, **kwargs) -> None:
+        try:
+            await storage.run(self.record_sync, job_id, stage, seconds, **kwargs)
+        except OSError:
+            logger.warning("Could not write timings for job %s", job_id, exc_info=True)
+
+
+job_timings = JobTimings()
+
+
+# --- Stage timing ---
+
+_current_stage: contextvars.ContextVar[Optional["StageTimer"]] = contextvars.ContextVar(
+    "current_stage", default=None
+)
+
+
+def record_stage(stage: str, seconds: float, bytes_sent: int = 0, bytes_received: int = 0, failed: bool = False) -> None:
+    """Record one completed stage in the process-wide metrics."""
+    STAGE_SECONDS.observe(seconds, stage)
+    if failed:
+        STAGE_FAILURES.inc(stage)
+    if bytes_sent:
+        STAGE_BYTES.inc(stage, "sent", amount=bytes_sent)
+    if bytes_received:
+        STAGE_BYTES.inc(stage, "received", amount=bytes_received)
+
+
+def record_bytes(sent: int = 0, received: int = 0) -> None:
+    """Attribute bytes to the stage running in the current context, if any."""
+    timer = _current_stage.get()
+    if timer is not None:
+        timer.add_bytes(sent, received)
+
+
+def record_retry(stage: str) -> None:
+    RETRIES.inc(stage)
+
+
+class StageTimer:
+    """Times one pipeline stage; use with ``with`` or ``async with``.
+
+    ``job_id`` may be filled in while the stage runs (e.g. once AtomSpace
+    has assigned one); the job's timings file is updated on exit.
+    """
+
+    def __init__(self, stage: str, job_id: Optional[str] = None):
+        self.stage = stage
+        self.job_id = job_id
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.seconds: Optional[float] = None
+        self._started = 0.0
+        self._token = None
+
+    def add_bytes(self, sent: int = 0, received: int = 0) -> None:
+        self.bytes_sent += sent
+        self.bytes_received += received
+
+    def _start(self) -> "StageTimer":
+        self._token = _current_stage.set(self)
+        self._started = time.perf_counter()
+        return self
+
+    def _stop(self, failed: bool) -> None:
+        self.seconds = time.perf_counter() - self._started
+        _current_stage.reset(self._token)
+        record_stage(self.stage, self.seconds, self.bytes_sent, self.bytes_received, failed)
+
+    def _timings(self, failed: bool) -> Dict[str, Any]:
+        return {"bytes_sent": self.bytes_sent, "bytes_received": self.bytes_received, "failed": failed}
+
+    def __enter__(self) -> "StageTimer":
+        return self._start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        failed = exc_type is not None
+        self._stop(failed)
+        if self.job_id:
+            try:
+                job_timings.record_sync(self.job_id, self.stage, self.seconds, **self._timings(failed))
+            except OSError:
+                logger.warning("Could not write timings for job %s", self.job_id, exc_info=True)
+
+    async def __aenter__(self) -> "StageTimer":
+        return self._start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        failed = exc_type is not None
+        self._stop(failed)
+        if self.job_id:
+            await job_timings.record(self.job_id, self.stage, self.seconds, **self._timings(failed))
+
+
+def stage_timer(stage: str, job_id: Optional[str] = None) -> StageTimer:
+    return StageTimer(stage, job_id)
+
+
+# --- Event loop lag ---
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes a timer that should fire every ``interval`` seconds.
+
+    Sustained lag means something is blocking the loop (CPU work or
+    synchronous I/O in a request handler).
+    """
+
+    def __init__(self, interval: float = None):
+        self.interval = settings.metrics_loop_lag_interval if interval is None else interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            LOOP_LAG.observe(lag)
+            LOOP_LAG_LAST.set(lag)
+
+
+loop_lag_monitor = LoopLagMonitor()
@@ -0,0 +1,202 @@
+"""Pool of neural miner endpoints with least-loaded dispatch and circuit breaking."""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+import httpx
+from .http_client import http_clients
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class MinerEndpoint:
+    """One miner instance: its load, health and circuit breaker state."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.in_flight = 0
+        self.dispatched = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.breaker = CLOSED
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "breaker": self.breaker,
+            "in_flight": self.in_flight,
+            "dispatched": self.dispatched,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
+
+
+class MinerPool:
+    """Dispatches mining jobs across miner replicas.
+
+    Each job goes to the healthy endpoint with the fewest jobs in flight.
+    A background probe of ``/health`` every ``MINER_HEALTH_INTERVAL`` seconds
+    ejects unreachable miners and readmits them once they answer again.
+
+    Every endpoint has a circuit breaker: after ``MINER_BREAKER_THRESHOLD``
+    consecutive failed requests it opens and the endpoint gets no traffic for
+    ``MINER_BREAKER_RESET`` seconds, after which a single trial request is let
+    through (half-open). Success closes the breaker, failure reopens it.
+
+    At most ``MINER_MAX_IN_FLIGHT`` requests are outstanding on each
+    endpoint; :meth:`acquire` waits while every admitting endpoint is at the
+    limit, so work outside the scheduler (shards, calibration) stays within
+    it too. Ejected and open-breaker endpoints add no capacity.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str] = None,
+        failure_threshold: int = None,
+        reset_timeout: float = None,
+        probe_interval: float = None
+    ):
+        self.endpoints: List[MinerEndpoint] = [MinerEndpoint(url) for url in (urls or settings.miner_urls)]
+        if not self.endpoints:
+            raise ValueError("At least one miner URL is required")
+        self.failure_threshold = failure_threshold or settings.miner_breaker_threshold
+        self.reset_timeout = reset_timeout if reset_timeout is not None else settings.miner_breaker_reset
+        self.probe_interval = probe_interval if probe_interval is not None else settings.miner_health_interval
+        self._probe_task: Optional[asyncio.Task] = None
+        # Set (and replaced) whenever an endpoint may have room again
+        self._freed: Optional[asyncio.Event] = None
+        self._freed_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def urls(self) -> List[str]:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def _admits(self, endpoint: MinerEndpoint) -> bool:
+        if not endpoint.healthy:
+            return False
+        if endpoint.breaker == OPEN:
+            if time.monotonic() - endpoint.opened_at < self.reset_timeout:
+                return False
+            endpoint.breaker = HALF_OPEN
+        if endpoint.breaker == HALF_OPEN:
+            # Only one trial request while half-open
+            return endpoint.in_flight == 0
+        return True
+
+    async def acquire(self, exclude: Set[str] = frozenset()) -> Optional[MinerEndpoint]:
+        """Reserve the least-loaded admitting endpoint, or None if there is none.
+
+        Waits while every admitting endpoint has ``MINER_MAX_IN_FLIGHT``
+        requests outstanding.
+        """
+        self._ensure_probing()
+        while True:
+            candidates = [e for e in self.endpoints if e.url not in exclude and self._admits(e)]
+            if not candidates:
+                return None
+            free = [e for e in candidates if e.in_flight < settings.miner_max_in_flight]
+            if free:
+                endpoint = min(free, key=lambda e: (e.in_flight, e.dispatched))
+                endpoint.in_flight += 1
+                endpoint.dispatched += 1
+                return endpoint
+            loop = asyncio.get_running_loop()
+            if self._freed is None or self._freed_loop is not loop:
+                self._freed, self._freed_loop = asyncio.Event(), loop
+            await self._freed.wait()
+
+    def _wake_waiters(self) -> None:
+        if self._freed is not None:
+            self._freed.set()
+            self._freed = None
+
+    def release(self, endpoint: MinerEndpoint, success: Optional[bool], error: str = None) -> None:
+        """Return an endpoint after a request. ``success=None`` records no outcome (e.g. cancelled)."""
+        endpoint.in_flight -= 1
+        self._wake_waiters()
+        if success is None:
+            return
+        if success:
+            endpoint.consecutive_failures = 0
+            if endpoint.breaker != CLOSED:
+                logger.info("Miner %s recovered; closing circuit", endpoint.url)
+            endpoint.breaker = CLOSED
+            return
+
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        endpoint.last_error = error
+        if endpoint.breaker == HALF_OPEN or endpoint.consecutive_failures >= self.failure_threshold:
+            if endpoint.breaker != OPEN:
+                logger.warning("Opening circuit for miner %s: %s", endpoint.url, error)
+            endpoint.breaker = OPEN
+            endpoint.opened_at = time.monotonic()
+
+    @property
+    def available(self) -> int:
+        return sum(1 for e in self.endpoints if e.healthy and e.breaker != OPEN)
+
+    async def probe(self) -> None:
+        """Check ``/health`` on every endpoint once."""
+        client = http_clients.get('miner')
+
+        async def check(endpoint: MinerEndpoint) -> None:
+            try:
+                response = await client.get(f"{endpoint.url}/health", timeout=settings.miner_connect_timeout)
+                healthy = response.status_code == 200
+                error = None if healthy else f"health check returned {response.status_code}"
+            except httpx.HTTPError as e:
+                healthy, error = False, f"health check failed: {e!r}"
+            if healthy != endpoint.healthy:
+                logger.warning("Miner %s is now %s", endpoint.url, "healthy" if healthy else f"ejected ({error})")
+                # Waiters recheck: a readmitted miner has room, an ejected one none
+                self._wake_waiters()
+            endpoint.healthy = healthy
+            if error:
+                endpoint.last_error = error
+
+        await asyncio.gather(*(check(endpoint) for endpoint in self.endpoints))
+
+    async def _probe_loop(self) -> None:
+        while True:
+            try:
+                await self.probe()
+            except Exception:
+                logger.exception("Miner health probe failed")
+            await asyncio.sleep(self.probe_interval)
+
+    def _ensure_probing(self) -> None:
+        if self.probe_interval <= 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = self._probe_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._probe_task = loop.create_task(self._probe_loop(), name="miner-health-probe")
+
+    async def start(self) -> None:
+        self._ensure_probing()
+
+    async def stop(self) -> None:
+        task, self._probe_task = self._probe_task, None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "endpoints": [endpoint.to_dict() for endpoint in self.endpoints],
+            "available": self.available,
+            "in_flight": sum(e.in_flight for e in self.endpoints)
+        }
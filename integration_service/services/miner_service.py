@@ -2,25 +2,76 @@
 import httpx  
 import os  
 import asyncio  
-from typing import Dict, Any  
+import logging
+from typing import Callable, Dict, Any, List, Optional, Set
+from .deadlines import UPSTREAM_CANCELLATIONS, deadline_headers
+from .fingerprint import file_sha256
+from .http_client import http_clients
+from .metrics import record_bytes, record_retry
+from .miner_pool import MinerPool
+from .multipart import MultipartStream
+from .storage import storage
 from ..config.settings import settings  
-  
+
+logger = logging.getLogger(__name__)
+
+# Miner responses to a path handoff that mean "send me the file instead"
+PATH_REJECTED_STATUSES = (400, 404, 409, 412, 422)
+
+# Parameters sent to the miner and the values used when a caller omits them
+DEFAULT_MINING_CONFIG = {
+    'min_pattern_size': 5,
+    'max_pattern_size': 10,
+    'min_neighborhood_size': 5,
+    'max_neighborhood_size': 10,
+    'n_neighborhoods': 2000,
+    'n_trials': 100,
+    'radius': 3,
+    'graph_type': 'directed',
+    'search_strategy': 'greedy',
+    'sample_method': 'tree',
+    'visualize_instances': False,
+}
+
 class MinerService:  
     """Service for communicating with Neural Subgraph Miner."""  
       
-    def __init__(self):  
-        self.miner_url = settings.miner_url  
-        self.timeout = settings.miner_timeout  
+    def __init__(self, miner_urls: List[str] = None):  
+        self.pool = MinerPool(miner_urls)
+        self._transfer_modes: Dict[str, str] = {}
+        self._cancellations: Set[asyncio.Task] = set()
+
+    @property
+    def miner_url(self) -> str:
+        """URL of the first miner in the pool."""
+        return self.pool.urls[0]
+
+    @miner_url.setter
+    def miner_url(self, url: str) -> None:
+        self.miner_urls = [url]
+
+    @property
+    def miner_urls(self) -> List[str]:
+        return self.pool.urls
+
+    @miner_urls.setter
+    def miner_urls(self, urls: List[str]) -> None:
+        self.pool = MinerPool(urls)
       
     async def mine_motifs(
         self, 
         networkx_file_path: str, 
         job_id: str = None,
         mining_config: Dict[str, Any] = None,
-        max_retries: int = 3
+        max_retries: int = 3,
+        on_send: Optional[Callable[[], None]] = None
     ) -> Dict[str, Any]:  
-        """Send NetworkX file to miner with config and return discovered motifs."""  
-        if not os.path.exists(networkx_file_path):  
+        """Send NetworkX file to miner with config and return discovered motifs.
+
+        The request waits while every miner is at ``MINER_MAX_IN_FLIGHT``;
+        ``on_send`` is called each time a request actually goes out.
+        """
+        if not await storage.exists(networkx_file_path):  
             raise FileNotFoundError(f"NetworkX file not found: {networkx_file_path}")  
           
         if job_id is None:
@@ -31,51 +82,179 @@ class MinerService:
         if mining_config is None:
             mining_config = {}
     
+        data = {}
+        if job_id:
+            data['job_id'] = job_id
+
+        for key, default in DEFAULT_MINING_CONFIG.items():
+            data[key] = mining_config.get(key, default)
+        if mining_config.get('seed') is not None:
+            data['seed'] = mining_config['seed']
+
+        # Each attempt goes to the least-loaded healthy miner not yet tried for
+        # this job; failing miners trip their circuit breaker instead of being
+        # retried on a fixed backoff.
+        tried = set()
+        attempts = 0
+        last_error = None
         for attempt in range(max_retries):  
-            try:  
-                # Read NetworkX file  
-                with open(networkx_file_path, 'rb') as f:  
-                    networkx_data = f.read()  
-                  
-                data = {}
-                if job_id:
-                    data['job_id'] = job_id
-                
-                data['min_pattern_size'] = mining_config.get('min_pattern_size', 5)
-                data['max_pattern_size'] = mining_config.get('max_pattern_size', 10)
-                data['min_neighborhood_size'] = mining_config.get('min_neighborhood_size', 5)
-                data['max_neighborhood_size'] = mining_config.get('max_neighborhood_size', 10)
-                data['n_neighborhoods'] = mining_config.get('n_neighborhoods', 2000)
-                data['n_trials'] = mining_config.get('n_trials', 100)
-                data['radius'] = mining_config.get('radius', 3)
-                data['graph_type'] = mining_config.get('graph_type', 'directed')
-                data['search_strategy'] = mining_config.get('search_strategy', 'greedy')
-                data['sample_method'] = mining_config.get('sample_method', 'tree')
-                data['visualize_instances'] = mining_config.get('visualize_instances', False)
-                
-                # Send to miner using HTTP client  
-                async with httpx.AsyncClient(timeout=self.timeout) as client:  
-                    files = {'graph_file': ('graph.gpickle', networkx_data, 'application/octet-stream')}
-                    
-                    response = await client.post(f"{self.miner_url}/mine", files=files, data=data)  
-                      
-                    if response.status_code != 200:  
-                        raise RuntimeError(f"Miner returned {response.status_code}: {response.text}")  
-                      
-                    result = response.json()  
-                  
-                # Validate response structure  
-                if not self.validate_motif_output(result):  
-                    raise ValueError("Invalid motif output structure from miner")  
-                      
-                return result  
+            endpoint = await self.pool.acquire(exclude=tried)
+            if endpoint is None and tried:
+                # Every admitting miner has already failed this job once
+                await asyncio.sleep(settings.miner_retry_delay)
+                endpoint = await self.pool.acquire()
+            if endpoint is None:
+                break
+            tried.add(endpoint.url)
+            attempts += 1
+            if attempts > 1:
+                record_retry('miner_call')
+
+            success: Optional[bool] = None
+            error = None
+            try:
+                if on_send is not None:
+                    on_send()
+                response = await self._send(endpoint.url, networkx_file_path, data)
+                success = response.status_code < 500
+                if not success:
+                    error = f"Miner {endpoint.url} returned {response.status_code}: {response.text}"
+            except httpx.RequestError as e:
+                success = False
+                error = f"Miner {endpoint.url} unreachable: {e!r}"
+            except asyncio.CancelledError:
+                # The client went away or the deadline passed: the request's
+                # connection is closed, and the miner is asked to stop too.
+                self._signal_cancel(endpoint.url, job_id)
+                raise
+            finally:
+                # success stays None if the job was cancelled mid-request
+                self.pool.release(endpoint, success, error)
+
+            if not success:
+                last_error = error
+                continue
+
+            if response.status_code != 200:
+                raise RuntimeError(f"Miner returned {response.status_code}: {response.text}")
+
+            result = response.json()
+
+            # Validate response structure  
+            if not self.validate_motif_output(result):  
+                raise ValueError("Invalid motif output structure from miner")  
                   
-            except (httpx.RequestError, httpx.ConnectError, httpx.ConnectTimeout) as e:  
-                if attempt == max_retries - 1:  
-                    raise Exception(f"Miner request failed after {max_retries} attempts: {str(e)}")  
-                wait_time = 2 ** attempt  # Exponential backoff  
-                await asyncio.sleep(wait_time)  
+            return result  
+
+        if last_error is None:
+            raise RuntimeError(f"No healthy miner available ({len(self.pool.endpoints)} configured)")
+        raise Exception(f"Miner request failed after {attempts} attempts: {last_error}")
+
+    async def _send(self, miner_url: str, networkx_file_path: str, data: Dict[str, Any]) -> httpx.Response:
+        """Post one mining request to ``miner_url`` using the negotiated handoff."""
+        transfer_mode = await self.negotiate_transfer_mode(miner_url)
+
+        if transfer_mode == 'path':
+            response = await self._post_graph_path(miner_url, networkx_file_path, data)
+            if response.status_code not in PATH_REJECTED_STATUSES or not settings.miner_transfer_fallback:
+                return response
+            # The miner cannot see or verify the shared file; stop offering it
+            # the path and upload the graph instead.
+            self._transfer_modes[miner_url] = 'upload'
+            record_retry('miner_call')
+
+        return await self._post_graph_upload(miner_url, networkx_file_path, data)
+
+    def _signal_cancel(self, miner_url: str, job_id: Optional[str]) -> None:
+        """Tell ``miner_url`` to stop mining ``job_id`` without waiting for the answer.
+
+        Closing the connection is not enough: a miner busy computing only
+        notices the client is gone when it tries to reply.
+        """
+        UPSTREAM_CANCELLATIONS.inc('miner')
+        if not settings.miner_cancel_path or not job_id:
+            return
+        task = asyncio.create_task(self._post_cancel(miner_url, job_id))
+        self._cancellations.add(task)
+        task.add_done_callback(self._cancellations.discard)
+
+    async def _post_cancel(self, miner_url: str, job_id: str) -> None:
+        try:
+            response = await http_clients.get('miner').post(
+                f"{miner_url}{settings.miner_cancel_path}",
+                data={'job_id': job_id},
+                timeout=settings.miner_connect_timeout
+            )
+            if response.status_code >= 400 and response.status_code != 404:
+                logger.warning("Miner %s did not cancel job %s: %s", miner_url, job_id, response.status_code)
+        except httpx.HTTPError as e:
+            logger.warning("Could not ask miner %s to cancel job %s: %r", miner_url, job_id, e)
       
+    async def negotiate_transfer_mode(self, miner_url: str) -> str:
+        """Return how the graph is handed to a miner: 'path' or 'upload'.
+
+        With MINER_TRANSFER_MODE=auto the miner's ``/capabilities`` endpoint is
+        probed once and the answer is remembered per miner URL. Miners that do
+        not advertise shared-volume access get a streamed upload.
+        """
+        if settings.miner_transfer_mode in ('path', 'upload'):
+            return self._transfer_modes.get(miner_url, settings.miner_transfer_mode)
+
+        mode = self._transfer_modes.get(miner_url)
+        if mode is not None:
+            return mode
+
+        mode = 'upload'
+        try:
+            response = await http_clients.get('miner').get(
+                f"{miner_url}/capabilities",
+                timeout=settings.miner_connect_timeout
+            )
+            if response.status_code == 200:
+                capabilities = response.json()
+                if 'path' in capabilities.get('transfer_modes', []):
+                    mode = 'path'
+        except (httpx.HTTPError, ValueError):
+            pass
+
+        self._transfer_modes[miner_url] = mode
+        return mode
+
+    def _miner_visible_path(self, networkx_file_path: str) -> str:
+        """Translate a local shared-volume path to the path the miner mounts."""
+        local_root = os.path.abspath(settings.shared_volume_path)
+        path = os.path.abspath(networkx_file_path)
+        if path.startswith(local_root + os.sep):
+            return settings.miner_shared_volume_path.rstrip('/') + path[len(local_root):]
+        return path
+
+    async def _post_graph_path(self, miner_url: str, networkx_file_path: str, data: Dict[str, Any]) -> httpx.Response:
+        """Send only the shared-volume path and checksum of the graph."""
+        payload = dict(data)
+        payload['graph_path'] = self._miner_visible_path(networkx_file_path)
+        payload['graph_sha256'] = await file_sha256(networkx_file_path)
+        client = http_clients.get('miner')
+        response = await client.post(f"{miner_url}/mine", data=payload, headers=deadline_headers())
+        record_bytes(received=len(response.content))
+        return response
+
+    async def _post_graph_upload(self, miner_url: str, networkx_file_path: str, data: Dict[str, Any]) -> httpx.Response:
+        """Stream the graph file to the miner as a chunked multipart upload."""
+        body = MultipartStream(
+            fields=data,
+            files=[('graph_file', 'graph.gpickle', networkx_file_path, 'application/octet-stream')],
+            chunk_size=settings.upload_chunk_size
+        )
+        client = http_clients.get('miner')
+        try:
+            response = await client.post(
+                f"{miner_url}/mine", content=body, headers={**body.headers, **deadline_headers()}
+            )
+        finally:
+            record_bytes(sent=body.bytes_sent)
+        record_bytes(received=len(response.content))
+        return response
+
     def validate_motif_output(self, output: Dict[str, Any]) -> bool:  
         """Validate miner output structure."""  
         required_keys = ['results_path', 'plots_path', 'status']  
@@ -0,0 +1,260 @@
+"""Time-budgeted mining: sampling parameters sized to fit a wall-clock budget.
+
+Instead of ``n_neighborhoods`` and ``n_trials`` the caller gives a budget in
+seconds. The cost of a run is modelled in the work units of
+:func:`work_units`; what a unit costs on a given graph is learnt from the
+job's runtime history (``mining_history.json``). A job without history is
+first calibrated: a small BFS sample of the graph is mined with cheap
+parameters and timed. The largest parameters whose predicted runtime fits
+the budget (less some headroom for estimate error) are then chosen, never
+beyond the service defaults.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+from .admission import AdmissionRejected
+from .cost_estimator import CALIBRATION_ALPHA, graph_size, work_units
+from .graph_partition import load_graph
+from .graph_versions import version_metadata_path
+from .miner_service import DEFAULT_MINING_CONFIG
+from .single_flight import SingleFlight
+from .storage import storage
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILE = "mining_history.json"
+# Entries kept per job; older ones no longer say much about the miner
+HISTORY_LIMIT = 50
+
+# Candidate values, largest first; the defaults are the ceiling
+NEIGHBORHOOD_STEPS = (2000, 1500, 1000, 750, 500, 300, 200, 100, 50, 20)
+TRIAL_STEPS = (100, 50, 20, 10)
+NEIGHBORHOOD_SIZE_STEPS = (10, 8, 6, 5)
+TUNED_PARAMETERS = ('n_neighborhoods', 'n_trials', 'max_neighborhood_size')
+
+# Parameters of the timed calibration run on the graph sample
+CALIBRATION_PARAMETERS = {'n_neighborhoods': 50, 'n_trials': 10, 'seed': 0}
+
+# Runs the calibration pass: (job_id, graph_file, mining_config) -> (seconds, sample nodes, sample edges)
+Calibrate = Callable[[str, str, Dict[str, Any]], Awaitable[Tuple[float, int, int]]]
+# Admits a calibration pass and accounts for it while it runs:
+# (calibration job_id, mining_config, estimated sample nodes, sample edges) -> async context manager
+Admit = Callable[[str, Dict[str, Any], int, int], AsyncContextManager]
+
+
+class BudgetTooSmall(ValueError):
+    """Even the cheapest parameters are predicted to overrun the budget."""
+
+
+def calibration_job_id(job_id: str) -> str:
+    """Derived job id under which the calibration sample of a job is mined."""
+    return f"{job_id}__calibration"
+
+
+def plan_parameters(
+    budget_seconds: float,
+    seconds_per_unit: float,
+    mining_config: Dict[str, Any],
+    nodes: int = 0,
+    edges: int = 0
+) -> Optional[Dict[str, Any]]:
+    """The most thorough parameters predicted to finish within ``budget_seconds``.
+
+    Parameters set in ``mining_config`` are kept; the unset ones among
+    ``TUNED_PARAMETERS`` are chosen. Returns None if nothing fits.
+    """
+    fixed = {key: mining_config[key] for key in TUNED_PARAMETERS if mining_config.get(key) is not None}
+    steps = {
+        'n_neighborhoods': NEIGHBORHOOD_STEPS,
+        'n_trials': TRIAL_STEPS,
+        'max_neighborhood_size': NEIGHBORHOOD_SIZE_STEPS
+    }
+    choices = [[fixed[key]] if key in fixed else steps[key] for key in TUNED_PARAMETERS]
+    min_size = mining_config.get('min_neighborhood_size')
+
+    best = None
+    for values in itertools.product(*choices):
+        candidate = dict(zip(TUNED_PARAMETERS, values))
+        candidate['min_neighborhood_size'] = min(
+            int(min_size if min_size is not None else DEFAULT_MINING_CONFIG['min_neighborhood_size']),
+            int(candidate['max_neighborhood_size'])
+        )
+        units = work_units({**mining_config, **candidate}, nodes, edges)
+        if units * seconds_per_unit > budget_seconds:
+            continue
+        # More work means a more thorough search; on ties prefer more neighborhoods
+        rank = (units, int(candidate['n_neighborhoods']))
+        if best is None or rank > best[0]:
+            best = (rank, candidate, units)
+    if best is None:
+        return None
+    _, parameters, units = best
+    return {"parameters": parameters, "units": units, "seconds": units * seconds_per_unit}
+
+
+class RuntimeHistory:
+    """Observed mining runtimes of one job's graph, in ``<job>/mining_history.json``."""
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def path(job_id: str) -> str:
+        return storage.shared_path(job_id, HISTORY_FILE)
+
+    async def entries(self, job_id: str) -> List[Dict[str, Any]]:
+        try:
+            return (await storage.read_json(self.path(job_id))).get('runs', [])
+        except (OSError, ValueError, AttributeError):
+            return []
+
+    async def seconds_per_unit(self, job_id: str) -> Optional[float]:
+        """Seconds per work unit on this graph (weighted towards recent runs), or None."""
+        estimate = None
+        for entry in await self.entries(job_id):
+            if entry.get('units', 0) <= 0 or entry.get('seconds', 0) <= 0:
+                continue
+            observed = entry['seconds'] / entry['units']
+            estimate = observed if estimate is None else estimate + CALIBRATION_ALPHA * (observed - estimate)
+        return estimate
+
+    async def record(self, job_id: str, entry: Dict[str, Any]) -> None:
+        async with self._locks.setdefault(job_id, asyncio.Lock()):
+            runs = await self.entries(job_id)
+            runs.append({"time": time.time(), **entry})
+            await storage.write_json(self.path(job_id), {"runs": runs[-HISTORY_LIMIT:]})
+
+
+class BudgetPlanner:
+    """Chooses mining parameters for a time budget and learns from the runs."""
+
+    def __init__(self, calibrate: Calibrate, history: RuntimeHistory = None):
+        self.calibrate = calibrate
+        self.history = history or RuntimeHistory()
+        # Concurrent budgeted requests for one graph share its calibration pass
+        self._calibrations = SingleFlight('mining_calibration')
+
+    async def plan(
+        self,
+        job_id: str,
+        graph_version: int,
+        networkx_file: str,
+        mining_config: Dict[str, Any],
+        budget_seconds: float,
+        admit: Admit = None
+    ) -> Dict[str, Any]:
+        """Plan a run of ``job_id`` that should take at most ``budget_seconds``.
+
+        Returns the chosen ``parameters`` with the prediction behind them.
+        Raises ``BudgetTooSmall`` when nothing fits. A calibration pass is
+        run inside ``admit``, which raises ``AdmissionRejected`` when the
+        caller may not mine now.
+        """
+        if not budget_seconds > 0:
+            raise BudgetTooSmall("time_budget must be a positive number of seconds")
+        nodes, edges = await self._graph_size(job_id, graph_version, networkx_file)
+
+        calibration_seconds = 0.0
+        seconds_per_unit = await self.history.seconds_per_unit(job_id)
+        source = 'history'
+        if seconds_per_unit is None:
+            try:
+                seconds_per_unit, calibration_seconds = await self._calibrations.run(
+                    f"{job_id}:{graph_version}",
+                    lambda: self._calibrate(job_id, graph_version, networkx_file, mining_config, nodes, edges, admit)
+                )
+                source = 'calibration'
+            except AdmissionRejected:
+                raise
+            except Exception as e:
+                # The cost model's global factor is better than no plan at all
+                logger.warning("Calibration pass for job %s failed: %r", job_id, e)
+                seconds_per_unit, source = settings.cost_seconds_per_unit, 'model'
+
+        # The calibration pass has used part of the caller's budget already
+        usable = (budget_seconds - calibration_seconds) * settings.mining_budget_headroom
+        chosen = plan_parameters(usable, seconds_per_unit, mining_config, nodes, edges)
+        if chosen is None:
+            cheapest = plan_parameters(float('inf'), seconds_per_unit, {
+                **mining_config, 'n_neighborhoods': NEIGHBORHOOD_STEPS[-1], 'n_trials': TRIAL_STEPS[-1],
+                'max_neighborhood_size': NEIGHBORHOOD_SIZE_STEPS[-1]
+            }, nodes, edges)
+            raise BudgetTooSmall(
+                f"A time budget of {budget_seconds:.0f}s is too small for this graph; the cheapest run is "
+                f"estimated at {cheapest['seconds'] / settings.mining_budget_headroom + calibration_seconds:.0f}s"
+            )
+        return {
+            "time_budget": budget_seconds,
+            "parameters": chosen["parameters"],
+            "units": chosen["units"],
+            "planned_seconds": round(chosen["seconds"], 3),
+            "seconds_per_unit": seconds_per_unit,
+            "source": source,
+            "calibration_seconds": round(calibration_seconds, 3),
+            "nodes": nodes,
+            "edges": edges,
+            "graph_version": graph_version
+        }
+
+    async def record(self, job_id: str, plan: Dict[str, Any], seconds: float, completed: bool = True) -> None:
+        """Add a budgeted run's actual runtime to the job's history.
+
+        A run stopped before it finished still counts: its runtime is a
+        lower bound, and leaving it out would keep the plans too large.
+        """
+        await self.history.record(job_id, {
+            "kind": "run" if completed else "stopped",
+            "graph_version": plan["graph_version"],
+            "units": plan["units"],
+            "seconds": round(seconds, 3),
+            "planned_seconds": plan["planned_seconds"],
+            "time_budget": plan["time_budget"],
+            "parameters": plan["parameters"]
+        })
+
+    async def _graph_size(self, job_id: str, graph_version: int, networkx_file: str) -> Tuple[int, int]:
+        try:
+            size = graph_size(await storage.read_json(version_metadata_path(job_id, graph_version), cached=True))
+        except (OSError, ValueError, AttributeError):
+            size = None
+        if size is None:
+            graph = await storage.run(load_graph, networkx_file)
+            size = (graph.number_of_nodes(), graph.number_of_edges())
+        return size
+
+    async def _calibrate(
+        self,
+        job_id: str,
+        graph_version: int,
+        networkx_file: str,
+        mining_config: Dict[str, Any],
+        graph_nodes: int,
+        graph_edges: int,
+        admit: Admit = None
+    ) -> Tuple[float, float]:
+        config = {
+            **{k: v for k, v in mining_config.items() if k not in TUNED_PARAMETERS},
+            **CALIBRATION_PARAMETERS,
+            'max_neighborhood_size': DEFAULT_MINING_CONFIG['max_neighborhood_size']
+        }
+        sample_nodes = min(graph_nodes, settings.mining_calibration_nodes)
+        sample_edges = round(graph_edges * sample_nodes / graph_nodes) if graph_nodes else 0
+        guard = admit(calibration_job_id(job_id), config, sample_nodes, sample_edges) if admit else nullcontext()
+        async with guard:
+            seconds, nodes, edges = await asyncio.wait_for(
+                self.calibrate(job_id, networkx_file, config), settings.mining_calibration_timeout
+            )
+        units = work_units(config, nodes, edges)
+        await self.history.record(job_id, {
+            "kind": "calibration",
+            "graph_version": graph_version,
+            "units": units,
+            "seconds": round(seconds, 3),
+            "sample_nodes": nodes,
+            "sample_edges": edges
+        })
+        return seconds / units, seconds
@@ -0,0 +1,144 @@
+"""Persistent cache of mining results keyed on graph fingerprint and config."""
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+from .cache_index import CacheIndex
+from .fingerprint import file_sha256
+from .miner_service import DEFAULT_MINING_CONFIG
+from .storage import storage
+from ..config.settings import settings
+
+CACHED_DIRS = ('results', 'plots')
+
+
+def normalize_mining_config(mining_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the effective miner parameters with defaults applied.
+
+    Two configs that would send identical parameters to the miner normalize
+    to the same dict, regardless of key order, omitted defaults or
+    int/str spelling of numbers.
+    """
+    normalized = {}
+    for key, default in DEFAULT_MINING_CONFIG.items():
+        value = mining_config.get(key)
+        if value is None:
+            value = default
+        if isinstance(default, bool):
+            value = value if isinstance(value, bool) else str(value).lower() == 'true'
+        elif isinstance(default, int):
+            value = int(value)
+        else:
+            value = str(value)
+        normalized[key] = value
+
+    if mining_config.get('seed') is not None:
+        normalized['seed'] = int(mining_config['seed'])
+    # Partitioned runs merge shard results, so they are cached separately
+    if int(mining_config.get('partition_shards') or 0) > 1:
+        normalized['partition_shards'] = int(mining_config['partition_shards'])
+    return normalized
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def _replace_tree(src: str, dst: str) -> None:
+    if os.path.islink(dst):
+        os.unlink(dst)
+    elif os.path.exists(dst):
+        shutil.rmtree(dst)
+    shutil.copytree(src, dst)
+
+
+class MiningCache:
+    """Stores ``results/`` and ``plots/`` of finished mining runs on disk.
+
+    Entries live under ``<MINING_CACHE_DIR>/<key>`` and are evicted LRU once
+    their combined size exceeds ``MINING_CACHE_MAX_BYTES``. Runs without a
+    ``seed`` are stochastic, so they are only cached or reused when the
+    caller opts in.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or settings.mining_cache_dir
+        self.index = CacheIndex(
+            os.path.join(self.cache_dir, "mining_index.json"),
+            max_bytes if max_bytes is not None else settings.mining_cache_max_bytes
+        )
+
+    @staticmethod
+    def is_cacheable(mining_config: Dict[str, Any], allow_unseeded: bool = None) -> bool:
+        if allow_unseeded is None:
+            allow_unseeded = settings.mining_cache_unseeded
+        return mining_config.get('seed') is not None or allow_unseeded
+
+    async def key_for(self, networkx_file: str, mining_config: Dict[str, Any]) -> str:
+        graph_digest = await file_sha256(networkx_file)
+        config = json.dumps(normalize_mining_config(mining_config), sort_keys=True)
+        return hashlib.sha256(f"{graph_digest}:{config}".encode('utf-8')).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _materialize(self, key: str, dest_dir: str) -> bool:
+        entry_dir = self._entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            return False
+        os.makedirs(dest_dir, exist_ok=True)
+        for name in CACHED_DIRS:
+            if os.path.isdir(os.path.join(entry_dir, name)):
+                _replace_tree(os.path.join(entry_dir, name), os.path.join(dest_dir, name))
+        return True
+
+    async def materialize(self, key: str, dest_dir: str) -> Optional[Dict[str, Any]]:
+        """Copy cached results into ``dest_dir``; returns the entry, or None on a miss."""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+
+        if not await storage.run(self._materialize, key, dest_dir):
+            self.index.hits -= 1
+            self.index.misses += 1
+            self.index.remove(key)
+            await storage.run(self.index.save)
+            return None
+
+        await storage.run(self.index.save)
+        return entry
+
+    def _store(self, key: str, source_dir: str) -> int:
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name in CACHED_DIRS:
+            if os.path.isdir(os.path.join(source_dir, name)):
+                shutil.copytree(os.path.join(source_dir, name), os.path.join(tmp_dir, name))
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        return _dir_size(entry_dir)
+
+    def _evict(self, evicted: List[Dict[str, Any]]) -> None:
+        for entry in evicted:
+            shutil.rmtree(self._entry_dir(entry['key']), ignore_errors=True)
+        self.index.save()
+
+    async def store(self, key: str, source_dir: str, job_id: str, mining_config: Dict[str, Any]) -> None:
+        """Save a finished run's results and evict older entries over budget."""
+        size = await storage.run(self._store, key, source_dir)
+        evicted = self.index.put(key, {
+            'job_id': job_id,
+            'config': normalize_mining_config(mining_config),
+            'size': size
+        })
+        await storage.run(self._evict, evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.index.stats()
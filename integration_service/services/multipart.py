@@ -0,0 +1,145 @@
+"""Streaming multipart/form-data bodies for upstream uploads."""
+import inspect
+import os
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from .storage import storage
+
+CRLF = b"\r\n"
+
+# (form field name, filename, source, content type)
+FilePart = Tuple[str, str, Any, str]
+
+
+def _quote(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+
+def _field_value(value: Any) -> bytes:
+    # Same encoding httpx uses for form data, so miners/loaders see identical values
+    if value is True:
+        return b"true"
+    if value is False:
+        return b"false"
+    return str(value).encode('utf-8')
+
+
+def source_filename(source: Any) -> str:
+    """Return the filename of a path or upload-like source."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(os.fspath(source))
+    return getattr(source, 'filename', None) or os.path.basename(getattr(source, 'name', 'upload'))
+
+
+async def iter_source(source: Any, chunk_size: int) -> AsyncIterator[bytes]:
+    """Yield a path, an async upload (e.g. UploadFile) or a file object in chunks.
+
+    Blocking reads run on the storage pool so the event loop is never
+    held up by disk I/O, and at most one chunk is held in memory at a time.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        async for chunk in storage.iter_chunks(source, chunk_size):
+            yield chunk
+        return
+
+    read = getattr(source, 'read')
+    seek = getattr(source, 'seek', None)
+    is_async = inspect.iscoroutinefunction(read)
+
+    if seek is not None:
+        if inspect.iscoroutinefunction(seek):
+            await seek(0)
+        else:
+            await storage.run(seek, 0)
+
+    while True:
+        if is_async:
+            chunk = await read(chunk_size)
+        else:
+            chunk = await storage.run(read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+class MultipartStream:
+    """A multipart/form-data request body produced chunk by chunk.
+
+    Form fields are sent first, followed by each file part streamed straight
+    from its source. With ``gzip_files`` every file part is compressed on the
+    fly and sent as ``<filename>.gz``. Memory use is bounded by ``chunk_size``
+    regardless of the size of the files.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, Any],
+        files: List[FilePart],
+        chunk_size: int = 1024 * 1024,
+        gzip_files: bool = False,
+        compresslevel: int = 6
+    ):
+        self.fields = fields
+        self.files = files
+        self.chunk_size = chunk_size
+        self.gzip_files = gzip_files
+        self.compresslevel = compresslevel
+        self.boundary = os.urandom(16).hex()
+        self.bytes_read = 0
+        self.bytes_sent = 0
+        # perf_counter() when the body was fully produced; None until then
+        self.completed_at: Optional[float] = None
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Content-Type": self.content_type}
+
+    def _part_header(self, name: str, filename: Optional[str] = None, content_type: Optional[str] = None) -> bytes:
+        disposition = f'form-data; name="{_quote(name)}"'
+        if filename is not None:
+            disposition += f'; filename="{_quote(filename)}"'
+        lines = [f"--{self.boundary}", f"Content-Disposition: {disposition}"]
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode('utf-8')
+
+    def _emit(self, data: bytes) -> bytes:
+        self.bytes_sent += len(data)
+        return data
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for name, value in self.fields.items():
+            if value is None:
+                continue
+            yield self._emit(self._part_header(name) + _field_value(value) + CRLF)
+
+        for name, filename, source, content_type in self.files:
+            compressor = None
+            if self.gzip_files:
+                # wbits=31 produces a gzip container rather than raw zlib
+                compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 31)
+                filename = f"{filename}.gz"
+                content_type = 'application/gzip'
+
+            yield self._emit(self._part_header(name, filename, content_type))
+            async for chunk in iter_source(source, self.chunk_size):
+                self.bytes_read += len(chunk)
+                if compressor is not None:
+                    # zlib releases the GIL; keep compression off the event loop
+                    chunk = await storage.run(compressor.compress, chunk)
+                    if not chunk:
+                        continue
+                yield self._emit(chunk)
+            if compressor is not None:
+                tail = compressor.flush()
+                if tail:
+                    yield self._emit(tail)
+            yield self._emit(CRLF)
+
+        yield self._emit(f"--{self.boundary}--\r\n".encode('utf-8'))
+        self.completed_at = time.perf_counter()
@@ -1,13 +1,43 @@
 """Main orchestration service for pipeline coordination."""  
 import os  
-import uuid  
-import httpx  
-import tempfile  
-import shutil
 import json
-from typing import Dict, Any, List  
-from .miner_service import MinerService  
+import shutil
+import asyncio
+import logging
+import time
+import weakref
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from .archive_service import ArchiveService
+from .deadlines import UPSTREAM_CANCELLATIONS, DeadlineExceeded, deadline_headers, within
+from .graph_partition import load_graph, partition_graph, sample_graph, save_graph
+from .graph_versions import DeltaFile, GraphVersions
+from .miner_service import DEFAULT_MINING_CONFIG, MinerService  
+from .http_client import http_clients
+from .ingest_cache import IngestCache
+from .job_storage import JobStorage
+from .materializer import Materializer
+from .metrics import job_timings, record_stage, stage_timer
+from .mining_budget import Admit, BudgetPlanner, calibration_job_id
+from .mining_cache import MiningCache, normalize_mining_config
+from .multipart import MultipartStream, source_filename
+from .pattern_results import load_patterns, merge_pattern_results
+from .results_index import ResultsIndex
+from .single_flight import SingleFlight
+from .storage import storage
 from ..config.settings import settings  
+
+logger = logging.getLogger(__name__)
+
+# Miner output directories mirrored from the shared volume
+OUTPUT_DIRS = ('results', 'plots')
+
+# Metadata copied next to each shard's graph
+SHARD_METADATA_FILES = ('networkx_metadata.json', 'job_metadata.json')
+
+
+def shard_job_id(job_id: str, index: int) -> str:
+    """Derived job id under which one shard of a partitioned run is mined."""
+    return f"{job_id}__shard_{index}"
   
 class OrchestrationService:  
     """Main pipeline orchestrator."""  
@@ -15,129 +45,441 @@ class OrchestrationService:
     def __init__(self):  
         self.miner_service = MinerService()  
         self.atomspace_url = settings.atomspace_url  
-        self.timeout = settings.atomspace_timeout  
-        self.local_output_dir = "/app/output"
+        self.local_output_dir = settings.local_output_dir
+        self.ingest_cache = IngestCache()
+        self.mining_cache = MiningCache()
+        self.materializer = Materializer()
+        self.archive_service = ArchiveService()
+        self.graph_versions = GraphVersions()
+        self.results_index = ResultsIndex()
+        self.budget_planner = BudgetPlanner(self._run_calibration)
+        # Identical concurrent requests share one AtomSpace load or miner run
+        self.ingest_flights = SingleFlight('ingest', leader_owned=True)
+        self.mining_flights = SingleFlight('mining')
+        # Serialize everything that writes a job's results and plots; a lock
+        # goes once nobody holds or waits for it
+        self._output_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        # Disk budget over job data; jobs being written are never evicted
+        self.job_storage = JobStorage(
+            lambda: (settings.shared_volume_path, self.local_output_dir), lock_for=self._output_lock
+        )
+        self.job_storage.protect(lambda: [job for job, lock in list(self._output_locks.items()) if lock.locked()])
+        self.job_storage.on_evict(self._forget_job)
+    
+    def _output_lock(self, job_id: str) -> asyncio.Lock:
+        return self._output_locks.setdefault(job_id, asyncio.Lock())
+
+    def _forget_job(self, job_id: str) -> None:
+        """Drop in-memory state of a job whose data was evicted."""
+        for root in (settings.shared_volume_path, self.local_output_dir):
+            self.results_index.invalidate(os.path.join(root, job_id))
     
     async def generate_networkx(
         self,
-        csv_files: List[str],
+        csv_files: List[Any],
         config: str,
         schema_json: str,
         writer_type: str,
         graph_type: str = "directed",
-        tenant_id: str = "default"
+        tenant_id: str = "default",
+        deadline: float = None
     ) -> Dict[str, Any]:
-        """Generate NetworkX graph from CSV files."""
+        """Generate NetworkX graph from CSV files.
+
+        ``csv_files`` may hold file paths or upload objects (e.g. ``UploadFile``);
+        either way the CSVs are streamed to AtomSpace in bounded chunks.
+        The AtomSpace request is abandoned, closing its connection, when the
+        caller is cancelled or ``deadline`` passes (``DeadlineExceeded``).
+        Identical requests made while one is loading wait for it and get its
+        job (this needs the ingest cache key, so only with the cache enabled).
+        """
         try:
-            job_id = str(uuid.uuid4())
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as config_file:  
-                config_file.write(config)  
-                config_path = config_file.name  
-                
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as schema_file:  
-                schema_file.write(schema_json)  
-                schema_path = schema_file.name  
-                
-            try:  
-                async with httpx.AsyncClient(timeout=self.timeout) as client:  
-                    files = []  
-                    for csv_file_path in csv_files:  
-                        csv_file = open(csv_file_path, 'rb')  
-                        files.append(('files', (os.path.basename(csv_file_path), csv_file, 'text/csv')))  
-                    
-                    data = {  
-                        'config': config,  
-                        'schema_json': schema_json,  
-                        'writer_type': writer_type,  
-                        'graph_type': graph_type,
-                        'tenant_id': tenant_id  
-                    }  
-                        
-                    response = await client.post(  
-                        f"{self.atomspace_url}/api/load",  
-                        files=files,  
-                        data=data  
-                    )  
-                        
-                    for _, (_, file_obj, _) in files:  
-                        file_obj.close()  
-                        
-                    if response.status_code != 200:  
-                        raise RuntimeError(f"AtomSpace returned {response.status_code}: {response.text}")  
-                        
-                    result = response.json()  
-                    
-                networkx_file = f"/shared/output/{result['job_id']}/networkx_graph.pkl"  
-                    
-                return {
-                    "job_id": result['job_id'],
-                    "status": "success",
-                    "networkx_file": networkx_file
-                }
-                    
-            finally:  
-                os.unlink(config_path)  
-                os.unlink(schema_path)
-                
+            cache_key = None
+            if settings.ingest_cache_enabled:
+                cache_key = await self.ingest_cache.key_for(
+                    csv_files, config, schema_json, writer_type, graph_type, tenant_id
+                )
+                cached = await self.ingest_cache.lookup(cache_key)
+                if cached is not None:
+                    self.job_storage.touch(cached['job_id'])
+                    return {
+                        "job_id": cached['job_id'],
+                        "status": "success",
+                        "networkx_file": f"/shared/output/{cached['job_id']}/networkx_graph.pkl",
+                        "cache_hit": True
+                    }
+
+            data = {
+                'config': config,
+                'schema_json': schema_json,
+                'writer_type': writer_type,
+                'graph_type': graph_type,
+                'tenant_id': tenant_id
+            }
+            async with within(deadline):
+                if cache_key is None:
+                    return await self._load_into_atomspace(csv_files, data, None)
+                return await self.ingest_flights.run(
+                    cache_key, lambda: self._load_into_atomspace(csv_files, data, cache_key)
+                )
+
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             return {"status": "error", "error": str(e)}
+
+    async def _load_into_atomspace(
+        self, csv_files: List[Any], data: Dict[str, Any], cache_key: Optional[str]
+    ) -> Dict[str, Any]:
+        """Stream the CSVs to AtomSpace and return the new job."""
+        client = http_clients.get('atomspace')
+        body = MultipartStream(
+            fields=data,
+            files=[('files', source_filename(f), f, 'text/csv') for f in csv_files],
+            chunk_size=settings.upload_chunk_size,
+            gzip_files=settings.atomspace_upload_gzip
+        )
+
+        # One request covers both stages: the upload ends when the last
+        # body byte is handed to the transport, AtomSpace's load when it answers.
+        started = time.perf_counter()
+        try:
+            response = await client.post(
+                f"{self.atomspace_url}/api/load",
+                content=body,
+                headers={**body.headers, **deadline_headers()}
+            )
+        except asyncio.CancelledError:
+            UPSTREAM_CANCELLATIONS.inc('atomspace')
+            raise
+        finally:
+            finished = time.perf_counter()
+            uploaded = body.completed_at or finished
+            record_stage('upload', uploaded - started, bytes_sent=body.bytes_sent, failed=body.completed_at is None)
+        record_stage(
+            'atomspace_load',
+            finished - uploaded,
+            bytes_received=len(response.content),
+            failed=response.status_code != 200
+        )
+
+        if response.status_code != 200:
+            raise RuntimeError(f"AtomSpace returned {response.status_code}: {response.text}")
+
+        result = response.json()
+        await job_timings.record(result['job_id'], 'upload', uploaded - started, bytes_sent=body.bytes_sent)
+        await job_timings.record(
+            result['job_id'], 'atomspace_load', finished - uploaded, bytes_received=len(response.content)
+        )
+
+        self.job_storage.touch(result['job_id'])
+        networkx_file = f"/shared/output/{result['job_id']}/networkx_graph.pkl"
+
+        if cache_key is not None:
+            await self.ingest_cache.store(cache_key, result['job_id'])
+
+        return {
+            "job_id": result['job_id'],
+            "status": "success",
+            "networkx_file": networkx_file,
+            "cache_hit": False
+        }
     
     async def mine_patterns(
         self,
         job_id: str,
         mining_config: Dict[str, Any]
     ) -> Dict[str, Any]:
+        """Mine a job's graph and mirror the results for download.
+
+        A request identical to one in flight (same job, graph version and
+        effective miner parameters) waits for that run and gets its result,
+        marked ``coalesced``. Runs of the same job with different parameters
+        take turns, since they write the same output directories.
+        """
         try:
-            # Verify NetworkX file exists
-            networkx_file = f"/shared/output/{job_id}/networkx_graph.pkl"
-            if not os.path.exists(networkx_file):
-                raise FileNotFoundError(f"NetworkX file not found for job_id: {job_id}")
+            self.job_storage.touch(job_id)
+            miner_config = mining_config.copy()
+            # The latest graph version unless the caller pins one
+            graph_version, networkx_file = await self.graph_versions.graph_file(
+                job_id, miner_config.pop('graph_version', None)
+            )
             
             graph_output_format = mining_config.get('graph_output_format', 'representative')
             visualize_instances = (graph_output_format == 'instance')
             
-            miner_config = mining_config.copy()
             miner_config['visualize_instances'] = visualize_instances
-            
-            await self.miner_service.mine_motifs(
-                networkx_file,
-                job_id=job_id,
-                mining_config=miner_config
+            allow_unseeded = miner_config.pop('reuse_unseeded_results', None)
+            shards = int(miner_config.get('partition_shards') or settings.partition_shards or 0)
+            if shards > 1:
+                miner_config['partition_shards'] = shards
+            else:
+                miner_config.pop('partition_shards', None)
+
+            plan = miner_config.pop('budget_plan', None)
+
+            key = json.dumps(
+                [job_id, graph_version, allow_unseeded, normalize_mining_config(miner_config)], sort_keys=True
             )
-            
-            local_paths = self._copy_to_local_output(job_id)
-            
-            download_url = f"http://localhost:9000/api/download-result?job_id={job_id}"
-            
-            return {
-                "job_id": job_id,
-                "status": "success",
-                "output_paths": local_paths,
-                "download_url": download_url
-            }
+            coalesced = key in self.mining_flights
+            result = await self.mining_flights.run(
+                key,
+                lambda: self._mine(job_id, networkx_file, graph_version, miner_config, allow_unseeded, shards, plan)
+            )
+            # Idle time counts from when the results were written
+            self.job_storage.touch(job_id)
+            if coalesced:
+                result = {**result, "coalesced": True}
+            if plan is not None:
+                result = {**result, "budget": plan}
+            return result
         except Exception as e:
             return {"status": "error", "error": str(e)}
+
+    async def _mine(
+        self,
+        job_id: str,
+        networkx_file: str,
+        graph_version: int,
+        miner_config: Dict[str, Any],
+        allow_unseeded: Optional[bool],
+        shards: int,
+        plan: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        async with self._output_lock(job_id):
+            cache_key = None
+            if settings.mining_cache_enabled and self.mining_cache.is_cacheable(miner_config, allow_unseeded):
+                cache_key = await self.mining_cache.key_for(networkx_file, miner_config)
+                if await self.mining_cache.materialize(cache_key, self._job_output_dir(job_id)) is not None:
+                    return self._mining_response(
+                        job_id, self._local_output_paths(job_id), cache_hit=True, graph_version=graph_version
+                    )
+
+            partitioned = shards > 1 and await self._mine_partitioned(job_id, networkx_file, miner_config, shards)
+            if not partitioned:
+                started = time.perf_counter()
+                try:
+                    async with stage_timer('miner_call', job_id):
+                        await self.miner_service.mine_motifs(
+                            networkx_file,
+                            job_id=job_id,
+                            mining_config=miner_config
+                        )
+                except asyncio.CancelledError:
+                    if plan is not None:
+                        await self.budget_planner.record(job_id, plan, time.perf_counter() - started, completed=False)
+                    raise
+                if plan is not None:
+                    await self.budget_planner.record(job_id, plan, time.perf_counter() - started)
+
+            local_paths = await self._copy_to_local_output(job_id)
+
+            if cache_key is not None:
+                shared_job_dir = storage.shared_path(job_id)
+                await self.mining_cache.store(cache_key, shared_job_dir, job_id, miner_config)
+
+            return self._mining_response(job_id, local_paths, cache_hit=False, graph_version=graph_version)
     
+    async def _mine_partitioned(
+        self,
+        job_id: str,
+        networkx_file: str,
+        miner_config: Dict[str, Any],
+        shards: int
+    ) -> bool:
+        """Mine the graph as ``shards`` overlapping pieces in parallel and merge the motifs.
+
+        Each shard owns a BFS region of the graph plus a halo of ``radius``
+        hops, so every neighborhood the miner samples around an owned node
+        is intact. The shard graph lists its owned nodes in
+        ``graph['core_nodes']`` for the miner to take as the only sampling
+        centres; a miner that ignores it also samples around halo nodes, and
+        unless it lists instances (which the merge deduplicates) the merged
+        counts of patterns near shard borders are then too high. Shards run
+        as derived jobs (``<job_id>__shard_<i>``) on the miner pool; their
+        patterns are merged by isomorphism class into ``results/patterns.json``
+        of the job. Returns False, leaving the caller to mine the whole graph,
+        when the graph is below ``PARTITION_MIN_NODES``.
+        """
+        graph = await storage.run(load_graph, networkx_file)
+        if graph.number_of_nodes() < settings.partition_min_nodes:
+            return False
+
+        async with stage_timer('partition', job_id):
+            halo = int(miner_config.get('radius') or DEFAULT_MINING_CONFIG['radius'])
+            parts = await storage.run(partition_graph, graph, shards, halo)
+            del graph
+            shard_ids = [shard_job_id(job_id, part.index) for part in parts]
+            await storage.run(self._write_shards, job_id, parts, shard_ids)
+
+        async with stage_timer('miner_call', job_id):
+            async with asyncio.TaskGroup() as group:
+                for shard_id in shard_ids:
+                    group.create_task(self.miner_service.mine_motifs(
+                        storage.shared_path(shard_id, "networkx_graph.pkl"),
+                        job_id=shard_id,
+                        mining_config=miner_config
+                    ))
+
+        directed = str(miner_config.get('graph_type', 'directed')).lower() == 'directed'
+        summary = {
+            "shards": [
+                {"job_id": shard_id, "core_nodes": len(part.core), "halo_nodes": part.halo_size}
+                for shard_id, part in zip(shard_ids, parts)
+            ],
+            "halo": halo
+        }
+        async with stage_timer('merge', job_id):
+            await storage.run(self._merge_shards, job_id, shard_ids, directed, summary)
+        return True
+
+    @staticmethod
+    def _write_derived_graph(job_id: str, derived_id: str, graph) -> None:
+        """Save ``graph`` as the graph of job ``derived_id``, with ``job_id``'s metadata."""
+        derived_dir = storage.shared_path(derived_id)
+        os.makedirs(derived_dir, exist_ok=True)
+        save_graph(graph, os.path.join(derived_dir, "networkx_graph.pkl"))
+        for name in SHARD_METADATA_FILES:
+            source = storage.shared_path(job_id, name)
+            if os.path.exists(source):
+                shutil.copy2(source, os.path.join(derived_dir, name))
+
+    @classmethod
+    def _write_shards(cls, job_id: str, parts, shard_ids: List[str]) -> None:
+        for part, shard_id in zip(parts, shard_ids):
+            cls._write_derived_graph(job_id, shard_id, part.graph)
+
+    async def plan_mining_budget(
+        self,
+        job_id: str,
+        mining_config: Dict[str, Any],
+        time_budget: float,
+        deadline: float = None,
+        admit: Admit = None
+    ) -> Dict[str, Any]:
+        """Choose sampling parameters so mining ``job_id`` fits in ``time_budget`` seconds.
+
+        See :class:`BudgetPlanner`; raises ``BudgetTooSmall`` when nothing fits
+        and ``AdmissionRejected`` when ``admit`` turns a calibration pass down.
+        """
+        graph_version, networkx_file = await self.graph_versions.graph_file(
+            job_id, mining_config.get('graph_version')
+        )
+        async with within(deadline):
+            return await self.budget_planner.plan(
+                job_id, graph_version, networkx_file, mining_config, time_budget, admit=admit
+            )
+
+    async def _run_calibration(
+        self, job_id: str, networkx_file: str, mining_config: Dict[str, Any]
+    ) -> Tuple[float, int, int]:
+        """Mine a small sample of the graph and return (seconds, sample nodes, sample edges)."""
+        sample_id = calibration_job_id(job_id)
+        graph = await storage.run(load_graph, networkx_file)
+        sample = await storage.run(sample_graph, graph, settings.mining_calibration_nodes)
+        del graph
+        await storage.run(self._write_derived_graph, job_id, sample_id, sample)
+
+        # Time the attempt that answered, not the wait for a free miner
+        started = None
+
+        def sent() -> None:
+            nonlocal started
+            started = time.perf_counter()
+
+        async with stage_timer('calibration', job_id):
+            await self.miner_service.mine_motifs(
+                storage.shared_path(sample_id, "networkx_graph.pkl"),
+                job_id=sample_id,
+                mining_config=mining_config,
+                on_send=sent
+            )
+            seconds = time.perf_counter() - started
+        return seconds, sample.number_of_nodes(), sample.number_of_edges()
+
+    @staticmethod
+    def _merge_shards(job_id: str, shard_ids: List[str], directed: bool, summary: Dict[str, Any]) -> None:
+        shard_patterns = [load_patterns(storage.shared_path(shard_id, "results")) for shard_id in shard_ids]
+        merged = merge_pattern_results(shard_patterns, directed)
+
+        job_dir = storage.shared_path(job_id)
+        for name in OUTPUT_DIRS:
+            shutil.rmtree(os.path.join(job_dir, name), ignore_errors=True)
+        results_dir = os.path.join(job_dir, "results")
+        os.makedirs(results_dir)
+        with open(os.path.join(results_dir, "patterns.json"), 'w') as f:
+            json.dump({"patterns": merged}, f, default=str)
+        with open(os.path.join(results_dir, "partition.json"), 'w') as f:
+            json.dump(summary, f)
+
+        # Keep each shard's plots, grouped per shard
+        for index, shard_id in enumerate(shard_ids):
+            plots = storage.shared_path(shard_id, "plots")
+            if os.path.isdir(plots):
+                shutil.copytree(plots, os.path.join(job_dir, "plots", f"shard_{index}"))
+
+    def _mining_response(
+        self,
+        job_id: str,
+        local_paths: Dict[str, str],
+        cache_hit: bool,
+        graph_version: int = 0
+    ) -> Dict[str, Any]:
+        download_url = f"http://localhost:9000/api/download-result?job_id={job_id}"
+        return {
+            "job_id": job_id,
+            "status": "success",
+            "output_paths": local_paths,
+            "download_url": download_url,
+            "cache_hit": cache_hit,
+            "graph_version": graph_version
+        }
+
+    async def update_graph(
+        self,
+        job_id: str,
+        delta_files: List[DeltaFile],
+        base_version: int = None
+    ) -> Dict[str, Any]:
+        """Add a graph version to ``job_id`` from delta CSVs.
+
+        Only the delta is parsed and stored; the new version's graph is
+        built when it is first mined. Raises ``FileNotFoundError`` for an
+        unknown job, ``VersionConflict`` when ``base_version`` is stale and
+        ``ValueError`` for malformed CSVs. Uploading the job's original
+        CSVs again afterwards builds a new job instead of returning this one.
+        """
+        self.job_storage.touch(job_id)
+        entry = await self.graph_versions.add_delta(job_id, delta_files, base_version)
+        # Mining without a version now takes the new one, which is not what those CSVs describe
+        await self.ingest_cache.forget_job(job_id)
+        return {
+            "job_id": job_id,
+            "status": "success",
+            "graph_version": entry["version"],
+            "parent_version": entry["parent"],
+            "changes": entry["changes"],
+            "metadata_file": f"/shared/output/{job_id}/networkx_metadata.v{entry['version']}.json"
+        }
+
     async def get_graph_type_from_metadata(self, job_id: str) -> str:
         """Read graph_type from networkx_metadata.json"""
-        metadata_path = f"/shared/output/{job_id}/networkx_metadata.json"
+        metadata_path = storage.shared_path(job_id, "networkx_metadata.json")
         
-        if not os.path.exists(metadata_path):
-            metadata_path = f"/shared/output/{job_id}/job_metadata.json"
+        if not await storage.exists(metadata_path):
+            metadata_path = storage.shared_path(job_id, "job_metadata.json")
             
-        if not os.path.exists(metadata_path):
+        if not await storage.exists(metadata_path):
             raise FileNotFoundError(
                 f"Metadata file not found for job_id: {job_id} "
                 f"(checked networkx_metadata.json and job_metadata.json)"
             )
         
         try:
-            with open(metadata_path, 'r') as f:
-                metadata = json.load(f)
+            metadata = await storage.read_json(metadata_path, cached=True)
             
             graph_type = metadata.get('graph_type', 'directed')
-            print(f"Auto-detected graph_type='{graph_type}' from metadata for job_id={job_id}")
+            logger.info("Auto-detected graph_type=%r from metadata for job_id=%s", graph_type, job_id)
             return graph_type
             
         except json.JSONDecodeError as e:
@@ -145,35 +487,76 @@ class OrchestrationService:
         except Exception as e:
             raise RuntimeError(f"Error reading metadata for job_id: {job_id}: {str(e)}")
     
-    def _copy_to_local_output(self, job_id: str) -> Dict[str, str]:
-        """Copy results from shared volume to local directory and return paths."""
-        shared_job_dir = f"/shared/output/{job_id}"
+    async def _copy_to_local_output(self, job_id: str) -> Dict[str, str]:
+        """Materialize results from shared volume into the local directory and return paths.
+
+        How files get there (reflink, hardlink, symlink, direct serving or an
+        incremental copy) is decided by the configured materialize strategy;
+        the work runs on the materializer's thread pool.
+        """
+        shared_job_dir = os.path.join(settings.shared_volume_path, job_id)
         local_job_dir = f"{self.local_output_dir}/{job_id}"
+
+        async with stage_timer('result_copy', job_id):
+            for name in OUTPUT_DIRS:
+                await self.materializer.materialize(
+                    os.path.join(shared_job_dir, name),
+                    os.path.join(local_job_dir, name)
+                )
         
-        os.makedirs(local_job_dir, exist_ok=True)
-        
-        shared_results = f"{shared_job_dir}/results"
-        local_results = f"{local_job_dir}/results"
-        if os.path.exists(shared_results):
-            if os.path.exists(local_results):
-                shutil.rmtree(local_results)
-            shutil.copytree(shared_results, local_results)
-        
-        shared_plots = f"{shared_job_dir}/plots"
-        local_plots = f"{local_job_dir}/plots"
-        if os.path.exists(shared_plots):
-            if os.path.exists(local_plots):
-                shutil.rmtree(local_plots)
-            shutil.copytree(shared_plots, local_plots)
-        
+        return self._local_output_paths(job_id)
+
+    def _job_output_dir(self, job_id: str) -> str:
+        """Directory that downloads for a job are served from."""
+        if self.materializer.serves_shared:
+            return os.path.join(settings.shared_volume_path, job_id)
+        return os.path.join(self.local_output_dir, job_id)
+
+    def _iter_output_files(self, job_id: str):
+        """Yield (path, archive name) for every result and plot file of a job."""
+        job_dir = self._job_output_dir(job_id)
+        for name in OUTPUT_DIRS:
+            top = os.path.join(job_dir, name)
+            # followlinks so symlink-materialized directories are included
+            for root, dirs, files in os.walk(top, followlinks=True):
+                dirs.sort()
+                for filename in sorted(files):
+                    path = os.path.join(root, filename)
+                    yield path, os.path.relpath(path, job_dir)
+
+    async def query_patterns(self, job_id: str, **filters) -> Dict[str, Any]:
+        """A filtered, sorted page of a job's mined patterns (see ``query_index``)."""
+        self.job_storage.touch(job_id)
+        page = await self.results_index.query(self._job_output_dir(job_id), job_id, **filters)
+        return {"job_id": job_id, **page}
+
+    async def get_pattern(
+        self,
+        job_id: str,
+        pattern_id: int,
+        instance_offset: int = 0,
+        instance_limit: int = 100
+    ) -> Dict[str, Any]:
+        """One mined pattern with a page of its instances."""
+        self.job_storage.touch(job_id)
+        pattern = await self.results_index.pattern(
+            self._job_output_dir(job_id),
+            pattern_id,
+            job_id,
+            instance_offset=instance_offset,
+            instance_limit=instance_limit
+        )
+        return {"job_id": job_id, **pattern}
+
+    def _local_output_paths(self, job_id: str) -> Dict[str, str]:
         return {
             "results": f"./integration_service/output/{job_id}/results",
             "plots": f"./integration_service/output/{job_id}/plots"
         }
 
     def get_result_file_path(self, job_id: str, filename: str) -> str:
-    
-        job_dir = os.path.abspath(os.path.join(self.local_output_dir, job_id))
+        self.job_storage.touch(job_id)
+        job_dir = os.path.abspath(self._job_output_dir(job_id))
         file_path = os.path.abspath(os.path.join(job_dir, filename))
         
         if not file_path.startswith(job_dir):
@@ -184,17 +567,49 @@ class OrchestrationService:
             
         return file_path
 
-    def create_job_archive(self, job_id: str) -> str:
-        """
-        Create a zip archive of the entire job directory.
-        """
-        job_dir = os.path.join(self.local_output_dir, job_id)
+    def job_archive_path(self, job_id: str) -> str:
+        return os.path.join(self.local_output_dir, f"{job_id}.zip")
+
+    def _archive_manifest(self, job_id: str):
+        self.job_storage.touch(job_id)
+        job_dir = self._job_output_dir(job_id)
         if not os.path.exists(job_dir):
             raise FileNotFoundError(f"Job directory not found: {job_id}")
-        
-        zip_base_name = os.path.join(self.local_output_dir, f"{job_id}")
-        zip_file_path = f"{zip_base_name}.zip"
-        
-        shutil.make_archive(zip_base_name, 'zip', job_dir)
-        
-        return zip_file_path
\ No newline at end of file
+        files = list(self._iter_output_files(job_id))
+        return files, self.archive_service.etag_for(files)
+
+    async def prepare_job_archive(self, job_id: str) -> Dict[str, Any]:
+        """Describe a job's archive: its files, ETag, cache path and whether it is cached."""
+        files, etag = await storage.run(self._archive_manifest, job_id)
+        zip_path = self.job_archive_path(job_id)
+        cached_etag = await storage.run(self.archive_service.cached_etag, zip_path)
+        return {
+            "files": files,
+            "etag": etag,
+            "path": zip_path,
+            "cached": cached_etag == etag
+        }
+
+    async def build_job_archive(self, job_id: str, archive: Dict[str, Any]) -> str:
+        """Write the archive described by :meth:`prepare_job_archive` to its cache path."""
+        async with stage_timer('archive', job_id) as timer:
+            zip_path = await self.archive_service.build_async(archive["files"], archive["path"], archive["etag"])
+            if not archive["cached"]:
+                timer.add_bytes(sent=(await storage.stat(zip_path)).st_size)
+        return zip_path
+
+    async def stream_job_archive(self, job_id: str, archive: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """Stream the archive described by :meth:`prepare_job_archive` while it is built."""
+        started = time.perf_counter()
+        sent = 0
+        completed = False
+        try:
+            async for chunk in self.archive_service.stream(archive["files"], archive["path"], archive["etag"]):
+                sent += len(chunk)
+                yield chunk
+            completed = True
+        finally:
+            # Timed by hand: the response may close this generator from another context
+            seconds = time.perf_counter() - started
+            record_stage('archive', seconds, bytes_sent=sent, failed=not completed)
+            await job_timings.record(job_id, 'archive', seconds, bytes_sent=sent, failed=not completed)
@@ -0,0 +1,205 @@
+"""Reading, and merging across shards, the pattern results the miner writes under ``results/``."""
+import json
+import os
+import pickle
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+import networkx as nx
+from networkx.algorithms import isomorphism
+
+# Keys the miner may use for how often a pattern occurs
+COUNT_KEYS = ('count', 'frequency', 'support', 'occurrences')
+PICKLE_EXTENSIONS = ('.p', '.pkl', '.pickle')
+
+
+def _patterns_in(document: Any) -> List[Any]:
+    if isinstance(document, list):
+        return document
+    if isinstance(document, dict):
+        for key in ('patterns', 'motifs', 'results'):
+            if isinstance(document.get(key), list):
+                return document[key]
+    return []
+
+
+def load_patterns(results_dir: str) -> List[Any]:
+    """Return every pattern record found in ``results_dir``.
+
+    The miner writes either a list of patterns or an object with a
+    ``patterns`` (or ``motifs``/``results``) list, as JSON or as a pickle
+    (where records may also be networkx graphs). Files in other formats are
+    skipped. Blocking – call through the storage pool.
+    """
+    patterns: List[Any] = []
+    if not os.path.isdir(results_dir):
+        return patterns
+    for root, dirs, files in os.walk(results_dir, followlinks=True):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                if name.endswith('.json'):
+                    with open(path, 'r') as f:
+                        patterns.extend(_patterns_in(json.load(f)))
+                elif name.endswith(PICKLE_EXTENSIONS):
+                    # Written by our own miner on the shared volume
+                    with open(path, 'rb') as f:
+                        patterns.extend(_patterns_in(pickle.load(f)))
+            except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                continue
+    return patterns
+
+
+def summarize_results(results_dir: str) -> Dict[str, Any]:
+    """Pattern count and result file count for a job's ``results/`` directory."""
+    files = 0
+    if os.path.isdir(results_dir):
+        for _, _, names in os.walk(results_dir, followlinks=True):
+            files += len(names)
+    return {"pattern_count": len(load_patterns(results_dir)), "result_files": files}
+
+
+# --- Pattern records as graphs ---
+
+def _node_entries(nodes: Iterable[Any]) -> Iterable[Tuple[Hashable, Dict[str, Any]]]:
+    for node in nodes:
+        if isinstance(node, dict):
+            attrs = {k: v for k, v in node.items() if k != 'id'}
+            yield node.get('id'), attrs
+        else:
+            yield node, {}
+
+
+def _edge_entries(edges: Iterable[Any]) -> Iterable[Tuple[Hashable, Hashable, Dict[str, Any]]]:
+    for edge in edges:
+        if isinstance(edge, dict):
+            attrs = {k: v for k, v in edge.items() if k not in ('source', 'target')}
+            yield edge['source'], edge['target'], attrs
+        elif len(edge) >= 3 and isinstance(edge[2], dict):
+            yield edge[0], edge[1], dict(edge[2])
+        else:
+            yield edge[0], edge[1], {}
+
+
+def pattern_graph(record: Any, directed: bool) -> Optional[nx.Graph]:
+    """Build the pattern graph of a record (a networkx graph or a nodes/edges dict)."""
+    if isinstance(record, nx.Graph):
+        return record
+    if not isinstance(record, dict):
+        return None
+    if isinstance(record.get('graph'), nx.Graph):
+        return record['graph']
+    if 'edges' not in record and 'nodes' not in record:
+        return None
+
+    graph = nx.DiGraph() if directed else nx.Graph()
+    for node, attrs in _node_entries(record.get('nodes', [])):
+        graph.add_node(node, **attrs)
+    for source, target, attrs in _edge_entries(record.get('edges', [])):
+        graph.add_edge(source, target, **attrs)
+    return graph
+
+
+def pattern_count(record: Any) -> int:
+    if isinstance(record, dict):
+        for key in COUNT_KEYS:
+            if record.get(key) is not None:
+                return int(record[key])
+        if isinstance(record.get('instances'), list):
+            return len(record['instances'])
+    return 1
+
+
+def _instance_key(instance: Any, directed: bool) -> Optional[Hashable]:
+    """Identity of a pattern occurrence in the data graph: its nodes and edges."""
+    if isinstance(instance, nx.Graph):
+        nodes, edges = instance.nodes, instance.edges
+    elif isinstance(instance, dict):
+        nodes = [n for n, _ in _node_entries(instance.get('nodes', []))]
+        edges = [(s, t) for s, t, _ in _edge_entries(instance.get('edges', []))]
+    elif isinstance(instance, (list, tuple)):
+        nodes, edges = instance, []
+    else:
+        return None
+    if directed:
+        edge_key = frozenset((s, t) for s, t in edges)
+    else:
+        edge_key = frozenset(frozenset((s, t)) for s, t in edges)
+    return frozenset(nodes), edge_key
+
+
+def _attr_name(graphs: List[nx.Graph], candidates: Tuple[str, ...], edges: bool) -> Optional[str]:
+    """The first attribute present on every node (or edge) of every graph."""
+    for name in candidates:
+        if all(
+            all(name in data for *_, data in (g.edges(data=True) if edges else g.nodes(data=True)))
+            for g in graphs
+        ):
+            return name
+    return None
+
+
+def record_out(graph: nx.Graph) -> Dict[str, Any]:
+    """A pattern graph as a JSON-friendly nodes/edges record."""
+    return {
+        "nodes": [{"id": node, **attrs} for node, attrs in graph.nodes(data=True)],
+        "edges": [{"source": s, "target": t, **attrs} for s, t, attrs in graph.edges(data=True)]
+    }
+
+
+def merge_pattern_results(shard_patterns: List[List[Any]], directed: bool) -> List[Dict[str, Any]]:
+    """Merge pattern lists from several shards by isomorphism class.
+
+    Patterns are bucketed by Weisfeiler-Lehman hash (using node/edge labels
+    when present) and confirmed with an exact isomorphism check. Instances
+    are deduplicated on their data-graph nodes and edges, so an occurrence
+    found in the overlapping halo of two shards is counted once; the count
+    of a class is its number of distinct instances when instances are
+    reported, otherwise the sum of the shards' counts.
+    """
+    entries = []
+    for shard, patterns in enumerate(shard_patterns):
+        for record in patterns:
+            graph = pattern_graph(record, directed)
+            if graph is not None and graph.number_of_nodes():
+                entries.append((shard, record, graph))
+
+    graphs = [graph for _, _, graph in entries]
+    node_attr = _attr_name(graphs, ('label', 'type'), edges=False)
+    edge_attr = _attr_name(graphs, ('label', 'type'), edges=True)
+    node_match = isomorphism.categorical_node_match(node_attr, None) if node_attr else None
+    edge_match = isomorphism.categorical_edge_match(edge_attr, None) if edge_attr else None
+
+    classes: Dict[str, List[Dict[str, Any]]] = {}
+    for shard, record, graph in entries:
+        wl_hash = nx.weisfeiler_lehman_graph_hash(graph, node_attr=node_attr, edge_attr=edge_attr)
+        bucket = classes.setdefault(wl_hash, [])
+        for merged in bucket:
+            if nx.is_isomorphic(merged['graph'], graph, node_match=node_match, edge_match=edge_match):
+                break
+        else:
+            merged = {'graph': graph, 'wl_hash': wl_hash, 'count': 0, 'instances': {}, 'has_instances': False, 'shards': set()}
+            bucket.append(merged)
+
+        merged['shards'].add(shard)
+        instances = record.get('instances') if isinstance(record, dict) else None
+        if isinstance(instances, list):
+            merged['has_instances'] = True
+            for instance in instances:
+                key = _instance_key(instance, directed)
+                if key is not None:
+                    merged['instances'].setdefault(key, instance)
+        else:
+            merged['count'] += pattern_count(record)
+
+    results = []
+    for bucket in classes.values():
+        for merged in bucket:
+            out = record_out(merged['graph'])
+            out['wl_hash'] = merged['wl_hash']
+            out['count'] = len(merged['instances']) if merged['has_instances'] else merged['count']
+            if merged['has_instances']:
+                out['instances'] = list(merged['instances'].values())
+            out['shards'] = sorted(merged['shards'])
+            results.append(out)
+    results.sort(key=lambda r: (-r['count'], r['wl_hash']))
+    return results
@@ -0,0 +1,189 @@
+"""Push-based progress events for mining jobs.
+
+A single watcher per job follows ``<shared volume>/<job_id>/progress.json``
+and fans changes out to every subscriber, so filesystem work scales with the
+number of progress updates rather than with viewers times poll rate.
+"""
+import asyncio
+import json
+import logging
+import os
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+from .storage import storage
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FILE = "progress.json"
+TERMINAL_STATUSES = ('completed', 'complete', 'done', 'success', 'error', 'failed', 'cancelled')
+
+PENDING = {
+    "status": "pending",
+    "progress": 0,
+    "message": "Waiting for miner to start..."
+}
+
+try:
+    import watchfiles
+except ImportError:  # pragma: no cover - watchfiles ships with uvicorn[standard]
+    watchfiles = None
+
+
+def progress_path(job_id: str) -> str:
+    return os.path.join(settings.shared_volume_path, job_id, PROGRESS_FILE)
+
+
+def is_terminal(progress: Dict[str, Any]) -> bool:
+    return str(progress.get('status', '')).lower() in TERMINAL_STATUSES
+
+
+def _stat_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        # Caught the miner mid-write; the next change event will have it.
+        return None
+
+
+async def read_progress(job_id: str) -> Dict[str, Any]:
+    """Read a job's progress once without blocking the event loop."""
+    progress = await storage.run(_read_json, progress_path(job_id))
+    return progress if progress is not None else dict(PENDING)
+
+
+class _JobWatcher:
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.path = progress_path(job_id)
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.latest: Optional[Dict[str, Any]] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def publish(self, progress: Dict[str, Any]) -> None:
+        self.latest = progress
+        for queue in self.subscribers:
+            # Subscribers only need the newest state; drop anything unread.
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(progress)
+
+
+class ProgressHub:
+    """Owns one watcher task per job and broadcasts progress changes."""
+
+    def __init__(self, poll_interval: float = None, use_inotify: bool = None):
+        self.poll_interval = poll_interval if poll_interval is not None else settings.progress_poll_interval
+        if use_inotify is None:
+            use_inotify = settings.progress_use_inotify
+        self.use_inotify = use_inotify and watchfiles is not None
+        self._watchers: Dict[str, _JobWatcher] = {}
+
+    @property
+    def watcher_count(self) -> int:
+        return len(self._watchers)
+
+    def snapshot(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Latest progress seen by an active watcher, if there is one."""
+        watcher = self._watchers.get(job_id)
+        return watcher.latest if watcher is not None else None
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the current progress and then every change until a terminal status."""
+        watcher = self._watchers.get(job_id)
+        if watcher is None:
+            watcher = _JobWatcher(job_id)
+            self._watchers[job_id] = watcher
+            watcher.task = asyncio.create_task(self._watch(watcher))
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        watcher.subscribers.add(queue)
+        if watcher.latest is not None:
+            queue.put_nowait(watcher.latest)
+
+        try:
+            while True:
+                progress = await queue.get()
+                yield progress
+                if is_terminal(progress):
+                    return
+        finally:
+            watcher.subscribers.discard(queue)
+            if not watcher.subscribers and self._watchers.get(job_id) is watcher:
+                del self._watchers[job_id]
+                watcher.task.cancel()
+
+    async def close(self) -> None:
+        watchers = list(self._watchers.values())
+        self._watchers.clear()
+        for watcher in watchers:
+            watcher.task.cancel()
+        await asyncio.gather(*(w.task for w in watchers), return_exceptions=True)
+
+    async def _watch(self, watcher: _JobWatcher) -> None:
+        last_signature: Any = object()
+        last_progress = None
+        try:
+            async with aclosing(self._changes(watcher.path)) as changes:
+                async for _ in changes:
+                    signature = await storage.run(_stat_signature, watcher.path)
+                    if signature == last_signature:
+                        continue
+                    last_signature = signature
+
+                    if signature is None:
+                        progress = dict(PENDING)
+                    else:
+                        progress = await storage.run(_read_json, watcher.path)
+                        if progress is None:
+                            last_signature = object()
+                            continue
+
+                    if progress != last_progress:
+                        last_progress = progress
+                        watcher.publish(progress)
+                        if is_terminal(progress):
+                            return
+        except Exception:
+            logger.exception("Progress watcher for job %s failed", watcher.job_id)
+            watcher.publish({"status": "error", "progress": 0, "message": "Progress watcher failed"})
+
+    async def _changes(self, path: str) -> AsyncIterator[None]:
+        """Tick once immediately and then whenever the progress file may have changed.
+
+        Uses inotify (via watchfiles) on the job directory once it exists, with
+        a periodic timeout tick as a safety net for filesystems that do not
+        deliver events; otherwise falls back to mtime polling.
+        """
+        yield None
+        job_dir = os.path.dirname(path)
+        while True:
+            if self.use_inotify and await storage.isdir(job_dir):
+                name = os.path.basename(path)
+                async for _ in watchfiles.awatch(
+                    job_dir,
+                    watch_filter=lambda change, changed: os.path.basename(changed) == name,
+                    debounce=50,
+                    step=10,
+                    rust_timeout=int(self.poll_interval * 5000),
+                    yield_on_timeout=True,
+                    recursive=False
+                ):
+                    yield None
+                continue
+            await asyncio.sleep(self.poll_interval)
+            yield None
+
+
+progress_hub = ProgressHub()
@@ -0,0 +1,268 @@
+"""Index over a job's mined patterns for the paginated results API.
+
+The miner's ``results/`` output is parsed once into ``results_index/`` next
+to it: ``patterns.jsonl`` holds one pattern record per line and
+``index.json`` a compact summary of every pattern (size, count, score,
+labels) with the byte offset of its record. Listings are answered from the
+summaries alone; a single pattern is read back with one seek. Indexes are
+kept in a bounded in-memory LRU and rebuilt when the results change.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import weakref
+from collections import OrderedDict
+from numbers import Number
+from typing import Any, Dict, List, Optional, Tuple
+import networkx as nx
+from .metrics import stage_timer
+from .pattern_results import load_patterns, pattern_count, pattern_graph, record_out
+from .storage import storage
+from ..config.settings import settings
+
+INDEX_DIR = "results_index"
+INDEX_FILE = "index.json"
+RECORDS_FILE = "patterns.jsonl"
+# Bumped when the index layout changes so old indexes are rebuilt
+INDEX_FORMAT = 1
+
+SORT_KEYS = ('count', 'size', 'edges', 'score', 'instances', 'id')
+LABEL_KEYS = ('label', 'type')
+
+
+def results_fingerprint(results_dir: str) -> str:
+    """Identity of a ``results/`` directory: its file names, sizes and mtimes (blocking)."""
+    if not os.path.isdir(results_dir):
+        raise FileNotFoundError(f"No results found in {results_dir}")
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(results_dir, followlinks=True):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            digest.update(f"{os.path.relpath(path, results_dir)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:32]
+
+
+def _jsonable(record: Any) -> Dict[str, Any]:
+    """A pattern record as JSON: networkx graphs become nodes/edges lists."""
+    if isinstance(record, nx.Graph):
+        return record_out(record)
+    if not isinstance(record, dict):
+        return {"value": record}
+    out = dict(record)
+    if isinstance(out.get('graph'), nx.Graph):
+        out.update(record_out(out.pop('graph')))
+    if isinstance(out.get('instances'), list):
+        out['instances'] = [record_out(i) if isinstance(i, nx.Graph) else i for i in out['instances']]
+    return out
+
+
+def _labels(items) -> List[str]:
+    labels = set()
+    for *_, data in items:
+        for key in LABEL_KEYS:
+            if data.get(key) is not None:
+                labels.add(str(data[key]))
+                break
+    return sorted(labels)
+
+
+def _summary(pattern_id: int, record: Any) -> Dict[str, Any]:
+    graph = pattern_graph(record, directed=True)
+    fields = record if isinstance(record, dict) else {}
+    score = fields.get('score')
+    instances = fields.get('instances')
+    return {
+        "id": pattern_id,
+        "size": graph.number_of_nodes() if graph is not None else fields.get('size'),
+        "edges": graph.number_of_edges() if graph is not None else None,
+        "count": pattern_count(record),
+        "score": score if isinstance(score, Number) and not isinstance(score, bool) else None,
+        "instances": len(instances) if isinstance(instances, list) else 0,
+        "node_labels": _labels(graph.nodes(data=True)) if graph is not None else [],
+        "edge_labels": _labels(graph.edges(data=True)) if graph is not None else []
+    }
+
+
+def _facets(patterns: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    facets: Dict[str, Dict[str, int]] = {"sizes": {}, "node_labels": {}, "edge_labels": {}}
+    for pattern in patterns:
+        if pattern["size"] is not None:
+            facets["sizes"][str(pattern["size"])] = facets["sizes"].get(str(pattern["size"]), 0) + 1
+        for key in ("node_labels", "edge_labels"):
+            for label in pattern[key]:
+                facets[key][label] = facets[key].get(label, 0) + 1
+    return facets
+
+
+def build_index(results_dir: str, index_dir: str, fingerprint: str) -> Dict[str, Any]:
+    """Parse ``results_dir`` and write the index and record files to ``index_dir`` (blocking)."""
+    os.makedirs(index_dir, exist_ok=True)
+    records_path = os.path.join(index_dir, RECORDS_FILE)
+    patterns = []
+    offset = 0
+    with open(f"{records_path}.tmp", 'wb') as f:
+        for pattern_id, record in enumerate(load_patterns(results_dir)):
+            line = json.dumps(_jsonable(record), default=str).encode('utf-8') + b"\n"
+            f.write(line)
+            patterns.append({**_summary(pattern_id, record), "offset": offset, "length": len(line)})
+            offset += len(line)
+    os.replace(f"{records_path}.tmp", records_path)
+
+    index = {
+        "format": INDEX_FORMAT,
+        "fingerprint": fingerprint,
+        "total": len(patterns),
+        "facets": _facets(patterns),
+        "patterns": patterns
+    }
+    index_path = os.path.join(index_dir, INDEX_FILE)
+    with open(f"{index_path}.tmp", 'w') as f:
+        json.dump(index, f)
+    os.replace(f"{index_path}.tmp", index_path)
+    return index
+
+
+def _read_persisted(index_dir: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(index_dir, INDEX_FILE), 'r') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("format") != INDEX_FORMAT or index.get("fingerprint") != fingerprint:
+        return None
+    if not os.path.exists(os.path.join(index_dir, RECORDS_FILE)):
+        return None
+    return index
+
+
+def _read_record(index_dir: str, offset: int, length: int) -> Dict[str, Any]:
+    with open(os.path.join(index_dir, RECORDS_FILE), 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.read(length))
+
+
+def query_index(
+    index: Dict[str, Any],
+    offset: int = 0,
+    limit: int = 50,
+    sort: str = 'count',
+    order: str = 'desc',
+    min_size: int = None,
+    max_size: int = None,
+    min_count: int = None,
+    node_label: str = None,
+    edge_label: str = None
+) -> Dict[str, Any]:
+    """Filter, sort and page the pattern summaries of an index."""
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {list(SORT_KEYS)}")
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
+
+    def keep(pattern: Dict[str, Any]) -> bool:
+        size = pattern["size"]
+        if min_size is not None and (size is None or size < min_size):
+            return False
+        if max_size is not None and (size is None or size > max_size):
+            return False
+        if min_count is not None and pattern["count"] < min_count:
+            return False
+        if node_label is not None and node_label not in pattern["node_labels"]:
+            return False
+        return edge_label is None or edge_label in pattern["edge_labels"]
+
+    matches = [p for p in index["patterns"] if keep(p)]
+    # Missing values (e.g. no score) sort last in either order; ties keep file order
+    present = [p for p in matches if p[sort] is not None]
+    present.sort(key=lambda p: p[sort], reverse=order == 'desc')
+    ordered = present + [p for p in matches if p[sort] is None]
+
+    page = ordered[offset:offset + limit]
+    return {
+        "total": len(ordered),
+        "offset": offset,
+        "limit": limit,
+        "patterns": [{k: v for k, v in p.items() if k not in ("offset", "length")} for p in page],
+        "facets": index["facets"]
+    }
+
+
+class ResultsIndex:
+    """Builds, caches and queries pattern indexes, one per job results directory."""
+
+    def __init__(self, cache_size: int = None):
+        self.cache_size = cache_size if cache_size is not None else settings.results_index_cache_size
+        self._cache: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        # Per job directory, dropped once no load holds or waits for it
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    async def load(self, job_dir: str, job_id: str = None) -> Tuple[str, Dict[str, Any]]:
+        """Return ``(index_dir, index)`` for ``job_dir``, building the index if it is missing or stale.
+
+        Raises ``FileNotFoundError`` when the job has no ``results/``.
+        """
+        results_dir = os.path.join(job_dir, "results")
+        index_dir = os.path.join(job_dir, INDEX_DIR)
+        fingerprint = await storage.run(results_fingerprint, results_dir)
+
+        cached = self._cache.get(job_dir)
+        if cached is not None and cached[0] == fingerprint:
+            self._cache.move_to_end(job_dir)
+            return index_dir, cached[1]
+
+        async with self._locks.setdefault(job_dir, asyncio.Lock()):
+            cached = self._cache.get(job_dir)
+            if cached is not None and cached[0] == fingerprint:
+                return index_dir, cached[1]
+            index = await storage.run(_read_persisted, index_dir, fingerprint)
+            if index is None:
+                async with stage_timer('results_index', job_id):
+                    index = await storage.run(build_index, results_dir, index_dir, fingerprint)
+            self._remember(job_dir, fingerprint, index)
+        return index_dir, index
+
+    def _remember(self, job_dir: str, fingerprint: str, index: Dict[str, Any]) -> None:
+        if self.cache_size <= 0:
+            return
+        self._cache[job_dir] = (fingerprint, index)
+        self._cache.move_to_end(job_dir)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def query(self, job_dir: str, job_id: str = None, **filters) -> Dict[str, Any]:
+        """A page of pattern summaries; see :func:`query_index` for the filters."""
+        _, index = await self.load(job_dir, job_id)
+        return query_index(index, **filters)
+
+    async def pattern(
+        self,
+        job_dir: str,
+        pattern_id: int,
+        job_id: str = None,
+        instance_offset: int = 0,
+        instance_limit: int = 100
+    ) -> Dict[str, Any]:
+        """One pattern's full record with a page of its instances.
+
+        Raises ``KeyError`` for an unknown ``pattern_id``.
+        """
+        index_dir, index = await self.load(job_dir, job_id)
+        if not 0 <= pattern_id < len(index["patterns"]):
+            raise KeyError(pattern_id)
+        summary = index["patterns"][pattern_id]
+        record = await storage.run(_read_record, index_dir, summary["offset"], summary["length"])
+        instances = record.pop('instances', None)
+        return {
+            **{k: v for k, v in summary.items() if k not in ("offset", "length")},
+            "record": record,
+            "instance_total": len(instances) if isinstance(instances, list) else 0,
+            "instance_offset": instance_offset,
+            "instances": instances[instance_offset:instance_offset + instance_limit]
+            if isinstance(instances, list) else []
+        }
+
+    def invalidate(self, job_dir: str) -> None:
+        self._cache.pop(job_dir, None)
@@ -0,0 +1,67 @@
+"""In-process coalescing of identical concurrent calls ("single flight")."""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+from .metrics import metrics
+
+COALESCED = metrics.counter(
+    "single_flight_coalesced_total", "Calls that joined an identical call already in flight.", ["call"]
+)
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key; callers arriving meanwhile share its outcome.
+
+    The first caller for a key starts ``call()`` as a task, and every caller
+    waits on that task and gets the same result or exception. A caller being
+    cancelled (client gone, deadline passed) only stops its own wait; the
+    call is cancelled once no caller is left. With ``leader_owned`` the call
+    belongs to the caller that started it, e.g. because it streams that
+    caller's request body, and is cancelled as soon as that caller leaves.
+    A caller still waiting on a call cancelled on behalf of others starts it
+    again. The call task inherits the starting caller's context variables,
+    so upstreams are told that caller's deadline.
+    """
+
+    def __init__(self, name: str, leader_owned: bool = False):
+        self.name = name
+        self.leader_owned = leader_owned
+        self._flights: Dict[str, _Flight] = {}
+
+    def __contains__(self, key: str) -> bool:
+        flight = self._flights.get(key)
+        return flight is not None and not flight.task.done()
+
+    def __len__(self) -> int:
+        return sum(1 for flight in self._flights.values() if not flight.task.done())
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            flight = self._flights.get(key)
+            leader = flight is None or flight.task.done()
+            if leader:
+                flight = self._flights[key] = _Flight(asyncio.create_task(call()))
+                flight.task.add_done_callback(lambda _, flight=flight: self._forget(key, flight))
+            else:
+                COALESCED.inc(self.name)
+
+            flight.waiters += 1
+            try:
+                return await asyncio.shield(flight.task)
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    # This caller is being cancelled, not the call
+                    if flight.waiters == 1 or (leader and self.leader_owned):
+                        flight.task.cancel()
+                    raise
+            finally:
+                flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
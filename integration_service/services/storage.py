@@ -0,0 +1,150 @@
+"""Non-blocking access to job directories on the shared volume and local output."""
+import asyncio
+import functools
+import json
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import aiofiles
+from ..config.settings import settings
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class Storage:
+    """Async filesystem operations on a dedicated, bounded thread pool.
+
+    Everything the request path does to disk – existence checks, stats,
+    listings, small reads and writes, chunked streaming – goes through here,
+    so the event loop never blocks on the shared volume and a slow NFS mount
+    can tie up at most ``STORAGE_IO_WORKERS`` threads.
+
+    Small JSON files (job metadata) are cached and revalidated on each read
+    with a single stat, keyed on size and mtime.
+    """
+
+    def __init__(self, max_workers: int = None, json_cache_size: int = None):
+        self.max_workers = max_workers or settings.storage_io_workers
+        self.json_cache_size = json_cache_size if json_cache_size is not None else settings.storage_json_cache_size
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="storage")
+        self._json_cache: "OrderedDict[str, Tuple[Tuple[int, int], Any]]" = OrderedDict()
+
+    # Job directories
+
+    @staticmethod
+    def shared_path(job_id: str, *parts: str) -> str:
+        """Path of a job directory (or a file in it) on the shared volume."""
+        return os.path.join(settings.shared_volume_path, job_id, *parts)
+
+    # Primitives
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run a blocking callable on the storage pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def exists(self, path: str) -> bool:
+        return await self.run(os.path.exists, path)
+
+    async def isdir(self, path: str) -> bool:
+        return await self.run(os.path.isdir, path)
+
+    async def stat(self, path: str) -> Optional[os.stat_result]:
+        """``os.stat`` that returns None for a missing file."""
+        try:
+            return await self.run(os.stat, path)
+        except FileNotFoundError:
+            return None
+
+    async def listdir(self, path: str) -> List[str]:
+        return sorted(await self.run(os.listdir, path))
+
+    async def makedirs(self, path: str) -> None:
+        await self.run(os.makedirs, path, exist_ok=True)
+
+    async def remove(self, path: str) -> None:
+        try:
+            await self.run(os.unlink, path)
+        except FileNotFoundError:
+            pass
+
+    # Contents
+
+    async def read_bytes(self, path: str) -> bytes:
+        async with aiofiles.open(path, 'rb', executor=self._executor) as f:
+            return await f.read()
+
+    async def read_text(self, path: str) -> str:
+        async with aiofiles.open(path, 'r', encoding='utf-8', executor=self._executor) as f:
+            return await f.read()
+
+    async def write_bytes(self, path: str, data: bytes) -> None:
+        """Write ``data`` atomically (temp file + rename)."""
+        await self.makedirs(os.path.dirname(path) or '.')
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        async with aiofiles.open(tmp_path, 'wb', executor=self._executor) as f:
+            await f.write(data)
+        await self.run(os.replace, tmp_path, path)
+
+    async def write_text(self, path: str, text: str) -> None:
+        await self.write_bytes(path, text.encode('utf-8'))
+
+    async def write_json(self, path: str, data: Any) -> None:
+        await self.write_text(path, json.dumps(data))
+
+    async def read_json(self, path: str, cached: bool = False) -> Any:
+        """Load a JSON file; with ``cached`` reuse the last parse while size/mtime match.
+
+        Raises FileNotFoundError if missing and ValueError if malformed.
+        """
+        if not cached:
+            return json.loads(await self.read_text(path))
+
+        stat = await self.stat(path)
+        if stat is None:
+            self._json_cache.pop(path, None)
+            raise FileNotFoundError(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        hit = self._json_cache.get(path)
+        if hit is not None and hit[0] == signature:
+            self._json_cache.move_to_end(path)
+            return hit[1]
+
+        data = json.loads(await self.read_text(path))
+        self._json_cache[path] = (signature, data)
+        self._json_cache.move_to_end(path)
+        while len(self._json_cache) > self.json_cache_size:
+            self._json_cache.popitem(last=False)
+        return data
+
+    async def iter_chunks(
+        self,
+        path: str,
+        chunk_size: int = _CHUNK_SIZE,
+        start: int = 0,
+        end: int = None
+    ) -> AsyncIterator[bytes]:
+        """Yield a file (or the inclusive byte range ``start``–``end``) in chunks."""
+        async with aiofiles.open(path, 'rb', executor=self._executor) as f:
+            if start:
+                await f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def cache_info(self) -> Dict[str, int]:
+        return {"json_entries": len(self._json_cache), "max_workers": self.max_workers}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+storage = Storage()
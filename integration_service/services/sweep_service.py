@@ -0,0 +1,250 @@
+"""Parameter sweeps: many mining configs over one graph."""
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List
+from .admission import AdmissionRejected
+from .graph_versions import VERSIONS_FILE, version_graph_path, version_metadata_path
+from .mining_cache import normalize_mining_config
+from .pattern_results import summarize_results
+from .storage import storage
+from ..config.settings import settings
+
+# Parameters a sweep may vary
+SWEEP_PARAMETERS = (
+    'min_pattern_size', 'max_pattern_size', 'min_neighborhood_size', 'max_neighborhood_size',
+    'n_neighborhoods', 'n_trials', 'radius', 'graph_type', 'search_strategy', 'sample_method',
+    'graph_output_format', 'seed', 'partition_shards', 'graph_version'
+)
+
+# Files a derived sweep job needs from the source job directory
+GRAPH_FILES = ('networkx_graph.pkl', 'networkx_metadata.json', 'job_metadata.json')
+
+
+def expand_configs(
+    base_config: Dict[str, Any],
+    grid: Dict[str, List[Any]] = None,
+    configs: List[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Expand a grid (cartesian product) and/or an explicit list on top of ``base_config``."""
+    grid = grid or {}
+    configs = configs or []
+    unknown = {key for c in [base_config, grid, *configs] for key in c} - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+
+    expanded = []
+    if grid:
+        keys = list(grid)
+        for values in itertools.product(*(grid[key] for key in keys)):
+            expanded.append({**base_config, **dict(zip(keys, values))})
+    for config in configs:
+        expanded.append({**base_config, **config})
+    if not expanded:
+        expanded.append(dict(base_config))
+    return expanded
+
+
+def config_key(mining_config: Dict[str, Any]) -> str:
+    """Identity of a config as the miner sees it; equivalent configs share a key."""
+    effective = dict(mining_config)
+    effective['visualize_instances'] = effective.get('graph_output_format', 'representative') == 'instance'
+    normalized = normalize_mining_config(effective)
+    if mining_config.get('graph_version') is not None:
+        normalized['graph_version'] = int(mining_config['graph_version'])
+    normalized = json.dumps(normalized, sort_keys=True)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def sweep_job_id(job_id: str, key: str) -> str:
+    """Derived job id under which one sweep config is mined."""
+    return f"{job_id}__sweep_{key}"
+
+
+def _same_file(src: str, dst: str) -> bool:
+    """Whether ``dst`` is a link to, or an unchanged copy of, ``src``."""
+    try:
+        src_stat, dst_stat = os.stat(src), os.stat(dst)
+    except FileNotFoundError:
+        return False
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return True
+    return (src_stat.st_size, src_stat.st_mtime_ns) == (dst_stat.st_size, dst_stat.st_mtime_ns)
+
+
+def _link_graph(job_id: str, derived_job_id: str, graph_version: int = 0) -> None:
+    src_dir = os.path.join(settings.shared_volume_path, job_id)
+    dst_dir = os.path.join(settings.shared_volume_path, derived_job_id)
+    os.makedirs(dst_dir, exist_ok=True)
+    sources = {name: os.path.join(src_dir, name) for name in GRAPH_FILES}
+    if graph_version:
+        # The derived job sees the version as its only graph
+        sources['networkx_graph.pkl'] = version_graph_path(job_id, graph_version)
+        sources['networkx_metadata.json'] = version_metadata_path(job_id, graph_version)
+    for name, src in sources.items():
+        dst = os.path.join(dst_dir, name)
+        # A derived job is reused across sweeps, so it may still hold an older version
+        if not os.path.exists(src):
+            if os.path.exists(dst):
+                os.unlink(dst)
+            continue
+        if _same_file(src, dst):
+            continue
+        tmp = f"{dst}.{uuid.uuid4().hex}.tmp"
+        try:
+            # Hard link rather than symlink: the miner may mount the volume elsewhere
+            os.link(src, tmp)
+        except OSError:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+
+
+class SweepService:
+    """Runs a batch of mining configs for one graph through the mining scheduler.
+
+    Equivalent configs are mined once. Each unique config runs as a derived
+    job (``<job_id>__sweep_<key>``) whose directory hard-links the source
+    graph, so concurrent runs never write into the same output directory
+    and the mining cache still recognises the graph. At most
+    ``max_concurrency`` configs of a sweep are queued or running at once.
+    """
+
+    def __init__(self, orchestration_service, scheduler, max_concurrency: int = None):
+        self.orchestration_service = orchestration_service
+        self.scheduler = scheduler
+        self.max_concurrency = max_concurrency or settings.sweep_max_concurrency
+
+    async def _submit(self, job_id: str, config: Dict[str, Any], priority: str, tenant_id: str):
+        """Submit through admission control, waiting out deferrals."""
+        while True:
+            try:
+                return await self.scheduler.submit(job_id, config, priority=priority, tenant_id=tenant_id)
+            except AdmissionRejected as e:
+                if e.retry_after is None:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    async def run(
+        self,
+        job_id: str,
+        configs: List[Dict[str, Any]],
+        max_concurrency: int = None,
+        priority: str = 'normal',
+        tenant_id: str = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield an ``accepted`` event, one ``result`` event per unique config
+        as it finishes, then a ``summary``. Leaving early cancels the rest.
+
+        Configs deferred by admission control wait and resubmit; a config
+        rejected outright is reported as failed."""
+        unique: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for index, config in enumerate(configs):
+            key = config_key(config)
+            entry = unique.setdefault(key, {"key": key, "config": config, "indices": []})
+            entry["indices"].append(index)
+
+        sweep_id = uuid.uuid4().hex
+        started = time.perf_counter()
+        yield {
+            "event": "accepted",
+            "sweep_id": sweep_id,
+            "job_id": job_id,
+            "total": len(configs),
+            "unique": len(unique),
+            "duplicates": len(configs) - len(unique)
+        }
+
+        limit = asyncio.Semaphore(max(1, min(max_concurrency or self.max_concurrency, len(unique))))
+        scheduled: Dict[str, str] = {}
+
+        async def run_one(entry: Dict[str, Any]) -> Dict[str, Any]:
+            async with limit:
+                derived_job_id = sweep_job_id(job_id, entry["key"])
+                start = time.perf_counter()
+                config = dict(entry["config"])
+                # Derived jobs mine the latest graph version unless the config pins one
+                graph_version = config.pop('graph_version', None)
+                if graph_version is not None or await storage.exists(storage.shared_path(job_id, VERSIONS_FILE)):
+                    graph_version, _ = await self.orchestration_service.graph_versions.graph_file(
+                        job_id, None if graph_version is None else int(graph_version)
+                    )
+                await storage.run(_link_graph, job_id, derived_job_id, graph_version or 0)
+                try:
+                    job = await self._submit(derived_job_id, config, priority, tenant_id)
+                except AdmissionRejected as e:
+                    result = {"status": "error", "error": str(e)}
+                else:
+                    scheduled[entry["key"]] = job.task_id
+                    job = await self.scheduler.wait(job.task_id)
+                    result = job.result or {"status": "error", "error": job.error or f"Mining job {job.state}"}
+                runtime = time.perf_counter() - start
+
+            event = {
+                "event": "result",
+                "key": entry["key"],
+                "indices": entry["indices"],
+                "config": entry["config"],
+                "job_id": derived_job_id,
+                "status": result.get("status"),
+                "runtime_seconds": round(runtime, 3),
+                "cache_hit": result.get("cache_hit", False)
+            }
+            if result.get("status") == "success":
+                results_dir = os.path.join(self.orchestration_service._job_output_dir(derived_job_id), "results")
+                event.update(await storage.run(summarize_results, results_dir))
+                event["output_paths"] = result.get("output_paths")
+                event["download_url"] = result.get("download_url")
+            else:
+                event["error"] = result.get("error")
+            return event
+
+        tasks = [asyncio.create_task(run_one(entry)) for entry in unique.values()]
+        results: List[Dict[str, Any]] = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                event = await next_done
+                results.append(event)
+                yield event
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            for key, task_id in scheduled.items():
+                if not any(r["key"] == key for r in results):
+                    try:
+                        await self.scheduler.cancel(task_id)
+                    except KeyError:
+                        pass
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        succeeded = [r for r in results if r["status"] == "success"]
+        yield {
+            "event": "summary",
+            "sweep_id": sweep_id,
+            "job_id": job_id,
+            "total": len(configs),
+            "unique": len(unique),
+            "succeeded": len(succeeded),
+            "failed": len(results) - len(succeeded),
+            "cache_hits": sum(1 for r in results if r["cache_hit"]),
+            "wall_seconds": round(time.perf_counter() - started, 3),
+            "mining_seconds": round(sum(r["runtime_seconds"] for r in results), 3),
+            "configs": [
+                {
+                    "key": r["key"],
+                    "config": r["config"],
+                    "job_id": r["job_id"],
+                    "status": r["status"],
+                    "runtime_seconds": r["runtime_seconds"],
+                    "pattern_count": r.get("pattern_count"),
+                    "download_url": r.get("download_url")
+                }
+                for r in sorted(results, key=lambda r: r["indices"][0])
+            ]
+        }
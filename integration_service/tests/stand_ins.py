@@ -0,0 +1,318 @@
+"""Local stand-in servers for upstream services used in tests.
+
+Each stand-in is a small FastAPI app that is launched in a separate uvicorn
+process with :func:`serve`, so measurements taken in the test process only
+reflect the integration service itself.
+"""
+import asyncio
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import httpx
+from fastapi import FastAPI, File, Form, Header, HTTPException, UploadFile
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(app_path: str, env: Optional[Dict[str, str]] = None, timeout: float = 15.0) -> Iterator[str]:
+    """Run ``module:app`` in a uvicorn subprocess and yield its base URL."""
+    port = _free_port()
+    proc_env = dict(os.environ)
+    proc_env.update(env or {})
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path, "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=str(PACKAGE_ROOT),
+        env=proc_env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"Stand-in server {app_path} failed to start")
+            time.sleep(0.05)
+        yield base_url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# --- AtomSpace builder stand-in ---
+
+atomspace_app = FastAPI()
+_received: Dict[str, List[Dict[str, object]]] = {}
+
+
+@atomspace_app.get("/health")
+async def atomspace_health():
+    return {"status": "healthy"}
+
+
+@atomspace_app.post("/api/load")
+async def atomspace_load(
+    files: List[UploadFile] = File(...),
+    config: str = Form(...),
+    schema_json: str = Form(...),
+    writer_type: str = Form("networkx"),
+    graph_type: str = Form("directed"),
+    tenant_id: str = Form("default")
+):
+    delay = float(os.getenv("STAND_IN_ATOMSPACE_DELAY", "0"))
+    if delay:
+        await asyncio.sleep(delay)
+    job_id = str(uuid.uuid4())
+    received = []
+    for upload in files:
+        digest = hashlib.sha256()
+        size = 0
+        stream = gzip.GzipFile(fileobj=upload.file, mode='rb') if upload.filename.endswith('.gz') else upload.file
+        while True:
+            chunk = stream.read(1024 * 1024)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+        received.append({"filename": upload.filename, "size": size, "sha256": digest.hexdigest()})
+    _received[job_id] = received
+
+    shared_dir = os.getenv("STAND_IN_SHARED_DIR")
+    if shared_dir:
+        job_dir = os.path.join(shared_dir, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        with open(os.path.join(job_dir, "networkx_graph.pkl"), "wb") as f:
+            f.write(b"stand-in graph")
+
+    return {"job_id": job_id, "status": "success"}
+
+
+@atomspace_app.get("/received/{job_id}")
+async def atomspace_received(job_id: str):
+    return _received.get(job_id, [])
+
+
+# --- Neural miner stand-in ---
+
+miner_app = FastAPI()
+_miner_calls: List[Dict[str, object]] = []
+# Sampling parameters of the last run of each job
+_miner_parameters: Dict[str, Dict[str, object]] = {}
+# Runs in progress by job id, and runs stopped through /cancel
+_miner_running: Dict[str, List[asyncio.Event]] = {}
+_miner_cancelled: List[Dict[str, object]] = []
+_miner_state = {"healthy": True, "fail_status": int(os.getenv("STAND_IN_MINER_FAIL_STATUS", "0"))}
+
+
+def _miner_env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() == 'true'
+
+
+@miner_app.get("/health")
+async def miner_health():
+    if not _miner_state["healthy"]:
+        raise HTTPException(status_code=503, detail="unhealthy")
+    return {"status": "healthy"}
+
+
+@miner_app.post("/control")
+async def miner_control(healthy: Optional[bool] = None, fail_status: Optional[int] = None):
+    """Flip health or make /mine fail with ``fail_status`` (0 = succeed)."""
+    if healthy is not None:
+        _miner_state["healthy"] = healthy
+    if fail_status is not None:
+        _miner_state["fail_status"] = fail_status
+    return {"healthy": _miner_state["healthy"], "fail_status": _miner_state["fail_status"]}
+
+
+@miner_app.get("/capabilities")
+async def miner_capabilities():
+    modes = [m for m in os.getenv("STAND_IN_MINER_MODES", "path,upload").split(",") if m]
+    return {"transfer_modes": modes}
+
+
+def _enumerate_triads(graph, centres: Optional[set] = None) -> List[Dict[str, object]]:
+    """Exact census of connected 3-node induced subgraphs, grouped by isomorphism.
+
+    Deterministic, so a partitioned run can be compared with a whole-graph run.
+    With ``centres`` only triads whose smallest node is one of them are counted,
+    as a miner sampling around those nodes only would.
+    """
+    undirected = graph.to_undirected(as_view=True) if graph.is_directed() else graph
+    node_sets = set()
+    for u, v in undirected.edges():
+        for w in set(undirected[u]) | set(undirected[v]):
+            if w not in (u, v):
+                node_sets.add(frozenset((u, v, w)))
+    if centres is not None:
+        node_sets = {nodes for nodes in node_sets if min(nodes) in centres}
+
+    def adjacency(order) -> tuple:
+        pairs = itertools.permutations(range(3), 2) if graph.is_directed() else itertools.combinations(range(3), 2)
+        return tuple((i, j) for i, j in pairs if graph.has_edge(order[i], order[j]))
+
+    classes: Dict[tuple, Dict[str, object]] = {}
+    for nodes in sorted(node_sets, key=lambda ns: sorted(map(str, ns))):
+        # Canonical form: the smallest adjacency over all orderings of the three nodes
+        canonical = min(adjacency(order) for order in itertools.permutations(nodes))
+        cls = classes.setdefault(canonical, {"edges": [list(e) for e in canonical], "instances": []})
+        order = sorted(nodes)
+        edges = [[order[i], order[j]] for i, j in adjacency(order)]
+        cls["instances"].append({"nodes": order, "edges": edges})
+
+    return [
+        {"nodes": [0, 1, 2], "edges": cls["edges"], "count": len(cls["instances"]), "instances": cls["instances"]}
+        for cls in classes.values()
+    ]
+
+
+def _write_miner_output(job_id: Optional[str], min_pattern_size: int, patterns: Optional[list] = None) -> None:
+    shared_dir = os.getenv("STAND_IN_SHARED_DIR")
+    if not shared_dir or not job_id:
+        return
+    job_dir = os.path.join(shared_dir, job_id)
+    os.makedirs(os.path.join(job_dir, "results"), exist_ok=True)
+    os.makedirs(os.path.join(job_dir, "plots"), exist_ok=True)
+    run = len(_miner_calls)
+    if patterns is None:
+        patterns = []
+        if _miner_env_flag("STAND_IN_MINER_EMIT_PATTERNS", "false"):
+            patterns = [{"size": min_pattern_size, "count": 1} for _ in range(min_pattern_size)]
+    with open(os.path.join(job_dir, "results", "patterns.json"), "w") as f:
+        json.dump({"run": run, "patterns": patterns}, f)
+    with open(os.path.join(job_dir, "plots", "pattern_0.png"), "wb") as f:
+        f.write(b"\x89PNG" + bytes(run))
+
+
+@miner_app.post("/mine")
+async def miner_mine(
+    job_id: str = Form(None),
+    graph_path: Optional[str] = Form(None),
+    graph_sha256: Optional[str] = Form(None),
+    graph_file: Optional[UploadFile] = File(None),
+    min_pattern_size: int = Form(5),
+    max_pattern_size: Optional[int] = Form(None),
+    min_neighborhood_size: Optional[int] = Form(None),
+    max_neighborhood_size: Optional[int] = Form(None),
+    n_neighborhoods: Optional[int] = Form(None),
+    n_trials: Optional[int] = Form(None),
+    request_timeout: Optional[str] = Header(None, alias="X-Request-Timeout")
+):
+    if _miner_state["fail_status"]:
+        _miner_calls.append({"job_id": job_id, "mode": "failed"})
+        raise HTTPException(status_code=_miner_state["fail_status"], detail="stand-in failure")
+    call: Dict[str, object] = {"job_id": job_id}
+    _miner_parameters[job_id] = {
+        "min_pattern_size": min_pattern_size,
+        "max_pattern_size": max_pattern_size,
+        "min_neighborhood_size": min_neighborhood_size,
+        "max_neighborhood_size": max_neighborhood_size,
+        "n_neighborhoods": n_neighborhoods,
+        "n_trials": n_trials
+    }
+    if request_timeout is not None:
+        call["deadline"] = float(request_timeout)
+    if graph_file is not None:
+        content = await graph_file.read()
+        call.update(mode="upload", size=len(content), sha256=hashlib.sha256(content).hexdigest())
+    elif graph_path is not None:
+        if not _miner_env_flag("STAND_IN_MINER_SEES_VOLUME", "true") or not os.path.exists(graph_path):
+            _miner_calls.append({"job_id": job_id, "mode": "path-rejected"})
+            raise HTTPException(status_code=404, detail=f"Graph not visible: {graph_path}")
+        with open(graph_path, "rb") as f:
+            content = f.read()
+        actual = hashlib.sha256(content).hexdigest()
+        if actual != graph_sha256:
+            raise HTTPException(status_code=409, detail="Checksum mismatch")
+        call.update(mode="path", path=graph_path, sha256=actual)
+    else:
+        raise HTTPException(status_code=400, detail="No graph provided")
+
+    patterns = None
+    delay = float(os.getenv("STAND_IN_MINER_DELAY", "0"))
+    if _miner_env_flag("STAND_IN_MINER_ENUMERATE", "false"):
+        graph = pickle.loads(content)
+        call["nodes"] = graph.number_of_nodes()
+        delay += float(os.getenv("STAND_IN_MINER_DELAY_PER_NODE", "0")) * graph.number_of_nodes()
+        centres = graph.graph.get("core_nodes") if _miner_env_flag("STAND_IN_MINER_CENTRES", "true") else None
+        patterns = _enumerate_triads(graph, set(centres) if centres is not None else None)
+        if _miner_env_flag("STAND_IN_MINER_COUNT_ONLY", "false"):
+            # A sampling miner reports how often it saw a pattern, not where
+            patterns = [{key: value for key, value in p.items() if key != "instances"} for p in patterns]
+    if delay:
+        # A real miner is busy for the whole run; model it with a bounded number of slots
+        if "slots" not in _miner_state:
+            _miner_state["slots"] = asyncio.Semaphore(int(os.getenv("STAND_IN_MINER_SLOTS", "1")))
+        async with _miner_state["slots"]:
+            cancelled = asyncio.Event()
+            _miner_running.setdefault(job_id, []).append(cancelled)
+            try:
+                await asyncio.wait_for(cancelled.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                _miner_running[job_id].remove(cancelled)
+                if not _miner_running[job_id]:
+                    del _miner_running[job_id]
+        if cancelled.is_set():
+            # Stopped through /cancel: the slot is free and no output is written
+            _miner_cancelled.append(call)
+            raise HTTPException(status_code=409, detail="Mining cancelled")
+
+    _miner_calls.append(call)
+    _write_miner_output(job_id, min_pattern_size, patterns)
+
+    return {
+        "status": "success",
+        "results_path": f"/shared/output/{job_id}/results",
+        "plots_path": f"/shared/output/{job_id}/plots"
+    }
+
+
+@miner_app.get("/calls")
+async def miner_calls():
+    return _miner_calls
+
+
+@miner_app.get("/parameters/{job_id}")
+async def miner_parameters(job_id: str):
+    return _miner_parameters.get(job_id, {})
+
+
+@miner_app.post("/cancel")
+async def miner_cancel(job_id: str = Form(...)):
+    if job_id not in _miner_running:
+        raise HTTPException(status_code=404, detail=f"No running job {job_id}")
+    for cancelled in _miner_running[job_id]:
+        cancelled.set()
+    return {"job_id": job_id, "status": "cancelled"}
+
+
+@miner_app.get("/jobs")
+async def miner_jobs():
+    return {"running": list(_miner_running), "cancelled": _miner_cancelled}
@@ -0,0 +1,169 @@
+"""Tests for mining cost estimates, tenant quotas and weighted fair share."""
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from ..api import pipeline
+from ..main import app
+from ..services.admission import AdmissionController, AdmissionRejected, parse_weights
+from ..services.cost_estimator import CostEstimator, work_units
+from ..services.job_scheduler import MiningScheduler
+from ..config.settings import settings
+
+HEAVY = {"n_neighborhoods": 2000, "n_trials": 1000, "max_pattern_size": 10}
+
+
+class Gate:
+    """Stands in for OrchestrationService.mine_patterns; runs finish when released."""
+
+    def __init__(self):
+        self.started = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, job_id, mining_config):
+        self.started.append(job_id)
+        await self.release.wait()
+        return {"status": "success", "job_id": job_id}
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    return shared
+
+
+def _add_metadata(shared_dir, job_id, nodes, edges):
+    (shared_dir / job_id).mkdir()
+    (shared_dir / job_id / "networkx_metadata.json").write_text(json.dumps({"nodes": nodes, "edges": edges}))
+
+
+def test_cost_grows_with_parameters_and_graph_size():
+    base = work_units({})
+    assert work_units(HEAVY) > 5 * base
+    assert work_units({"search_strategy": "beam"}) > base
+    assert work_units({}, nodes=1_000_000, edges=5_000_000) > work_units({}, nodes=1000, edges=5000)
+
+
+@pytest.mark.asyncio
+async def test_estimates_use_job_metadata_and_recalibrate_from_the_log(shared_dir, tmp_path):
+    _add_metadata(shared_dir, "big", 200_000, 1_000_000)
+    log = tmp_path / "calibration.jsonl"
+    estimator = CostEstimator(seconds_per_unit=0.001, log_path=str(log))
+
+    big = await estimator.estimate("big", {})
+    unknown = await estimator.estimate("missing", {})
+    assert big["graph_known"] and (big["nodes"], big["edges"]) == (200_000, 1_000_000)
+    assert not unknown["graph_known"]
+    assert big["seconds"] > unknown["seconds"]
+
+    # The miner turns out to be 4x slower than modelled
+    for _ in range(10):
+        await estimator.observe("big", "team-a", big, big["seconds"] * 4, {"n_trials": 100})
+    entries = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(entries) == 10
+    assert entries[0]["tenant_id"] == "team-a"
+    assert entries[0]["actual_seconds"] == pytest.approx(entries[0]["estimated_seconds"] * 4, rel=0.01)
+
+    restarted = CostEstimator(seconds_per_unit=0.001, log_path=str(log))
+    assert restarted.observations == 10
+    assert 0.003 < restarted.seconds_per_unit <= 0.004
+
+
+class Job:
+    def __init__(self, tenant_id, seconds, started_at=None):
+        self.tenant_id = tenant_id
+        self.estimate = {"seconds": seconds}
+        self.started_at = started_at
+
+
+def test_quotas_defer_with_retry_after_and_reject_oversized_jobs():
+    admission = AdmissionController(weights={}, max_active_jobs=2, max_pending_seconds=100, max_job_seconds=500)
+
+    # Nothing pending: even a job above the pending quota is admitted
+    admission.check("a", 300, [])
+
+    with pytest.raises(AdmissionRejected) as too_large:
+        admission.check("a", 600, [])
+    assert too_large.value.status_code == 422 and too_large.value.retry_after is None
+
+    running = Job("a", 60, started_at=time.time() - 20)
+    with pytest.raises(AdmissionRejected) as over_budget:
+        admission.check("a", 80, [running, Job("b", 1000)])
+    assert over_budget.value.status_code == 429
+    assert 19 <= over_budget.value.retry_after <= 21  # 40s left + 80s new - 100s quota
+
+    with pytest.raises(AdmissionRejected) as too_many:
+        admission.check("a", 1, [running, Job("a", 10)])
+    assert 39 <= too_many.value.retry_after <= 41  # when the running job should finish
+
+    # Other tenants are unaffected
+    admission.check("b", 80, [running, Job("a", 10)])
+    assert parse_weights("a=2, b=0.5,") == {"a": 2.0, "b": 0.5}
+
+
+@pytest.mark.asyncio
+async def test_fair_share_interleaves_tenants_by_weight():
+    gate = Gate()
+    admission = AdmissionController(weights={"heavy": 2}, max_active_jobs=0, max_pending_seconds=0)
+    scheduler = MiningScheduler(gate, max_in_flight=1, admission=admission, estimator=CostEstimator(log_path=""))
+
+    blocker = await scheduler.submit("blocker", {}, tenant_id="other")
+    await asyncio.sleep(0)
+    jobs = [await scheduler.submit(f"bulk-{i}", {}, tenant_id="bulk") for i in range(4)]
+    jobs += [await scheduler.submit(f"heavy-{i}", {}, tenant_id="heavy") for i in range(4)]
+    jobs.append(await scheduler.submit("late", {}, tenant_id="other"))
+
+    gate.release.set()
+    for job in [blocker, *jobs]:
+        await scheduler.wait(job.task_id)
+    await scheduler.stop()
+
+    order = gate.started[1:]
+    # The late tenant is not stuck behind the backlog of the others
+    assert order.index("late") < order.index("bulk-2")
+    # With twice the weight, "heavy" gets through its jobs about twice as fast as "bulk"
+    assert [j for j in order if j.startswith("bulk")] == [f"bulk-{i}" for i in range(4)]
+    assert order.index("heavy-3") < order.index("bulk-3")
+    assert sum(1 for j in order[:6] if j.startswith("heavy")) >= 3
+
+
+@pytest.mark.asyncio
+async def test_routes_use_the_tenant_header(monkeypatch):
+    gate = Gate()
+    admission = AdmissionController(weights={}, max_active_jobs=1, max_pending_seconds=0)
+    scheduler = MiningScheduler(gate, max_in_flight=1, admission=admission, estimator=CostEstimator(log_path=""))
+    monkeypatch.setattr(pipeline, "mining_scheduler", scheduler)
+    tenants = []
+
+    async def generate_networkx(**kwargs):
+        tenants.append(kwargs["tenant_id"])
+        return {"status": "success"}
+
+    monkeypatch.setattr(pipeline.orchestration_service, "generate_networkx", generate_networkx)
+    form = {"job_id": "job-1", "graph_type": "directed", "async_mode": "true"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.post("/api/mine-patterns", data=form, headers={"X-Tenant-ID": "team-a"})
+        second = await client.post("/api/mine-patterns", data=form, headers={"X-Tenant-ID": "team-a"})
+        other = await client.post("/api/mine-patterns", data=form, headers={"X-Tenant-ID": "team-b"})
+        stats = (await client.get("/api/mining-jobs")).json()
+        await client.post(
+            "/api/generate-graph",
+            data={"config": "{}", "schema_json": "{}"},
+            files=[("files", ("edges.csv", b"source,target\n", "text/csv"))],
+            headers={"X-Tenant-ID": "team-a"}
+        )
+
+    gate.release.set()
+    await scheduler.stop()
+
+    assert first.status_code == 202
+    assert first.json()["tenant_id"] == "team-a" and first.json()["estimated_seconds"] > 0
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) >= 1
+    assert other.status_code == 202
+    assert set(stats["scheduler"]["tenants"]) == {"team-a", "team-b"}
+    assert tenants == ["team-a"]
@@ -0,0 +1,124 @@
+"""Tests for streamed, cached job archives and conditional/ranged downloads."""
+import io
+import os
+import zipfile
+import httpx
+import pytest
+from ..api import pipeline
+from ..api.responses import parse_range
+from ..main import app
+from ..services.archive_service import ArchiveService
+
+
+@pytest.fixture
+def job_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline.orchestration_service, "local_output_dir", str(tmp_path))
+    monkeypatch.setattr(pipeline.orchestration_service, "archive_service", ArchiveService(compression_level=6))
+    job = tmp_path / "job-1"
+    (job / "results").mkdir(parents=True)
+    (job / "plots").mkdir()
+    (job / "results" / "patterns.json").write_text('{"patterns": []}' * 1000)
+    (job / "plots" / "pattern_0.png").write_bytes(os.urandom(200 * 1024))
+    return job
+
+
+async def _get(path, **headers):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=990-2000", 1000) == (990, 999)
+    assert parse_range("bytes=0-1,5-9", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=1000-", 1000)
+
+
+@pytest.mark.asyncio
+async def test_archive_is_streamed_then_cached(job_dir, tmp_path):
+    response = await _get("/api/download-result?job_id=job-1")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    etag = response.headers["etag"]
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        info = {i.filename: i for i in archive.infolist()}
+        assert archive.testzip() is None
+    assert info["plots/pattern_0.png"].compress_type == zipfile.ZIP_STORED
+    assert info["results/patterns.json"].compress_type == zipfile.ZIP_DEFLATED
+
+    # The streamed bytes were kept as the cached archive
+    cached = tmp_path / "job-1.zip"
+    assert cached.read_bytes() == response.content
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".part")]
+
+    again = await _get("/api/download-result?job_id=job-1")
+    assert again.headers["etag"] == etag
+    assert again.headers["accept-ranges"] == "bytes"
+    assert again.content == response.content
+
+
+@pytest.mark.asyncio
+async def test_conditional_and_ranged_archive_requests(job_dir, tmp_path):
+    full = await _get("/api/download-result?job_id=job-1")
+    etag = full.headers["etag"]
+
+    not_modified = await _get("/api/download-result?job_id=job-1", **{"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    partial = await _get("/api/download-result?job_id=job-1", Range="bytes=100-199", **{"If-Range": etag})
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == f"bytes 100-199/{len(full.content)}"
+    assert partial.content == full.content[100:200]
+
+    unsatisfiable = await _get("/api/download-result?job_id=job-1", Range=f"bytes={len(full.content)}-")
+    assert unsatisfiable.status_code == 416
+
+    # Changing the directory content invalidates the cached archive
+    (job_dir / "results" / "extra.json").write_text("{}")
+    changed = await _get("/api/download-result?job_id=job-1", **{"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    with zipfile.ZipFile(io.BytesIO(changed.content)) as archive:
+        assert "results/extra.json" in archive.namelist()
+
+
+@pytest.mark.asyncio
+async def test_range_on_uncached_archive_builds_it_first(job_dir, tmp_path):
+    partial = await _get("/api/download-result?job_id=job-1", Range="bytes=0-3")
+    assert partial.status_code == 206
+    assert partial.content == b"PK\x03\x04"
+    assert (tmp_path / "job-1.zip").exists()
+
+
+@pytest.mark.asyncio
+async def test_single_file_download_supports_etag_and_range(job_dir):
+    url = "/api/download-result?job_id=job-1&filename=plots/pattern_0.png"
+    full = await _get(url)
+    assert full.status_code == 200
+
+    assert (await _get(url, **{"If-None-Match": full.headers["etag"]})).status_code == 304
+    tail = await _get(url, Range="bytes=-10")
+    assert tail.status_code == 206
+    assert tail.content == full.content[-10:]
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_leaves_no_archive(job_dir, tmp_path):
+    service = ArchiveService()
+    files = list(pipeline.orchestration_service._iter_output_files("job-1"))
+    zip_path = str(tmp_path / "job-1.zip")
+
+    stream = service.stream(files, zip_path, '"etag"')
+    assert (await stream.__anext__()).startswith(b"PK")
+    await stream.aclose()
+
+    assert not os.path.exists(zip_path)
+    assert service.cached_etag(zip_path) is None
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".part")]
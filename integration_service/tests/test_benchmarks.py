@@ -0,0 +1,70 @@
+"""Tests for the benchmark harness."""
+import json
+from ..benchmarks.loadgen import compare_reports, percentile, stage_breakdown
+from ..benchmarks.runner import run_benchmark
+
+
+def test_percentiles_interpolate():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.5
+    assert percentile(values, 99) == 99.01
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) is None
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {
+        "operations": {"pipeline": {"p50": 1.0, "p95": 2.0, "p99": 3.0}},
+        "throughput": {"pipelines_per_second": 10.0},
+        "resources": {"service_peak_rss_bytes": 100}
+    }
+    current = {
+        "operations": {"pipeline": {"p50": 1.05, "p95": 2.5, "p99": 2.0}},
+        "throughput": {"pipelines_per_second": 8.0},
+        "resources": {"service_peak_rss_bytes": 100}
+    }
+    regressions = {c["field"] for c in compare_reports(baseline, current, tolerance=0.1) if c["regression"]}
+    assert regressions == {"operations.pipeline.p95", "throughput.pipelines_per_second"}
+
+
+def test_stage_breakdown_reads_metrics_text():
+    text = "\n".join([
+        'pipeline_stage_duration_seconds_bucket{stage="upload",le="0.1"} 2',
+        'pipeline_stage_duration_seconds_sum{stage="upload"} 0.5',
+        'pipeline_stage_duration_seconds_count{stage="upload"} 2',
+    ])
+    assert stage_breakdown(text) == {"upload": {"count": 2.0, "mean_seconds": 0.25}}
+
+
+def test_benchmark_run_reports_latency_throughput_and_memory(tmp_path):
+    report = run_benchmark(
+        pipelines=4,
+        concurrency=2,
+        csv_bytes=64 * 1024,
+        miner_replicas=2,
+        fake_env={
+            "BENCH_MINER_LATENCY": "0.1",
+            "BENCH_GRAPH_NODES": "200",
+            "BENCH_GRAPH_EDGES": "600",
+            "BENCH_MINER_PLOTS": "3",
+        },
+        workdir=str(tmp_path)
+    )
+
+    assert report["operations"]["pipeline"]["count"] == 4
+    assert all(op["errors"] == 0 for op in report["operations"].values()), report["error_samples"]
+    pipeline = report["operations"]["pipeline"]
+    assert 0 < pipeline["p50"] <= pipeline["p95"] <= pipeline["p99"] <= pipeline["max"]
+    assert report["throughput"]["pipelines_per_second"] > 0
+    assert report["operations"]["download_zip"]["bytes"] > 3 * 64 * 1024
+    assert {"upload", "atomspace_load", "miner_call", "result_copy", "archive"} <= set(report["stages"])
+    assert report["resources"]["service_peak_rss_bytes"] > 0
+    json.dumps(report)
+
+    # The fakes leave realistic job output on the shared volume
+    jobs = [p for p in (tmp_path / "shared").iterdir() if p.is_dir()]
+    assert len(jobs) == 4
+    for job in jobs:
+        assert json.loads((job / "progress.json").read_text())["status"] == "completed"
+        assert len(list((job / "plots").iterdir())) == 3
+        assert (job / "results" / "patterns.json").exists()
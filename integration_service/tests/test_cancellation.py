@@ -0,0 +1,163 @@
+"""Tests for request deadlines and cancelling upstream work nobody waits for."""
+import asyncio
+import pickle
+import time
+import httpx
+import networkx as nx
+import pytest
+import pytest_asyncio
+from ..api import pipeline
+from ..main import app
+from ..services.cost_estimator import CostEstimator
+from ..services.http_client import http_clients
+from ..services.job_scheduler import MiningScheduler
+from ..services.materializer import Materializer
+from ..services.orchestration_service import OrchestrationService
+from ..config.settings import settings
+from .stand_ins import serve
+
+MINER_APP = "integration_service.tests.stand_ins:miner_app"
+ATOMSPACE_APP = "integration_service.tests.stand_ins:atomspace_app"
+FORM = {"job_id": "job-1", "graph_type": "undirected"}
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    (shared / "job-1").mkdir(parents=True)
+    (shared / "job-1" / "networkx_graph.pkl").write_bytes(pickle.dumps(nx.path_graph(4)))
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "mining_cache_enabled", False)
+    monkeypatch.setattr(settings, "ingest_cache_enabled", False)
+    monkeypatch.setattr(settings, "miner_health_interval", 0)
+    monkeypatch.setattr(settings, "disconnect_poll_interval", 0.05)
+    return shared
+
+
+@pytest_asyncio.fixture
+async def slow_miner(shared_dir, tmp_path, monkeypatch):
+    """The pipeline routes wired to a miner stand-in that takes 30s per job."""
+    env = {"STAND_IN_MINER_DELAY": "30", "STAND_IN_SHARED_DIR": str(shared_dir)}
+    with serve(MINER_APP, env=env) as miner_url:
+        service = OrchestrationService()
+        service.local_output_dir = str(tmp_path / "local")
+        service.materializer = Materializer("copy")
+        service.miner_service.miner_url = miner_url
+        scheduler = MiningScheduler(service.mine_patterns, max_in_flight=1, estimator=CostEstimator(log_path=""))
+        monkeypatch.setattr(pipeline, "orchestration_service", service)
+        monkeypatch.setattr(pipeline, "mining_scheduler", scheduler)
+        yield miner_url
+        await scheduler.stop()
+
+
+async def _until(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.05)
+
+
+def _miner_jobs(miner_url):
+    return httpx.get(f"{miner_url}/jobs").json()
+
+
+def _assert_stopped_without_output(miner_url, shared_dir):
+    jobs = _miner_jobs(miner_url)
+    assert jobs["running"] == []
+    assert [call["job_id"] for call in jobs["cancelled"]] == ["job-1"]
+    assert not (shared_dir / "job-1" / "results").exists()
+    assert pipeline.orchestration_service.miner_service.pool.stats()["in_flight"] == 0
+    assert pipeline.mining_scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_job_frees_the_miner_and_writes_no_output(shared_dir, slow_miner):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        handle = (await client.post("/api/mine-patterns", data={**FORM, "async_mode": "true"})).json()
+        await _until(lambda: _miner_jobs(slow_miner)["running"] == ["job-1"])
+
+        cancelled = await client.delete(handle["status_url"])
+        await _until(lambda: _miner_jobs(slow_miner)["cancelled"])
+
+    assert cancelled.json()["state"] == "cancelled"
+    _assert_stopped_without_output(slow_miner, shared_dir)
+
+
+@pytest.mark.asyncio
+async def test_deadline_stops_the_job_and_is_forwarded_to_the_miner(shared_dir, slow_miner):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.monotonic()
+        response = await client.post("/api/mine-patterns", data=FORM, headers={"X-Request-Timeout": "0.5"})
+        elapsed = time.monotonic() - started
+        await _until(lambda: _miner_jobs(slow_miner)["cancelled"])
+        jobs = (await client.get("/api/mining-jobs")).json()["jobs"]
+        bad = await client.post("/api/mine-patterns", data=FORM, headers={"X-Request-Timeout": "soon"})
+
+    assert response.status_code == 504
+    assert elapsed < 5
+    assert jobs[0]["state"] == "expired"
+    assert 0 < _miner_jobs(slow_miner)["cancelled"][0]["deadline"] <= 0.5
+    _assert_stopped_without_output(slow_miner, shared_dir)
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_the_mining_job(shared_dir, slow_miner):
+    request = httpx.Request("POST", "http://test/api/mine-patterns", data=FORM)
+    body = request.read()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/api/mine-patterns", "raw_path": b"/api/mine-patterns",
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 50000), "server": ("test", 80),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in request.headers.items()]
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    gone = asyncio.Event()
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    call = asyncio.create_task(app(scope, receive, send))
+    await _until(lambda: _miner_jobs(slow_miner)["running"] == ["job-1"])
+    gone.set()
+    await asyncio.wait_for(call, 5)
+    await _until(lambda: _miner_jobs(slow_miner)["cancelled"])
+
+    assert sent[0]["status"] == 499
+    assert list(pipeline.mining_scheduler.jobs.values())[0].state == "cancelled"
+    _assert_stopped_without_output(slow_miner, shared_dir)
+
+
+@pytest.mark.asyncio
+async def test_generate_graph_deadline(shared_dir, monkeypatch):
+    with serve(ATOMSPACE_APP, env={"STAND_IN_ATOMSPACE_DELAY": "3"}) as atomspace_url:
+        monkeypatch.setattr(pipeline.orchestration_service, "atomspace_url", atomspace_url)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = time.monotonic()
+            response = await client.post(
+                "/api/generate-graph",
+                data={"config": "{}", "schema_json": "{}"},
+                files=[("files", ("edges.csv", b"source,target\n0,1\n", "text/csv"))],
+                headers={"X-Request-Timeout": "0.5"}
+            )
+            elapsed = time.monotonic() - started
+
+    assert response.status_code == 504
+    assert elapsed < 5
@@ -0,0 +1,223 @@
+"""Tests for incremental graph updates (delta CSVs and graph versions)."""
+import io
+import json
+import pickle
+import httpx
+import networkx as nx
+import pytest
+import pytest_asyncio
+from ..api import pipeline
+from ..main import app
+from ..services import graph_versions as graph_versions_module
+from ..services.cost_estimator import graph_size
+from ..services.graph_versions import GraphVersions, VersionConflict, apply_delta, parse_delta_csv
+from ..services.http_client import http_clients
+from ..services.materializer import Materializer
+from ..services.orchestration_service import OrchestrationService
+from ..services.sweep_service import _link_graph
+from ..config.settings import settings
+from .stand_ins import serve
+
+MINER_APP = "integration_service.tests.stand_ins:miner_app"
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "mining_cache_enabled", False)
+    monkeypatch.setattr(settings, "miner_health_interval", 0)
+    return shared
+
+
+def _add_job(shared_dir, job_id, graph):
+    job_dir = shared_dir / job_id
+    job_dir.mkdir()
+    (job_dir / "networkx_graph.pkl").write_bytes(pickle.dumps(graph))
+    (job_dir / "networkx_metadata.json").write_text(json.dumps({"graph_type": "undirected"}))
+
+
+def _csv(name, text):
+    return name, io.BytesIO(text.encode())
+
+
+def _path_graph():
+    graph = nx.path_graph(4)  # 0-1-2-3 with int ids
+    for node in graph:
+        graph.nodes[node]["label"] = "a"
+    return graph
+
+
+def test_delta_csvs_apply_removals_then_additions():
+    delta = {"nodes_added": [], "nodes_removed": [], "edges_added": [], "edges_removed": []}
+    parse_delta_csv("nodes.csv", io.BytesIO(b"id,op,label\n4,,b\n3,remove,\n"), delta)
+    parse_delta_csv("edges.csv", io.BytesIO(b"source,target,op,weight\n0,1,-,\n2,4,add,0.5\n9,8,delete,\n"), delta)
+    graph = _path_graph()
+
+    applied = apply_delta(graph, delta)
+
+    assert sorted(graph.nodes) == [0, 1, 2, 4]
+    assert sorted(map(sorted, graph.edges)) == [[1, 2], [2, 4]]
+    assert graph.nodes[4] == {"label": "b"}
+    assert graph.edges[2, 4] == {"weight": 0.5}
+    assert applied == {"skipped": 1}
+
+    with pytest.raises(ValueError):
+        parse_delta_csv("bad.csv", io.BytesIO(b"name,value\nx,1\n"), delta)
+    with pytest.raises(ValueError):
+        parse_delta_csv("bad.csv", io.BytesIO(b"id,op\n1,upsert\n"), delta)
+
+
+@pytest.mark.asyncio
+async def test_adding_a_version_does_not_load_the_graph(shared_dir, monkeypatch):
+    _add_job(shared_dir, "job-1", _path_graph())
+    versions = GraphVersions()
+
+    def refuse(path):
+        raise AssertionError(f"graph loaded during ingest: {path}")
+
+    monkeypatch.setattr(graph_versions_module, "load_graph", refuse)
+    entry = await versions.add_delta("job-1", [_csv("edges.csv", "source,target\n3,0\n")])
+
+    assert entry["version"] == 1 and entry["parent"] == 0
+    assert entry["changes"]["edges_added"] == 1
+    assert not (shared_dir / "job-1" / "versions").exists()
+    metadata = json.loads((shared_dir / "job-1" / "networkx_metadata.v1.json").read_text())
+    assert metadata["graph_type"] == "undirected"
+    assert metadata["graph_version"] == 1 and metadata["parent_version"] == 0
+    index = json.loads((shared_dir / "job-1" / "versions.json").read_text())
+    assert [v["version"] for v in index["versions"]] == [0, 1]
+    assert index["latest"] == 1
+
+
+@pytest.mark.asyncio
+async def test_versions_chain_and_materialize_on_demand(shared_dir):
+    _add_job(shared_dir, "job-1", _path_graph())
+    versions = GraphVersions()
+    await versions.add_delta("job-1", [_csv("edges.csv", "source,target\n3,0\n")])
+    await versions.add_delta("job-1", [_csv("nodes.csv", "id,op\n1,remove\n")], base_version=1)
+
+    with pytest.raises(VersionConflict):
+        await versions.add_delta("job-1", [_csv("nodes.csv", "id\n7\n")], base_version=1)
+    with pytest.raises(ValueError):
+        await versions.graph_file("job-1", 3)
+
+    version, path = await versions.graph_file("job-1")
+    assert version == 2
+    with open(path, "rb") as f:
+        latest = pickle.load(f)
+    assert sorted(map(sorted, latest.edges)) == [[0, 3], [2, 3]]
+
+    version, path = await versions.graph_file("job-1", 1)
+    with open(path, "rb") as f:
+        assert pickle.load(f).number_of_edges() == 4
+    _, base = await versions.graph_file("job-1", 0)
+    assert base == str(shared_dir / "job-1" / "networkx_graph.pkl")
+
+    index = await versions.index("job-1")
+    assert [(v["version"], v.get("edges")) for v in index["versions"]] == [(0, None), (1, 4), (2, 2)]
+
+
+@pytest.mark.asyncio
+async def test_mining_targets_the_requested_version(shared_dir, tmp_path):
+    _add_job(shared_dir, "job-1", _path_graph())
+    env = {"STAND_IN_SHARED_DIR": str(shared_dir), "STAND_IN_MINER_ENUMERATE": "true"}
+
+    with serve(MINER_APP, env=env) as miner_url:
+        service = OrchestrationService()
+        service.local_output_dir = str(tmp_path / "local")
+        service.materializer = Materializer("copy")
+        service.miner_service.miner_url = miner_url
+        await service.update_graph("job-1", [_csv("edges.csv", "source,target\n0,2\n")])
+
+        latest = await service.mine_patterns("job-1", {"graph_type": "undirected"})
+        calls = httpx.get(f"{miner_url}/calls").json()
+        base = await service.mine_patterns("job-1", {"graph_type": "undirected", "graph_version": 0})
+        calls += httpx.get(f"{miner_url}/calls").json()[len(calls):]
+
+    assert latest["status"] == "success" and latest["graph_version"] == 1
+    assert base["graph_version"] == 0
+    assert calls[0]["path"].endswith("job-1/versions/v1/networkx_graph.pkl")
+    assert calls[1]["path"].endswith("job-1/networkx_graph.pkl") and "versions" not in calls[1]["path"]
+
+
+@pytest.mark.asyncio
+async def test_update_graph_route(shared_dir, monkeypatch):
+    _add_job(shared_dir, "job-1", _path_graph())
+    monkeypatch.setattr(pipeline.orchestration_service, "graph_versions", GraphVersions())
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        def post(job_id, name, text, **data):
+            return client.post(
+                "/api/update-graph",
+                data={"job_id": job_id, **data},
+                files=[("files", (name, text.encode(), "text/csv"))]
+            )
+
+        created = await post("job-1", "edges.csv", "source,target\n3,0\n", base_version="0")
+        stale = await post("job-1", "edges.csv", "source,target\n3,1\n", base_version="0")
+        missing = await post("job-2", "edges.csv", "source,target\n3,1\n")
+        malformed = await post("job-1", "edges.csv", "from,to\n3,1\n")
+        not_csv = await post("job-1", "edges.txt", "source,target\n3,1\n")
+        listed = await client.get("/api/graph-versions/job-1")
+
+    assert created.status_code == 200
+    assert created.json()["graph_version"] == 1
+    assert stale.status_code == 409
+    assert missing.status_code == 404
+    assert malformed.status_code == 400
+    assert not_csv.status_code == 400
+    assert listed.json()["latest"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_job_links_the_pinned_version(shared_dir):
+    _add_job(shared_dir, "job-1", _path_graph())
+    versions = GraphVersions()
+    await versions.add_delta("job-1", [_csv("nodes.csv", "id\n9\n")])
+    _, path = await versions.graph_file("job-1", 1)
+
+    _link_graph("job-1", "job-1__sweep_a", 1)
+
+    derived = shared_dir / "job-1__sweep_a"
+    assert (derived / "networkx_graph.pkl").samefile(path)
+    assert json.loads((derived / "networkx_metadata.json").read_text())["graph_version"] == 1
+
+
+@pytest.mark.asyncio
+async def test_reused_sweep_job_follows_the_latest_version(shared_dir):
+    _add_job(shared_dir, "job-1", _path_graph())
+    derived = shared_dir / "job-1__sweep_a"
+    _link_graph("job-1", "job-1__sweep_a", 0)
+    assert (derived / "networkx_graph.pkl").samefile(shared_dir / "job-1" / "networkx_graph.pkl")
+
+    versions = GraphVersions()
+    await versions.add_delta("job-1", [_csv("edges.csv", "source,target\n0,2\n")])
+    _, path = await versions.graph_file("job-1")
+    _link_graph("job-1", "job-1__sweep_a", 1)
+
+    assert (derived / "networkx_graph.pkl").samefile(path)
+    assert json.loads((derived / "networkx_metadata.json").read_text())["graph_version"] == 1
+    assert not list(derived.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_version_metadata_counts_every_delta_since_the_base(shared_dir):
+    _add_job(shared_dir, "job-1", _path_graph())
+    (shared_dir / "job-1" / "networkx_metadata.json").write_text(json.dumps({"nodes": 4, "edges": 3}))
+    versions = GraphVersions()
+    await versions.add_delta("job-1", [_csv("edges.csv", "source,target\n0,2\n0,3\n")])
+    await versions.add_delta("job-1", [_csv("nodes.csv", "id\n7\n")])
+
+    metadata = json.loads((shared_dir / "job-1" / "networkx_metadata.v2.json").read_text())
+    assert metadata["changes"]["edges_added"] == 0
+    assert graph_size(metadata) == (5, 5)
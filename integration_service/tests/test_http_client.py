@@ -0,0 +1,76 @@
+"""Tests for the shared HTTP client manager."""
+import pytest
+import httpx
+from ..services.http_client import HTTPClientManager
+from ..services.miner_service import MinerService
+from ..config.settings import settings
+
+
+@pytest.mark.asyncio
+async def test_client_is_reused_until_closed():
+    """The same pooled client is returned for an upstream until close()."""
+    manager = HTTPClientManager()
+    await manager.start()
+
+    miner_client = manager.get('miner')
+    assert manager.get('miner') is miner_client
+    assert manager.get('atomspace') is not miner_client
+
+    await manager.close()
+    assert miner_client.is_closed
+    assert manager.get('miner') is not miner_client
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_client_uses_per_phase_timeouts(monkeypatch):
+    """Connect/read/write timeouts come from the per-upstream settings."""
+    monkeypatch.setattr(settings, 'miner_connect_timeout', 3.0)
+    monkeypatch.setattr(settings, 'miner_read_timeout', 42.0)
+    monkeypatch.setattr(settings, 'miner_write_timeout', 7.0)
+
+    manager = HTTPClientManager()
+    client = manager.get('miner')
+    try:
+        assert client.timeout.connect == 3.0
+        assert client.timeout.read == 42.0
+        assert client.timeout.write == 7.0
+    finally:
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_mine_motifs_reuses_shared_client(tmp_path, monkeypatch):
+    """Retries and repeated calls go through one client instead of new ones."""
+    graph_file = tmp_path / "networkx_graph.pkl"
+    graph_file.write_bytes(b"graph")
+
+    seen_clients = set()
+    transport_calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        transport_calls.append(request.url.path)
+        return httpx.Response(200, json={"results_path": "r", "plots_path": "p", "status": "success"})
+
+    manager = HTTPClientManager()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    manager._clients['miner'] = client
+
+    def get(upstream):
+        seen_clients.add(id(manager.get(upstream)))
+        return manager.get(upstream)
+
+    from ..services import miner_service as miner_module
+    monkeypatch.setattr(miner_module.http_clients, 'get', get)
+    # Only count mining traffic, not background health probes
+    monkeypatch.setattr(settings, 'miner_health_interval', 0)
+
+    service = MinerService()
+    try:
+        for _ in range(3):
+            await service.mine_motifs(str(graph_file), job_id="job-1")
+    finally:
+        await manager.close()
+
+    assert transport_calls == ["/capabilities"] + ["/mine"] * 3
+    assert seen_clients == {id(client)}
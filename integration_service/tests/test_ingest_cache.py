@@ -0,0 +1,126 @@
+"""Tests for the content-addressed ingest cache."""
+import io
+import httpx
+import pytest
+import pytest_asyncio
+from ..services.http_client import http_clients
+from ..services.ingest_cache import IngestCache
+from ..services.orchestration_service import OrchestrationService
+from ..config.settings import settings
+from .stand_ins import serve
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    return shared
+
+
+def _make_job(shared_dir, job_id, size):
+    job_dir = shared_dir / job_id
+    job_dir.mkdir()
+    (job_dir / "networkx_graph.pkl").write_bytes(b"g" * size)
+    return job_dir
+
+
+async def _key(cache, csv_path, config="{}"):
+    return await cache.key_for([str(csv_path)], config, "{}", "networkx", "directed", "default")
+
+
+@pytest.mark.asyncio
+async def test_key_depends_on_content_and_inputs(tmp_path):
+    cache = IngestCache(cache_dir=str(tmp_path / "cache"))
+    csv = tmp_path / "edges.csv"
+    csv.write_text("source,target\na,b\n")
+
+    first = await _key(cache, csv)
+    assert await _key(cache, csv) == first
+    assert await _key(cache, csv, config='{"x": 1}') != first
+
+    csv.write_text("source,target\na,c\n")
+    assert await _key(cache, csv) != first
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_removes_oldest_blob(tmp_path, shared_dir):
+    cache = IngestCache(cache_dir=str(tmp_path / "cache"), max_bytes=250)
+    for job_id in ("job-a", "job-b", "job-c"):
+        _make_job(shared_dir, job_id, 100)
+        await cache.store(f"key-{job_id}", job_id)
+
+    assert list(cache.index.entries) == ["key-job-b", "key-job-c"]
+    assert not (tmp_path / "cache" / "graphs" / "key-job-a").exists()
+    assert (tmp_path / "cache" / "graphs" / "key-job-c" / "networkx_graph.pkl").exists()
+    assert cache.stats()["evictions"] == 1
+
+    # The index is persisted and reloaded in LRU order
+    reloaded = IngestCache(cache_dir=str(tmp_path / "cache"), max_bytes=250)
+    assert list(reloaded.index.entries) == ["key-job-b", "key-job-c"]
+
+
+@pytest.mark.asyncio
+async def test_hit_restores_graph_when_job_dir_was_removed(tmp_path, shared_dir):
+    cache = IngestCache(cache_dir=str(tmp_path / "cache"))
+    job_dir = _make_job(shared_dir, "job-a", 10)
+    await cache.store("key-a", "job-a")
+
+    (job_dir / "networkx_graph.pkl").unlink()
+    entry = await cache.lookup("key-a")
+
+    assert entry["job_id"] == "job-a"
+    assert (job_dir / "networkx_graph.pkl").read_bytes() == b"g" * 10
+    assert await cache.lookup("key-missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_networkx_skips_atomspace_on_hit(tmp_path, shared_dir):
+    csv = tmp_path / "edges.csv"
+    csv.write_text("source,target\na,b\n")
+
+    with serve("integration_service.tests.stand_ins:atomspace_app",
+               env={"STAND_IN_SHARED_DIR": str(shared_dir)}) as url:
+        service = OrchestrationService()
+        service.atomspace_url = url
+        service.ingest_cache = IngestCache(cache_dir=str(tmp_path / "cache"))
+
+        first = await service.generate_networkx([str(csv)], "{}", "{}", "networkx")
+        second = await service.generate_networkx([str(csv)], "{}", "{}", "networkx")
+        other = await service.generate_networkx([str(csv)], "{}", "{}", "networkx", graph_type="undirected")
+        received = httpx.get(f"{url}/received/{second['job_id']}").json()
+
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is True
+    assert second["job_id"] == first["job_id"]
+    assert other["cache_hit"] is False
+    assert other["job_id"] != first["job_id"]
+    assert len(received) == 1
+
+
+@pytest.mark.asyncio
+async def test_updated_job_is_not_returned_for_its_original_csvs(tmp_path, shared_dir):
+    csv = tmp_path / "edges.csv"
+    csv.write_text("source,target\na,b\n")
+
+    with serve("integration_service.tests.stand_ins:atomspace_app",
+               env={"STAND_IN_SHARED_DIR": str(shared_dir)}) as url:
+        service = OrchestrationService()
+        service.atomspace_url = url
+        service.ingest_cache = IngestCache(cache_dir=str(tmp_path / "cache"))
+
+        first = await service.generate_networkx([str(csv)], "{}", "{}", "networkx")
+        await service.update_graph(first["job_id"], [("delta.csv", io.BytesIO(b"source,target\nb,c\n"))])
+        again = await service.generate_networkx([str(csv)], "{}", "{}", "networkx")
+
+    assert again["cache_hit"] is False
+    assert again["job_id"] != first["job_id"]
+    assert list(service.ingest_cache.index.entries.values())[0]["job_id"] == again["job_id"]
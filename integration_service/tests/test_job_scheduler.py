@@ -0,0 +1,149 @@
+"""Tests for the mining job scheduler."""
+import asyncio
+import time
+import httpx
+import pytest
+from ..api import pipeline
+from ..main import app
+from ..services.job_scheduler import MiningScheduler, CANCELLED, DONE, EXPIRED, FAILED
+
+
+class FakePipeline:
+    """Stands in for OrchestrationService.mine_patterns."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.started = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, job_id, mining_config):
+        self.started.append(job_id)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.release.wait()
+            await asyncio.sleep(self.delay)
+            if mining_config.get('fail'):
+                return {"status": "error", "error": "miner exploded"}
+            return {"status": "success", "job_id": job_id}
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_in_flight_jobs_are_bounded():
+    fake = FakePipeline()
+    scheduler = MiningScheduler(fake, max_in_flight=2)
+    jobs = [await scheduler.submit(f"job-{i}", {}) for i in range(6)]
+    results = [await scheduler.wait(job.task_id) for job in jobs]
+    await scheduler.stop()
+
+    assert fake.peak == 2
+    assert [job.state for job in results] == [DONE] * 6
+    assert results[0].result == {"status": "success", "job_id": "job-0"}
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_lanes_dispatch_first():
+    fake = FakePipeline()
+    fake.release.clear()
+    scheduler = MiningScheduler(fake, max_in_flight=1)
+
+    blocker = await scheduler.submit("blocker", {})
+    await asyncio.sleep(0)
+    low = await scheduler.submit("low", {}, priority='low')
+    normal = await scheduler.submit("normal", {})
+    high = await scheduler.submit("high", {}, priority='high')
+    assert scheduler.stats()["lanes"] == {"high": 1, "normal": 1, "low": 1}
+    assert scheduler.position(high.task_id) == 0
+    assert scheduler.position(low.task_id) == 2
+
+    fake.release.set()
+    for job in (blocker, low, normal, high):
+        await scheduler.wait(job.task_id)
+    await scheduler.stop()
+
+    assert fake.started == ["blocker", "high", "normal", "low"]
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_and_running_jobs():
+    fake = FakePipeline()
+    fake.release.clear()
+    scheduler = MiningScheduler(fake, max_in_flight=1)
+
+    running = await scheduler.submit("running", {})
+    queued = await scheduler.submit("queued", {})
+    await asyncio.sleep(0.01)
+
+    assert await scheduler.cancel(queued.task_id) is True
+    assert await scheduler.cancel(running.task_id) is True
+    assert running.state == CANCELLED and queued.state == CANCELLED
+    assert fake.running == 0
+    assert await scheduler.cancel(running.task_id) is False
+
+    # The freed slot is used by the next job
+    fake.release.set()
+    after = await scheduler.submit("after", {})
+    assert (await scheduler.wait(after.task_id)).state == DONE
+    assert "queued" not in fake.started
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_jobs_expire_at_their_deadline():
+    fake = FakePipeline()
+    fake.release.clear()
+    scheduler = MiningScheduler(fake, max_in_flight=1)
+
+    running = await scheduler.submit("running", {}, deadline=time.time() + 0.1)
+    queued = await scheduler.submit("queued", {}, deadline=time.time() + 0.05)
+    await scheduler.wait(queued.task_id)
+    await scheduler.wait(running.task_id)
+
+    assert queued.state == EXPIRED and queued.error == "Deadline exceeded while queued"
+    assert running.state == EXPIRED and fake.running == 0
+    assert fake.started == ["running"]
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_error_result_marks_job_failed():
+    scheduler = MiningScheduler(FakePipeline(), max_in_flight=1)
+    job = await scheduler.submit("job", {'fail': True})
+    await scheduler.wait(job.task_id)
+    await scheduler.stop()
+
+    assert job.state == FAILED
+    assert job.error == "miner exploded"
+
+
+@pytest.mark.asyncio
+async def test_async_submission_returns_202_and_can_be_polled(monkeypatch):
+    fake = FakePipeline()
+    monkeypatch.setattr(pipeline, "mining_scheduler", MiningScheduler(fake, max_in_flight=1))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/api/mine-patterns", data={
+            "job_id": "job-1", "graph_type": "directed", "async_mode": "true"
+        })
+        assert response.status_code == 202
+        handle = response.json()
+        assert handle["state"] == "queued"
+
+        await pipeline.mining_scheduler.wait(handle["task_id"])
+        polled = (await client.get(handle["status_url"])).json()
+        assert polled["state"] == "done"
+        assert polled["result"]["job_id"] == "job-1"
+
+        assert (await client.delete(handle["status_url"])).status_code == 409
+        assert (await client.get("/api/mining-jobs/unknown")).status_code == 404
+
+        sync = await client.post("/api/mine-patterns", data={"job_id": "job-2", "graph_type": "directed"})
+        assert sync.json() == {"status": "success", "job_id": "job-2"}
+
+    await pipeline.mining_scheduler.stop()
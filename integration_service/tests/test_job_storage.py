@@ -0,0 +1,135 @@
+"""Tests for the disk budget over job data."""
+import os
+import time
+import httpx
+import pytest
+import pytest_asyncio
+from ..api import pipeline
+from ..main import app
+from ..services.http_client import http_clients
+from ..services.job_storage import JobStorage, base_job_id
+from ..services.orchestration_service import OrchestrationService
+from ..config.settings import settings
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def roots(tmp_path, monkeypatch):
+    shared, local = tmp_path / "shared", tmp_path / "local"
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "job_storage_index", str(tmp_path / "job_storage.json"))
+    monkeypatch.setattr(settings, "job_storage_min_idle", 0)
+    monkeypatch.setattr(settings, "job_storage_max_bytes", 0)
+    monkeypatch.setattr(settings, "job_ttl_seconds", 0)
+    return shared, local
+
+
+def _job(shared, local, job_id, size, age):
+    """A job with results on both roots, a sweep config and an archive, last written ``age`` seconds ago."""
+    paths = [
+        shared / job_id / "networkx_graph.pkl",
+        shared / f"{job_id}__sweep_abc" / "results" / "patterns.json",
+        local / job_id / "results" / "patterns.json",
+        local / f"{job_id}.zip",
+        local / f"{job_id}.zip.etag"
+    ]
+    then = time.time() - age
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+    for path in paths:
+        while path not in (shared, local):
+            os.utime(path, (then, then))
+            path = path.parent
+    return paths
+
+
+def test_derived_jobs_and_archives_belong_to_their_job():
+    assert base_job_id("job-1") == "job-1"
+    assert base_job_id("job-1__shard_3") == "job-1"
+    assert base_job_id("job-1__calibration") == "job-1"
+    assert base_job_id("job-1.zip.etag") == "job-1"
+
+
+@pytest.mark.asyncio
+async def test_sweep_evicts_idle_then_least_recently_used_jobs(roots, monkeypatch):
+    shared, local = roots
+    old = _job(shared, local, "old", 1000, age=7200)
+    used = _job(shared, local, "used", 1000, age=3600)
+    running = _job(shared, local, "running", 1000, age=5000)
+    _job(shared, local, "new", 1000, age=0)
+
+    job_storage = JobStorage(lambda: (str(shared), str(local)))
+    job_storage.protect(lambda: ["running__shard_0"])
+    job_storage.touch("used")
+    usage = job_storage.usage()
+    assert usage["old"]["size"] >= 5000 and len(usage["old"]["paths"]) == 5
+
+    # Only the job idle for longer than the TTL goes
+    monkeypatch.setattr(settings, "job_ttl_seconds", 6000)
+    evicted = await job_storage.sweep()
+    assert [(e["job_id"], e["reason"]) for e in evicted] == [("old", "ttl")]
+    assert not any(path.exists() for path in old)
+
+    # Over budget: the least recently used unprotected job goes; "used" was just read
+    monkeypatch.setattr(settings, "job_ttl_seconds", 0)
+    monkeypatch.setattr(settings, "job_storage_max_bytes", 2 * usage["new"]["size"])
+    evicted = await job_storage.sweep()
+    assert [e["job_id"] for e in evicted] == ["new"]
+    assert all(path.exists() for path in used + running)
+
+    # Access times survive a restart
+    assert "used" in JobStorage(lambda: (str(shared), str(local)))._last_access
+    assert job_storage.stats()["evictions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_jobs_being_written_or_queued_are_kept(roots, monkeypatch, tmp_path):
+    shared, local = roots
+    _job(shared, local, "job-1", 100, age=100)
+    _job(shared, local, "job-2", 100, age=50)
+    service = OrchestrationService()
+    service.local_output_dir = str(local)
+    monkeypatch.setattr(pipeline, "orchestration_service", service)
+    service.job_storage.protect(lambda: ["job-2"])
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        stats = (await client.get("/api/storage")).json()
+        async with service._output_lock("job-1"):
+            writing = await client.delete("/api/jobs/job-1")
+        queued = await client.delete("/api/jobs/job-2")
+        evicted = await client.delete("/api/jobs/job-1")
+        missing = await client.delete("/api/jobs/job-1")
+
+    assert [(job["job_id"], job["protected"]) for job in stats["jobs"]] == [("job-1", False), ("job-2", True)]
+    assert writing.status_code == 409 and queued.status_code == 409
+    assert evicted.json()["freed_bytes"] == stats["jobs"][0]["size"]
+    assert sorted(os.listdir(shared)) == ["job-2", "job-2__sweep_abc"]
+    assert missing.status_code == 404
+    assert len(service._output_locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_files_linked_from_outside_the_job_are_not_counted_as_freed(roots, tmp_path):
+    shared, local = roots
+    graph, sweep_patterns, local_patterns, _, _ = _job(shared, local, "job-1", 1000, age=100)
+    # The ingest cache keeps its own link to the graph; the local results link the shared ones
+    cached = tmp_path / "cache" / "graph.pkl"
+    cached.parent.mkdir()
+    os.link(graph, cached)
+    os.unlink(local_patterns)
+    os.link(sweep_patterns, local_patterns)
+
+    job_storage = JobStorage(lambda: (str(shared), str(local)))
+    usage = job_storage.usage()["job-1"]
+    assert usage["size"] - usage["freeable"] == 1000
+
+    assert await job_storage.evict("job-1")
+    assert job_storage.evicted_bytes == usage["freeable"]
+    assert cached.read_bytes() == b"x" * 1000
@@ -0,0 +1,119 @@
+"""Tests for result materialization strategies."""
+import os
+import shutil
+import tempfile
+import zipfile
+import pytest
+from ..services.materializer import Materializer
+from ..services.orchestration_service import OrchestrationService
+from ..config.settings import settings
+
+
+@pytest.fixture
+def tmpfs_dir():
+    """A scratch directory on tmpfs when available (same filesystem for src and dst)."""
+    base = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+    path = tempfile.mkdtemp(prefix="materialize-", dir=base)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def shared_job(tmpfs_dir):
+    src = os.path.join(tmpfs_dir, "shared", "job-1")
+    os.makedirs(os.path.join(src, "results"))
+    os.makedirs(os.path.join(src, "plots", "instances"))
+    with open(os.path.join(src, "results", "patterns.json"), "w") as f:
+        f.write('{"patterns": []}')
+    with open(os.path.join(src, "plots", "instances", "p0.png"), "wb") as f:
+        f.write(b"\x89PNG" * 100)
+    return src
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.asyncio
+async def test_hardlink_shares_inodes(shared_job, tmpfs_dir):
+    dst = os.path.join(tmpfs_dir, "local", "plots")
+    used = await Materializer("hardlink").materialize(os.path.join(shared_job, "plots"), dst)
+
+    src_file = os.path.join(shared_job, "plots", "instances", "p0.png")
+    dst_file = os.path.join(dst, "instances", "p0.png")
+    assert used == "hardlink"
+    assert os.stat(dst_file).st_ino == os.stat(src_file).st_ino
+
+
+@pytest.mark.asyncio
+async def test_reflink_falls_back_to_copy_when_unsupported(shared_job, tmpfs_dir):
+    dst = os.path.join(tmpfs_dir, "local", "results")
+    used = await Materializer("reflink").materialize(os.path.join(shared_job, "results"), dst)
+
+    assert used in ("reflink", "copy")
+    assert _read(os.path.join(dst, "patterns.json")) == b'{"patterns": []}'
+
+
+@pytest.mark.asyncio
+async def test_auto_prefers_links_on_same_filesystem(shared_job, tmpfs_dir):
+    dst = os.path.join(tmpfs_dir, "local", "results")
+    used = await Materializer("auto").materialize(os.path.join(shared_job, "results"), dst)
+    assert used in ("reflink", "hardlink")
+
+
+@pytest.mark.asyncio
+async def test_copy_is_incremental(shared_job, tmpfs_dir):
+    src = os.path.join(shared_job, "plots")
+    dst = os.path.join(tmpfs_dir, "local", "plots")
+    materializer = Materializer("copy")
+
+    assert await materializer.materialize(src, dst) == "copy"
+    copied = os.path.join(dst, "instances", "p0.png")
+    inode = os.stat(copied).st_ino
+    assert inode != os.stat(os.path.join(src, "instances", "p0.png")).st_ino
+
+    # Nothing changed: nothing is copied again
+    assert await materializer.materialize(src, dst) == "unchanged"
+    assert os.stat(copied).st_ino == inode
+
+    # A new file is added, an old one disappears
+    with open(os.path.join(src, "p1.png"), "wb") as f:
+        f.write(b"new")
+    os.unlink(os.path.join(src, "instances", "p0.png"))
+    assert await materializer.materialize(src, dst) == "copy"
+    assert _read(os.path.join(dst, "p1.png")) == b"new"
+    assert not os.path.exists(copied)
+
+
+@pytest.mark.asyncio
+async def test_symlink_points_at_shared_directory(shared_job, tmpfs_dir):
+    dst = os.path.join(tmpfs_dir, "local", "results")
+    os.makedirs(dst)
+    used = await Materializer("symlink").materialize(os.path.join(shared_job, "results"), dst)
+
+    assert used == "symlink"
+    assert os.path.islink(dst)
+    assert os.path.realpath(dst) == os.path.realpath(os.path.join(shared_job, "results"))
+
+    # Switching back to a copying strategy replaces the link with real files
+    assert await Materializer("copy").materialize(os.path.join(shared_job, "results"), dst) == "copy"
+    assert not os.path.islink(dst)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["serve", "symlink", "hardlink", "copy"])
+async def test_downloads_work_for_every_strategy(shared_job, tmpfs_dir, monkeypatch, strategy):
+    monkeypatch.setattr(settings, "shared_volume_path", os.path.dirname(shared_job))
+    service = OrchestrationService()
+    service.local_output_dir = os.path.join(tmpfs_dir, "local")
+    service.materializer = Materializer(strategy)
+
+    await service._copy_to_local_output("job-1")
+
+    path = service.get_result_file_path("job-1", "results/patterns.json")
+    assert _read(path) == b'{"patterns": []}'
+    zip_path = await service.build_job_archive("job-1", await service.prepare_job_archive("job-1"))
+    with zipfile.ZipFile(zip_path) as archive:
+        assert sorted(archive.namelist()) == ["plots/instances/p0.png", "results/patterns.json"]
+    assert os.path.exists(os.path.join(tmpfs_dir, "local", "job-1")) == (strategy != "serve")
@@ -0,0 +1,143 @@
+"""Tests for pipeline metrics and per-job stage timings."""
+import asyncio
+import json
+import time
+import httpx
+import pytest
+import pytest_asyncio
+from ..main import app
+from ..services.http_client import http_clients
+from ..services.materializer import Materializer
+from ..services.metrics import (
+    LOOP_LAG, LOOP_LAG_LAST, RETRIES, STAGE_BYTES, STAGE_SECONDS,
+    LoopLagMonitor, MetricsRegistry
+)
+from ..services.orchestration_service import OrchestrationService
+from ..config.settings import settings
+from .stand_ins import serve
+
+STAGES = ('upload', 'atomspace_load', 'miner_call', 'result_copy', 'archive')
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "ingest_cache_enabled", False)
+    monkeypatch.setattr(settings, "mining_cache_enabled", False)
+    monkeypatch.setattr(settings, "miner_health_interval", 0)
+    monkeypatch.setattr(settings, "miner_retry_delay", 0)
+    return shared
+
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ["route"])
+    latency = registry.histogram("latency_seconds", "Latency.", ["route"], buckets=(0.1, 1))
+    registry.gauge("queue_depth", "Queued.", callback=lambda: 3)
+
+    requests.inc("/a")
+    requests.inc("/a", amount=2)
+    latency.observe(0.05, "/a")
+    latency.observe(0.5, "/a")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 2' in lines
+    assert 'latency_seconds_sum{route="/a"} 0.55' in lines
+    assert 'latency_seconds_count{route="/a"} 2' in lines
+    assert "queue_depth 3" in lines
+    with pytest.raises(ValueError):
+        requests.inc()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_run_is_broken_down_by_stage(shared_dir, tmp_path):
+    csv_path = tmp_path / "edges.csv"
+    csv_path.write_bytes(b"source,target\n" + b"a,b\n" * 50_000)
+    env = {"STAND_IN_SHARED_DIR": str(shared_dir)}
+    before = {stage: STAGE_SECONDS.count(stage) for stage in STAGES}
+    sent_before = STAGE_BYTES.value("upload", "sent")
+
+    with serve("integration_service.tests.stand_ins:atomspace_app", env=env) as atomspace_url, \
+            serve("integration_service.tests.stand_ins:miner_app", env=env) as miner_url:
+        service = OrchestrationService()
+        service.atomspace_url = atomspace_url
+        service.miner_service.miner_url = miner_url
+        service.local_output_dir = str(tmp_path / "local")
+        service.materializer = Materializer("copy")
+
+        graph = await service.generate_networkx([str(csv_path)], "{}", "{}", "networkx")
+        job_id = graph["job_id"]
+        mined = await service.mine_patterns(job_id, {"graph_type": "directed"})
+        await service.build_job_archive(job_id, await service.prepare_job_archive(job_id))
+
+    assert mined["status"] == "success", mined
+    assert all(STAGE_SECONDS.count(stage) == before[stage] + 1 for stage in STAGES)
+    assert STAGE_BYTES.value("upload", "sent") - sent_before > csv_path.stat().st_size
+
+    timings = json.loads((shared_dir / job_id / "timings.json").read_text())
+    assert set(STAGES) <= set(timings["stages"])
+    assert timings["stages"]["upload"]["bytes_sent"] > csv_path.stat().st_size
+    assert timings["stages"]["result_copy"]["bytes_received"] > 0
+    assert timings["stages"]["archive"]["bytes_sent"] > 0
+    assert all(entry["runs"] == 1 and entry["failures"] == 0 for entry in timings["stages"].values())
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    for stage in STAGES:
+        assert f'pipeline_stage_duration_seconds_count{{stage="{stage}"}}' in body
+    assert 'pipeline_stage_bytes_total{stage="upload",direction="sent"}' in body
+    assert "mining_queue_depth 0" in body
+    assert "mining_jobs_in_flight 0" in body
+
+
+@pytest.mark.asyncio
+async def test_miner_failover_counts_a_retry(shared_dir, tmp_path):
+    (shared_dir / "job-1").mkdir()
+    (shared_dir / "job-1" / "networkx_graph.pkl").write_bytes(b"graph")
+    retries_before = RETRIES.value("miner_call")
+
+    with serve("integration_service.tests.stand_ins:miner_app", env={"STAND_IN_MINER_FAIL_STATUS": "503"}) as bad, \
+            serve("integration_service.tests.stand_ins:miner_app") as good:
+        service = OrchestrationService()
+        service.miner_service.miner_urls = [bad, good]
+        # Send the first attempt to the failing replica
+        service.miner_service.pool.endpoints[1].dispatched = 1
+        await service.miner_service.mine_motifs(str(shared_dir / "job-1" / "networkx_graph.pkl"), job_id="job-1")
+
+    assert RETRIES.value("miner_call") == retries_before + 1
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_shows_up_as_loop_lag():
+    monitor = LoopLagMonitor(interval=0.01)
+    samples_before = LOOP_LAG.count()
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # blocks the event loop
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    assert LOOP_LAG.count() > samples_before
+    assert 'pipeline_event_loop_lag_seconds_bucket{le="0.1"}' in LOOP_LAG.render()
+    lags = [value for name, _, value in LOOP_LAG.samples() if name.endswith("_sum")]
+    assert lags[0] >= 0.15
+    assert LOOP_LAG_LAST.samples()[0][2] < 0.15
@@ -0,0 +1,156 @@
+"""Tests for dispatching mining jobs across several miner replicas."""
+import asyncio
+import time
+from contextlib import ExitStack
+import httpx
+import pytest
+import pytest_asyncio
+from ..services.http_client import http_clients
+from ..services.miner_pool import CLOSED, OPEN, MinerPool
+from ..services.miner_service import MinerService
+from ..config.settings import settings
+from .stand_ins import serve
+
+MINER_APP = "integration_service.tests.stand_ins:miner_app"
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def graph_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "shared_volume_path", str(tmp_path))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(tmp_path))
+    monkeypatch.setattr(settings, "miner_retry_delay", 0.01)
+    (tmp_path / "job-1").mkdir()
+    path = tmp_path / "job-1" / "networkx_graph.pkl"
+    path.write_bytes(b"\x80\x04graph")
+    return str(path)
+
+
+def _miners(stack, count, env=None):
+    return [stack.enter_context(serve(MINER_APP, env=env)) for _ in range(count)]
+
+
+def _calls(url):
+    return [c for c in httpx.get(f"{url}/calls").json() if c["mode"] != "failed"]
+
+
+def _service(urls, **pool_options):
+    service = MinerService(urls)
+    service.pool = MinerPool(urls, **{"probe_interval": 0, **pool_options})
+    return service
+
+
+async def _mine_concurrently(service, graph_file, jobs):
+    start = time.perf_counter()
+    await asyncio.gather(*(service.mine_motifs(graph_file, job_id="job-1") for _ in range(jobs)))
+    return time.perf_counter() - start
+
+
+@pytest.mark.asyncio
+async def test_throughput_scales_with_replicas(graph_file):
+    env = {"STAND_IN_MINER_DELAY": "0.2", "STAND_IN_MINER_SLOTS": "1"}
+    with ExitStack() as stack:
+        urls = _miners(stack, 3, env)
+        single = await _mine_concurrently(_service(urls[:1]), graph_file, 6)
+
+        service = _service(urls)
+        pooled = await _mine_concurrently(service, graph_file, 6)
+        per_miner = [len(_calls(url)) for url in urls]
+
+    # Least-loaded dispatch spreads the six jobs evenly over three replicas
+    assert per_miner == [6 + 2, 2, 2]
+    assert single / pooled > 2.2, (single, pooled)
+    assert service.pool.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failing_miner_trips_breaker_and_jobs_move_on(graph_file):
+    with ExitStack() as stack:
+        bad, good = _miners(stack, 2)
+        httpx.post(f"{bad}/control", params={"fail_status": 503})
+        service = _service([bad, good], failure_threshold=2, reset_timeout=60)
+
+        for _ in range(6):
+            result = await service.mine_motifs(graph_file, job_id="job-1")
+            assert result["status"] == "success"
+
+        failed_on_bad = len([c for c in httpx.get(f"{bad}/calls").json() if c["mode"] == "failed"])
+        served_by_good = len(_calls(good))
+
+    assert failed_on_bad == 2
+    assert served_by_good == 6
+    endpoints = {e["url"]: e for e in service.pool.stats()["endpoints"]}
+    assert endpoints[bad]["breaker"] == OPEN
+    assert endpoints[good]["breaker"] == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_half_open_trial_closes_breaker_after_recovery(graph_file):
+    with ExitStack() as stack:
+        (url,) = _miners(stack, 1)
+        httpx.post(f"{url}/control", params={"fail_status": 500})
+        service = _service([url], failure_threshold=1, reset_timeout=0.3)
+
+        with pytest.raises(Exception, match="returned 500"):
+            await service.mine_motifs(graph_file, job_id="job-1", max_retries=1)
+        # Open: fail fast without calling the miner
+        with pytest.raises(RuntimeError, match="No healthy miner"):
+            await service.mine_motifs(graph_file, job_id="job-1")
+
+        httpx.post(f"{url}/control", params={"fail_status": 0})
+        await asyncio.sleep(0.35)
+        assert (await service.mine_motifs(graph_file, job_id="job-1"))["status"] == "success"
+
+    assert service.pool.endpoints[0].breaker == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_health_probes_eject_and_readmit_miners(graph_file):
+    with ExitStack() as stack:
+        flaky, steady = _miners(stack, 2)
+        service = _service([flaky, steady], probe_interval=0.05)
+        await service.pool.start()
+
+        httpx.post(f"{flaky}/control", params={"healthy": False})
+        await asyncio.sleep(0.3)
+        assert [e.healthy for e in service.pool.endpoints] == [False, True]
+        for _ in range(3):
+            await service.mine_motifs(graph_file, job_id="job-1")
+        assert len(_calls(flaky)) == 0
+
+        httpx.post(f"{flaky}/control", params={"healthy": True})
+        await asyncio.sleep(0.3)
+        assert service.pool.available == 2
+        await service.pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_holds_per_miner_when_one_is_down(graph_file, monkeypatch):
+    monkeypatch.setattr(settings, "miner_max_in_flight", 2)
+    env = {"STAND_IN_MINER_DELAY": "0.1", "STAND_IN_MINER_SLOTS": "8"}
+    with ExitStack() as stack:
+        down, up = _miners(stack, 2, env)
+        service = _service([down, up])
+        service.pool.endpoints[0].healthy = False
+        peak = 0
+
+        async def sample():
+            nonlocal peak
+            while True:
+                peak = max(peak, service.pool.endpoints[1].in_flight)
+                await asyncio.sleep(0.01)
+
+        sampler = asyncio.create_task(sample())
+        elapsed = await _mine_concurrently(service, graph_file, 6)
+        sampler.cancel()
+        calls = [len(_calls(url)) for url in (down, up)]
+
+    # The healthy miner gets its own limit, not the pool's combined one
+    assert peak == 2
+    assert calls == [0, 6]
+    assert elapsed >= 0.3
@@ -1,19 +1,54 @@
-"""Tests for Miner Service."""  
-import pytest  
-import asyncio  
-from services.miner_service import MinerService  
-  
-@pytest.mark.asyncio  
-async def test_validate_motif_output():  
-    """Test motif output validation."""  
-    miner_service = MinerService()  
-      
-    valid_output = {  
-        "motifs": [{"id": 1, "pattern": "..."}],  
-        "statistics": {"total_motifs": 5}  
-    }  
-      
-    assert miner_service.validate_motif_output(valid_output) == True  
-      
-    invalid_output = {"motifs": []}  
-    assert miner_service.validate_motif_output(invalid_output) == False
\ No newline at end of file
+"""Tests for Miner Service."""
+import pytest
+import pytest_asyncio
+from ..services.http_client import http_clients
+from ..services.miner_service import MinerService
+from ..config.settings import settings
+from .stand_ins import serve
+
+MINER_APP = "integration_service.tests.stand_ins:miner_app"
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+def test_validate_motif_output():
+    """The miner answers with where it wrote results and plots."""
+    miner_service = MinerService(["http://miner:5000"])
+
+    valid_output = {
+        "status": "success",
+        "results_path": "/shared/output/job-1/results",
+        "plots_path": "/shared/output/job-1/plots"
+    }
+    assert miner_service.validate_motif_output(valid_output) is True
+
+    assert miner_service.validate_motif_output({"status": "success", "results_path": "/x"}) is False
+    assert miner_service.validate_motif_output({"motifs": []}) is False
+
+
+@pytest.mark.asyncio
+async def test_mine_motifs_sends_defaults_and_returns_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "miner_health_interval", 0)
+    monkeypatch.setattr(settings, "shared_volume_path", str(tmp_path))
+    graph = tmp_path / "job-1" / "networkx_graph.pkl"
+    graph.parent.mkdir()
+    graph.write_bytes(b"graph")
+
+    with serve(MINER_APP, env={"STAND_IN_SHARED_DIR": str(tmp_path)}) as url:
+        miner_service = MinerService([url])
+        result = await miner_service.mine_motifs(str(graph), job_id="job-1", mining_config={"min_pattern_size": 4})
+
+    assert result["status"] == "success"
+    assert result["results_path"].endswith("/job-1/results")
+    assert (tmp_path / "job-1" / "results" / "patterns.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_mine_motifs_rejects_missing_graph(tmp_path):
+    miner_service = MinerService(["http://miner:5000"])
+    with pytest.raises(FileNotFoundError):
+        await miner_service.mine_motifs(str(tmp_path / "missing.pkl"), job_id="job-1")
@@ -0,0 +1,85 @@
+"""Tests for shared-volume path handoff and streamed upload to the miner."""
+import hashlib
+import httpx
+import pytest
+import pytest_asyncio
+from ..services.http_client import http_clients
+from ..services.miner_service import MinerService
+from ..config.settings import settings
+from .stand_ins import serve
+
+MINER_APP = "integration_service.tests.stand_ins:miner_app"
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def graph_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "shared_volume_path", str(tmp_path))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(tmp_path))
+    job_dir = tmp_path / "job-1"
+    job_dir.mkdir()
+    path = job_dir / "networkx_graph.pkl"
+    path.write_bytes(b"\x80\x04graph" * 50000)
+    return path
+
+
+def _service(url):
+    service = MinerService()
+    service.miner_url = url
+    return service
+
+
+@pytest.mark.asyncio
+async def test_path_handoff_sends_only_path_and_checksum(graph_file):
+    with serve(MINER_APP) as url:
+        await _service(url).mine_motifs(str(graph_file), job_id="job-1")
+        calls = httpx.get(f"{url}/calls").json()
+
+    assert calls == [{
+        "job_id": "job-1",
+        "mode": "path",
+        "path": str(graph_file),
+        "sha256": hashlib.sha256(graph_file.read_bytes()).hexdigest()
+    }]
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_streamed_upload_when_volume_not_visible(graph_file):
+    with serve(MINER_APP, env={"STAND_IN_MINER_SEES_VOLUME": "false"}) as url:
+        service = _service(url)
+        await service.mine_motifs(str(graph_file), job_id="job-1")
+        await service.mine_motifs(str(graph_file), job_id="job-1")
+        calls = httpx.get(f"{url}/calls").json()
+
+    expected_upload = {
+        "job_id": "job-1",
+        "mode": "upload",
+        "size": graph_file.stat().st_size,
+        "sha256": hashlib.sha256(graph_file.read_bytes()).hexdigest()
+    }
+    # The path is offered once; after the rejection the miner is remembered as upload-only
+    assert calls == [{"job_id": "job-1", "mode": "path-rejected"}, expected_upload, expected_upload]
+
+
+@pytest.mark.asyncio
+async def test_fallback_can_be_disabled(graph_file, monkeypatch):
+    monkeypatch.setattr(settings, "miner_transfer_fallback", False)
+    with serve(MINER_APP, env={"STAND_IN_MINER_SEES_VOLUME": "false"}) as url:
+        with pytest.raises(RuntimeError, match="Miner returned 404"):
+            await _service(url).mine_motifs(str(graph_file), job_id="job-1")
+
+
+@pytest.mark.asyncio
+async def test_upload_only_miner_gets_streamed_upload(graph_file):
+    with serve(MINER_APP, env={"STAND_IN_MINER_MODES": "upload"}) as url:
+        service = _service(url)
+        await service.mine_motifs(str(graph_file), job_id="job-1")
+        calls = httpx.get(f"{url}/calls").json()
+
+    assert [call["mode"] for call in calls] == ["upload"]
+    assert service._transfer_modes[url] == "upload"
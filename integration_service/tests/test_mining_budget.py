@@ -0,0 +1,168 @@
+"""Tests for time-budgeted mining."""
+import json
+import pickle
+import httpx
+import networkx as nx
+import pytest
+import pytest_asyncio
+from ..api import pipeline
+from ..main import app
+from ..services.admission import AdmissionController
+from ..services.cost_estimator import CostEstimator, work_units
+from ..services.graph_partition import sample_graph
+from ..services.http_client import http_clients
+from ..services.job_scheduler import MiningScheduler
+from ..services.materializer import Materializer
+from ..services.miner_service import DEFAULT_MINING_CONFIG
+from ..services.mining_budget import HISTORY_FILE, plan_parameters
+from ..services.orchestration_service import OrchestrationService
+from ..config.settings import settings
+from .stand_ins import serve
+
+MINER_APP = "integration_service.tests.stand_ins:miner_app"
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+def test_plans_grow_with_the_budget_and_keep_fixed_parameters():
+    small = plan_parameters(10, 0.001, {}, nodes=1000, edges=5000)
+    large = plan_parameters(100, 0.001, {}, nodes=1000, edges=5000)
+    assert small["units"] < large["units"] and large["seconds"] <= 100
+    assert small["parameters"]["min_neighborhood_size"] <= small["parameters"]["max_neighborhood_size"]
+
+    # Never beyond the defaults, however large the budget
+    unlimited = plan_parameters(1e9, 0.001, {})
+    assert unlimited["units"] == work_units(DEFAULT_MINING_CONFIG)
+
+    fixed = plan_parameters(100, 0.001, {"n_trials": 10})
+    assert fixed["parameters"]["n_trials"] == 10
+    assert plan_parameters(0.01, 0.001, {}, nodes=10**6, edges=10**6) is None
+
+
+def test_calibration_sample_is_a_bounded_region_around_the_hub():
+    graph = nx.disjoint_union(nx.star_graph(50), nx.path_graph(1000))
+    sample = sample_graph(graph, 20)
+    assert sample.number_of_nodes() == 20 and 0 in sample
+    assert nx.is_connected(sample)
+    assert sample_graph(graph, 5000) is graph
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    (shared / "job-1").mkdir(parents=True)
+    graph = nx.path_graph(2000)
+    (shared / "job-1" / "networkx_graph.pkl").write_bytes(pickle.dumps(graph))
+    (shared / "job-1" / "networkx_metadata.json").write_text(json.dumps({"nodes": 2000, "edges": 1999}))
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "mining_cache_enabled", False)
+    monkeypatch.setattr(settings, "miner_health_interval", 0)
+    monkeypatch.setattr(settings, "mining_calibration_nodes", 500)
+    return shared
+
+
+@pytest.mark.asyncio
+async def test_budgeted_runs_calibrate_once_then_learn_from_history(shared_dir, tmp_path, monkeypatch):
+    env = {
+        "STAND_IN_SHARED_DIR": str(shared_dir),
+        "STAND_IN_MINER_ENUMERATE": "true",
+        "STAND_IN_MINER_DELAY_PER_NODE": "0.0004"
+    }
+    with serve(MINER_APP, env=env) as miner_url:
+        service = OrchestrationService()
+        service.local_output_dir = str(tmp_path / "local")
+        service.materializer = Materializer("copy")
+        service.miner_service.miner_url = miner_url
+        scheduler = MiningScheduler(service.mine_patterns, max_in_flight=1, estimator=CostEstimator(log_path=""))
+        monkeypatch.setattr(pipeline, "orchestration_service", service)
+        monkeypatch.setattr(pipeline, "mining_scheduler", scheduler)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            form = {"job_id": "job-1", "graph_type": "undirected", "time_budget": "10"}
+            first = (await client.post("/api/mine-patterns", data=form)).json()
+            second = (await client.post("/api/mine-patterns", data=form)).json()
+            too_small = await client.post("/api/mine-patterns", data={**form, "time_budget": "0.01"})
+        await scheduler.stop()
+        calls = httpx.get(f"{miner_url}/calls").json()
+
+    assert first["status"] == "success"
+    assert first["budget"]["source"] == "calibration"
+    assert first["budget"]["calibration_seconds"] > 0
+    assert first["budget"]["planned_seconds"] <= 10 * settings.mining_budget_headroom
+    assert first["budget"]["parameters"]["n_neighborhoods"] < DEFAULT_MINING_CONFIG["n_neighborhoods"]
+    assert [call["job_id"] for call in calls] == ["job-1__calibration", "job-1", "job-1"]
+    assert calls[0]["nodes"] == 500
+
+    # The real run was much faster than planned, so the next plan is more thorough
+    assert second["budget"]["source"] == "history"
+    assert second["budget"]["units"] > first["budget"]["units"]
+    history = json.loads((shared_dir / "job-1" / HISTORY_FILE).read_text())["runs"]
+    assert [entry["kind"] for entry in history] == ["calibration", "run", "run"]
+
+    assert too_small.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_calibration_passes_are_admitted_and_counted(shared_dir, tmp_path, monkeypatch):
+    env = {"STAND_IN_SHARED_DIR": str(shared_dir), "STAND_IN_MINER_ENUMERATE": "true"}
+    with serve(MINER_APP, env=env) as miner_url:
+        service = OrchestrationService()
+        service.local_output_dir = str(tmp_path / "local")
+        service.materializer = Materializer("copy")
+        service.miner_service.miner_url = miner_url
+        admission = AdmissionController(max_active_jobs=1)
+        scheduler = MiningScheduler(
+            service.mine_patterns, max_in_flight=1, admission=admission, estimator=CostEstimator(log_path="")
+        )
+        monkeypatch.setattr(pipeline, "orchestration_service", service)
+        monkeypatch.setattr(pipeline, "mining_scheduler", scheduler)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            form = {"job_id": "job-1", "graph_type": "undirected", "time_budget": "30"}
+            async with scheduler.track("job-2", {}):
+                rejected = await client.post("/api/mine-patterns", data=form)
+            calls_while_busy = len(httpx.get(f"{miner_url}/calls").json())
+            accepted = await client.post("/api/mine-patterns", data=form)
+            jobs = (await client.get("/api/mining-jobs")).json()["jobs"]
+        await scheduler.stop()
+
+    assert rejected.status_code == 429 and calls_while_busy == 0
+    assert accepted.json()["budget"]["source"] == "calibration"
+    calibration = [job for job in jobs if job["job_id"] == "job-1__calibration"]
+    assert len(calibration) == 1 and calibration[0]["state"] == "done"
+    assert calibration[0]["estimated_seconds"] is not None
+
+
+@pytest.mark.asyncio
+async def test_omitted_fields_take_the_endpoint_defaults(shared_dir, tmp_path, monkeypatch):
+    with serve(MINER_APP, env={"STAND_IN_SHARED_DIR": str(shared_dir)}) as miner_url:
+        service = OrchestrationService()
+        service.local_output_dir = str(tmp_path / "local")
+        service.materializer = Materializer("copy")
+        service.miner_service.miner_url = miner_url
+        scheduler = MiningScheduler(service.mine_patterns, max_in_flight=1, estimator=CostEstimator(log_path=""))
+        monkeypatch.setattr(pipeline, "orchestration_service", service)
+        monkeypatch.setattr(pipeline, "mining_scheduler", scheduler)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/mine-patterns", data={"job_id": "job-1", "graph_type": "undirected"})
+        await scheduler.stop()
+        parameters = httpx.get(f"{miner_url}/parameters/job-1").json()
+
+    assert response.json()["status"] == "success"
+    assert parameters == {
+        "min_pattern_size": 3,
+        "max_pattern_size": 5,
+        "min_neighborhood_size": 3,
+        "max_neighborhood_size": 5,
+        "n_neighborhoods": 500,
+        "n_trials": 100
+    }
@@ -0,0 +1,85 @@
+"""Tests for memoized mining results."""
+import json
+import httpx
+import pytest
+import pytest_asyncio
+from ..services.http_client import http_clients
+from ..services.mining_cache import MiningCache, normalize_mining_config
+from ..services.orchestration_service import OrchestrationService
+from ..config.settings import settings
+from .stand_ins import serve
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    (shared / "job-1").mkdir(parents=True)
+    (shared / "job-1" / "networkx_graph.pkl").write_bytes(b"graph-bytes")
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(shared))
+    return shared
+
+
+def test_normalize_applies_defaults_and_types():
+    explicit = normalize_mining_config({'n_trials': '100', 'graph_type': 'directed', 'seed': '7'})
+    implicit = normalize_mining_config({'seed': 7, 'graph_output_format': 'instance'})
+    assert explicit == implicit
+    assert explicit['n_neighborhoods'] == 2000
+    assert normalize_mining_config({'n_trials': 50}) != normalize_mining_config({})
+
+
+def test_only_seeded_runs_are_cacheable_by_default():
+    assert MiningCache.is_cacheable({'seed': 1})
+    assert not MiningCache.is_cacheable({})
+    assert MiningCache.is_cacheable({}, allow_unseeded=True)
+
+
+@pytest.mark.asyncio
+async def test_eviction_by_disk_budget(tmp_path):
+    cache = MiningCache(cache_dir=str(tmp_path / "cache"), max_bytes=150)
+    for n in range(3):
+        source = tmp_path / f"job-{n}"
+        (source / "results").mkdir(parents=True)
+        (source / "results" / "patterns.json").write_bytes(b"x" * 60)
+        await cache.store(f"key-{n}", str(source), f"job-{n}", {'seed': n})
+
+    assert list(cache.index.entries) == ["key-1", "key-2"]
+    assert not (tmp_path / "cache" / "key-0").exists()
+    assert cache.index.total_bytes <= 150
+
+
+@pytest.mark.asyncio
+async def test_mine_patterns_reuses_cached_results(tmp_path, shared_dir):
+    with serve("integration_service.tests.stand_ins:miner_app",
+               env={"STAND_IN_SHARED_DIR": str(shared_dir)}) as url:
+        service = OrchestrationService()
+        service.miner_service.miner_url = url
+        service.local_output_dir = str(tmp_path / "local")
+        service.mining_cache = MiningCache(cache_dir=str(tmp_path / "cache"))
+
+        config = {'n_trials': 10, 'seed': 42}
+        first = await service.mine_patterns("job-1", dict(config))
+        # Simulate a later run overwriting the shared output; the hit must come from the cache
+        (shared_dir / "job-1" / "results" / "patterns.json").write_text("overwritten")
+        second = await service.mine_patterns("job-1", dict(config))
+        local_results = tmp_path / "local" / "job-1" / "results" / "patterns.json"
+        assert json.loads(local_results.read_text()) == {"run": 1, "patterns": []}
+
+        unseeded = [await service.mine_patterns("job-1", {'n_trials': 10}) for _ in range(2)]
+        opted_in = [
+            await service.mine_patterns("job-1", {'n_trials': 10, 'reuse_unseeded_results': True})
+            for _ in range(2)
+        ]
+        calls = httpx.get(f"{url}/calls").json()
+
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is True
+    assert [r["cache_hit"] for r in unseeded] == [False, False]
+    assert [r["cache_hit"] for r in opted_in] == [False, True]
+    assert len(calls) == 4
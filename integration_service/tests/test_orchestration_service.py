@@ -1,49 +1,86 @@
-"""Tests for orchestration service."""  
-import pytest  
-import asyncio  
-from unittest.mock import AsyncMock, patch  
-from ..services.orchestration_service import OrchestrationService  
-  
-@pytest.mark.asyncio  
-async def test_execute_mining_pipeline():  
-    """Test complete pipeline execution."""  
-    service = OrchestrationService()  
-      
-    # Mock data  
-    csv_content = "id,name,type\n1,NodeA,Person\n2,NodeB,Organization"  
-    config = '{"name": "test", "description": "test config"}'  
-    schema_json = '{"nodes": [{"id": "id", "label": "name", "type": "type"}]}'  
-      
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:  
-        f.write(csv_content)  
-        csv_path = f.name  
-      
-    try:  
-        # Mock AtomSpace Builder response  
-        mock_atomspace_response = {  
-            "job_id": "test-job-123",  
-            "status": "success"  
-        }  
-          
-        # Mock miner response  
-        mock_miner_response = {  
-            "motifs": [{"id": 1, "pattern": "test"}],  
-            "statistics": {"total_motifs": 1}  
-        }  
-          
-        with patch('httpx.AsyncClient') as mock_client:  
-            mock_client.return_value.__aenter__.return_value.post.return_value.json.return_value = mock_atomspace_response  
-            mock_client.return_value.__aenter__.return_value.post.return_value.status_code = 200  
-              
-            with patch.object(service.miner_service, 'mine_motifs', return_value=mock_miner_response):  
-                result = await service.execute_mining_pipeline(  
-                    csv_path, config, schema_json, "tenant123", "session456"  
-                )  
-                  
-                assert result["status"] == "success"  
-                assert "job_id" in result  
-                assert "motifs" in result  
-                assert len(result["motifs"]) == 1  
-      
-    finally:  
-        os.unlink(csv_path)
\ No newline at end of file
+"""Tests for orchestration service."""
+import json
+import zipfile
+import pytest
+import pytest_asyncio
+from ..services.http_client import http_clients
+from ..services.materializer import Materializer
+from ..services.orchestration_service import OrchestrationService
+from ..config.settings import settings
+from .stand_ins import serve
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "ingest_cache_enabled", False)
+    monkeypatch.setattr(settings, "mining_cache_enabled", False)
+    monkeypatch.setattr(settings, "miner_health_interval", 0)
+    return shared
+
+
+def _service(tmp_path, atomspace_url, miner_url):
+    service = OrchestrationService()
+    service.atomspace_url = atomspace_url
+    service.miner_service.miner_url = miner_url
+    service.local_output_dir = str(tmp_path / "local")
+    service.materializer = Materializer("copy")
+    return service
+
+
+@pytest.mark.asyncio
+async def test_execute_mining_pipeline(shared_dir, tmp_path):
+    """CSV upload, mining and the job archive, against stand-in upstreams."""
+    csv_path = tmp_path / "nodes.csv"
+    csv_path.write_text("id,name,type\n1,NodeA,Person\n2,NodeB,Organization\n")
+    env = {"STAND_IN_SHARED_DIR": str(shared_dir), "STAND_IN_MINER_EMIT_PATTERNS": "true"}
+
+    with serve("integration_service.tests.stand_ins:atomspace_app", env=env) as atomspace_url, \
+            serve("integration_service.tests.stand_ins:miner_app", env=env) as miner_url:
+        service = _service(tmp_path, atomspace_url, miner_url)
+        graph = await service.generate_networkx(
+            [str(csv_path)],
+            config='{"name": "test"}',
+            schema_json='{"nodes": [{"id": "id", "label": "name", "type": "type"}]}',
+            writer_type="networkx"
+        )
+        assert graph["status"] == "success", graph
+        job_id = graph["job_id"]
+        (shared_dir / job_id / "networkx_metadata.json").write_text('{"graph_type": "undirected"}')
+
+        graph_type = await service.get_graph_type_from_metadata(job_id)
+        result = await service.mine_patterns(job_id, {"graph_type": graph_type, "min_pattern_size": 3})
+
+    assert graph_type == "undirected"
+    assert result["status"] == "success", result
+    assert result["cache_hit"] is False
+    assert result["download_url"].endswith(f"job_id={job_id}")
+
+    patterns_path = service.get_result_file_path(job_id, "results/patterns.json")
+    assert len(json.loads(open(patterns_path).read())["patterns"]) == 3
+
+    zip_path = await service.build_job_archive(job_id, await service.prepare_job_archive(job_id))
+    with zipfile.ZipFile(zip_path) as archive:
+        assert sorted(archive.namelist()) == ["plots/pattern_0.png", "results/patterns.json"]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_errors_are_reported_not_raised(shared_dir, tmp_path):
+    service = _service(tmp_path, "http://127.0.0.1:9", "http://127.0.0.1:9")
+
+    graph = await service.generate_networkx([str(tmp_path / "missing.csv")], "{}", "{}", "networkx")
+    mined = await service.mine_patterns("no-such-job", {})
+
+    assert graph["status"] == "error"
+    assert mined == {"status": "error", "error": "NetworkX file not found for job_id: no-such-job"}
+    with pytest.raises(PermissionError):
+        service.get_result_file_path("job-1", "../../etc/passwd")
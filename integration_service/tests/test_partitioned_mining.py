@@ -0,0 +1,212 @@
+"""Tests for partitioned (sharded) mining of large graphs."""
+import asyncio
+import json
+import pickle
+import time
+import networkx as nx
+import pytest
+import pytest_asyncio
+from ..services.graph_partition import partition_graph
+from ..services.http_client import http_clients
+from ..services.materializer import Materializer
+from ..services.orchestration_service import OrchestrationService
+from ..services.pattern_results import load_patterns, merge_pattern_results
+from ..config.settings import settings
+from .stand_ins import serve
+
+MINER_APP = "integration_service.tests.stand_ins:miner_app"
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "mining_cache_enabled", False)
+    monkeypatch.setattr(settings, "miner_health_interval", 0)
+    monkeypatch.setattr(settings, "partition_min_nodes", 0)
+    return shared
+
+
+def _add_job(shared_dir, job_id, graph):
+    job_dir = shared_dir / job_id
+    job_dir.mkdir()
+    (job_dir / "networkx_graph.pkl").write_bytes(pickle.dumps(graph))
+    (job_dir / "networkx_metadata.json").write_text(json.dumps({"graph_type": "undirected"}))
+
+
+def _service(tmp_path, url):
+    service = OrchestrationService()
+    service.local_output_dir = str(tmp_path / "local")
+    service.materializer = Materializer("copy")
+    service.miner_service.miner_url = url
+    return service
+
+
+def _motifs(patterns):
+    return sorted(
+        (p["wl_hash"], p["count"], sorted(sorted(i["nodes"]) for i in p["instances"]))
+        for p in patterns
+    )
+
+
+def _counts(patterns):
+    return sorted((p["wl_hash"], p["count"]) for p in patterns)
+
+
+def test_every_node_owned_once_and_halo_covers_radius():
+    graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(12, 12))
+    shards = partition_graph(graph, 4, halo=2)
+
+    assert len(shards) == 4
+    owned = [node for shard in shards for node in shard.core]
+    assert sorted(owned) == sorted(graph.nodes)
+    for shard in shards:
+        for node in shard.core:
+            within = nx.single_source_shortest_path_length(graph, node, cutoff=2)
+            assert set(within) <= set(shard.graph.nodes)
+        assert shard.halo_size > 0
+
+
+def test_merge_unites_isomorphic_patterns_and_dedupes_instances():
+    path_a = {"nodes": [0, 1, 2], "edges": [[0, 1], [1, 2]], "instances": [
+        {"nodes": [10, 11, 12], "edges": [[10, 11], [11, 12]]},
+        {"nodes": [20, 21, 22], "edges": [[20, 21], [21, 22]]},
+    ]}
+    # Same shape, different ids, one occurrence also seen by the first shard
+    path_b = {"nodes": ["x", "y", "z"], "edges": [["y", "x"], ["y", "z"]], "instances": [
+        {"nodes": [22, 21, 20], "edges": [[22, 21], [21, 20]]},
+        {"nodes": [30, 31, 32], "edges": [[30, 31], [31, 32]]},
+    ]}
+    triangle = {"nodes": [0, 1, 2], "edges": [[0, 1], [1, 2], [2, 0]], "count": 4}
+
+    merged = merge_pattern_results([[path_a, triangle], [path_b, dict(triangle, count=1)]], directed=False)
+
+    assert [(len(p["edges"]), p["count"], p["shards"]) for p in merged] == [(3, 5, [0, 1]), (2, 3, [0, 1])]
+    assert len(merged[1]["instances"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_partitioned_run_finds_the_same_motifs(shared_dir, tmp_path):
+    graph = nx.gnm_random_graph(80, 140, seed=7)
+    _add_job(shared_dir, "whole", graph)
+    _add_job(shared_dir, "sharded", graph)
+    config = {"graph_type": "undirected", "radius": 2, "min_pattern_size": 3}
+    env = {"STAND_IN_SHARED_DIR": str(shared_dir), "STAND_IN_MINER_ENUMERATE": "true"}
+
+    with serve(MINER_APP, env=env) as url:
+        service = _service(tmp_path, url)
+        whole = await service.mine_patterns("whole", dict(config))
+        sharded = await service.mine_patterns("sharded", dict(config, partition_shards=4))
+
+    assert whole["status"] == "success", whole
+    assert sharded["status"] == "success", sharded
+
+    expected = merge_pattern_results([load_patterns(str(shared_dir / "whole" / "results"))], directed=False)
+    merged = json.loads((tmp_path / "local" / "sharded" / "results" / "patterns.json").read_text())["patterns"]
+    assert _motifs(merged) == _motifs(expected)
+
+    partition = json.loads((shared_dir / "sharded" / "results" / "partition.json").read_text())
+    assert len(partition["shards"]) == 4
+    assert sum(s["core_nodes"] for s in partition["shards"]) == 80
+    assert (tmp_path / "local" / "sharded" / "plots" / "shard_3" / "pattern_0.png").exists()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("centres", ["true", "false"])
+async def test_count_only_miner_samples_shard_cores_only(shared_dir, tmp_path, centres):
+    graph = nx.gnm_random_graph(80, 140, seed=7)
+    _add_job(shared_dir, "whole", graph)
+    _add_job(shared_dir, "sharded", graph)
+    config = {"graph_type": "undirected", "radius": 2, "min_pattern_size": 3}
+    env = {
+        "STAND_IN_SHARED_DIR": str(shared_dir),
+        "STAND_IN_MINER_ENUMERATE": "true",
+        "STAND_IN_MINER_COUNT_ONLY": "true",
+        "STAND_IN_MINER_CENTRES": centres
+    }
+
+    with serve(MINER_APP, env=env) as url:
+        service = _service(tmp_path, url)
+        await service.mine_patterns("whole", dict(config))
+        await service.mine_patterns("sharded", dict(config, partition_shards=4))
+
+    expected = merge_pattern_results([load_patterns(str(shared_dir / "whole" / "results"))], directed=False)
+    merged = json.loads((tmp_path / "local" / "sharded" / "results" / "patterns.json").read_text())["patterns"]
+    if centres == "true":
+        assert _counts(merged) == _counts(expected)
+    else:
+        # Sampling around halo nodes too counts patterns near shard borders more than once
+        assert sum(p["count"] for p in merged) > sum(p["count"] for p in expected)
+
+
+@pytest.mark.asyncio
+async def test_partitioning_cuts_wall_clock_time(shared_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "miner_max_in_flight", 4)
+    graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(20, 20))
+    _add_job(shared_dir, "whole", graph)
+    _add_job(shared_dir, "sharded", graph)
+    config = {"graph_type": "undirected", "radius": 2}
+    env = {
+        "STAND_IN_SHARED_DIR": str(shared_dir),
+        "STAND_IN_MINER_ENUMERATE": "true",
+        "STAND_IN_MINER_DELAY_PER_NODE": "0.004",
+        "STAND_IN_MINER_SLOTS": "4",
+    }
+
+    with serve(MINER_APP, env=env) as url:
+        service = _service(tmp_path, url)
+        start = time.perf_counter()
+        assert (await service.mine_patterns("whole", dict(config)))["status"] == "success"
+        whole = time.perf_counter() - start
+
+        start = time.perf_counter()
+        assert (await service.mine_patterns("sharded", dict(config, partition_shards=4)))["status"] == "success"
+        sharded = time.perf_counter() - start
+
+    assert sharded < 0.6 * whole, (sharded, whole)
+
+
+@pytest.mark.asyncio
+async def test_shards_stay_within_the_miner_limit(shared_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "miner_max_in_flight", 2)
+    _add_job(shared_dir, "sharded", nx.convert_node_labels_to_integers(nx.grid_2d_graph(10, 10)))
+    env = {"STAND_IN_SHARED_DIR": str(shared_dir), "STAND_IN_MINER_DELAY": "0.2", "STAND_IN_MINER_SLOTS": "8"}
+
+    with serve(MINER_APP, env=env) as url:
+        service = _service(tmp_path, url)
+        peak = 0
+
+        async def sample():
+            nonlocal peak
+            while True:
+                peak = max(peak, service.miner_service.pool.stats()["in_flight"])
+                await asyncio.sleep(0.01)
+
+        sampler = asyncio.create_task(sample())
+        result = await service.mine_patterns("sharded", {"graph_type": "undirected", "partition_shards": 4})
+        sampler.cancel()
+
+    assert result["status"] == "success", result
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_small_graphs_are_mined_whole(shared_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "partition_min_nodes", 1000)
+    _add_job(shared_dir, "small", nx.path_graph(10))
+    env = {"STAND_IN_SHARED_DIR": str(shared_dir), "STAND_IN_MINER_ENUMERATE": "true"}
+
+    with serve(MINER_APP, env=env) as url:
+        service = _service(tmp_path, url)
+        result = await service.mine_patterns("small", {"graph_type": "undirected", "partition_shards": 4})
+
+    assert result["status"] == "success"
+    assert not (shared_dir / "small__shard_0").exists()
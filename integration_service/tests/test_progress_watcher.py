@@ -0,0 +1,88 @@
+"""Tests for push-based mining progress."""
+import asyncio
+import json
+import os
+import httpx
+import pytest
+from ..api import pipeline
+from ..main import app
+from ..services.progress_watcher import ProgressHub
+from ..config.settings import settings
+
+
+@pytest.fixture
+def job_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "shared_volume_path", str(tmp_path))
+    path = tmp_path / "job-1"
+    path.mkdir()
+    return path
+
+
+def _write_progress(job_dir, status, progress):
+    tmp = job_dir / "progress.json.tmp"
+    tmp.write_text(json.dumps({"status": status, "progress": progress}))
+    os.replace(tmp, job_dir / "progress.json")
+
+
+async def _collect(hub, job_id, into):
+    async for event in hub.subscribe(job_id):
+        into.append(event["progress"] if event["status"] != "pending" else "pending")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_inotify", [False, True])
+async def test_single_watcher_fans_out_changes(job_dir, use_inotify):
+    hub = ProgressHub(poll_interval=0.02, use_inotify=use_inotify)
+    seen_a, seen_b = [], []
+    viewers = [
+        asyncio.create_task(_collect(hub, "job-1", seen_a)),
+        asyncio.create_task(_collect(hub, "job-1", seen_b)),
+    ]
+    await asyncio.sleep(0.2)
+    assert hub.watcher_count == 1
+
+    for pct in (10, 50):
+        _write_progress(job_dir, "running", pct)
+        await asyncio.sleep(0.3)
+    # Rewriting identical content must not produce a new event
+    _write_progress(job_dir, "running", 50)
+    await asyncio.sleep(0.3)
+    _write_progress(job_dir, "completed", 100)
+
+    await asyncio.wait_for(asyncio.gather(*viewers), timeout=5)
+    await hub.close()
+
+    assert seen_a == ["pending", 10, 50, 100]
+    assert seen_b == seen_a
+    assert hub.watcher_count == 0
+
+
+@pytest.mark.asyncio
+async def test_watcher_stops_when_last_subscriber_leaves(job_dir):
+    hub = ProgressHub(poll_interval=0.02, use_inotify=False)
+    _write_progress(job_dir, "running", 5)
+
+    updates = hub.subscribe("job-1")
+    assert (await updates.__anext__())["progress"] == 5
+    assert hub.snapshot("job-1")["progress"] == 5
+    await updates.aclose()
+
+    assert hub.watcher_count == 0
+    assert hub.snapshot("job-1") is None
+
+
+@pytest.mark.asyncio
+async def test_sse_endpoint_and_status_route(job_dir, monkeypatch):
+    monkeypatch.setattr(pipeline, "progress_hub", ProgressHub(poll_interval=0.02, use_inotify=False))
+    _write_progress(job_dir, "completed", 100)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/mining-status/job-1/stream")
+        status = await client.get("/api/mining-status/job-1")
+        pending = await client.get("/api/mining-status/job-2")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == 'event: progress\ndata: {"status": "completed", "progress": 100}\n\n'
+    assert status.json() == {"status": "completed", "progress": 100}
+    assert pending.json()["status"] == "pending"
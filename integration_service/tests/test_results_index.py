@@ -0,0 +1,134 @@
+"""Tests for the indexed, paginated pattern results API."""
+import json
+import os
+import pickle
+import httpx
+import networkx as nx
+import pytest
+from ..api import pipeline
+from ..main import app
+from ..services import results_index as results_index_module
+from ..services.results_index import INDEX_DIR, ResultsIndex
+
+
+def _pattern(labels, count, instances=0, score=None):
+    record = {
+        "nodes": [{"id": i, "label": label} for i, label in enumerate(labels)],
+        "edges": [{"source": i, "target": i + 1, "label": "rel"} for i in range(len(labels) - 1)],
+        "count": count,
+        "instances": [{"nodes": [i, i + 1]} for i in range(instances)]
+    }
+    if score is not None:
+        record["score"] = score
+    return record
+
+
+@pytest.fixture
+def job_dir(tmp_path):
+    results = tmp_path / "job-1" / "results"
+    results.mkdir(parents=True)
+    (results / "patterns.json").write_text(json.dumps({"patterns": [
+        _pattern(["gene", "protein"], 5, instances=3, score=0.5),
+        _pattern(["gene", "protein", "gene"], 40, instances=250, score=0.9),
+        _pattern(["drug", "protein", "gene"], 12),
+    ]}))
+    # Pickled networkx records are indexed too (files are read in name order)
+    triangle = nx.cycle_graph(3)
+    nx.set_node_attributes(triangle, "drug", "label")
+    (results / "extra.pkl").write_bytes(pickle.dumps([triangle]))
+    return tmp_path / "job-1"
+
+
+@pytest.mark.asyncio
+async def test_query_filters_sorts_and_pages(job_dir):
+    index = ResultsIndex()
+
+    page = await index.query(str(job_dir), limit=2)
+    assert page["total"] == 4
+    assert [p["count"] for p in page["patterns"]] == [40, 12]
+    assert "instances" in page["patterns"][0] and "offset" not in page["patterns"][0]
+    assert page["facets"]["sizes"] == {"2": 1, "3": 3}
+    assert page["facets"]["node_labels"]["drug"] == 2
+
+    rest = await index.query(str(job_dir), offset=2, limit=2)
+    assert [p["count"] for p in rest["patterns"]] == [5, 1]
+
+    drugs = await index.query(str(job_dir), node_label="drug", min_size=3, sort="size", order="asc")
+    assert sorted(p["id"] for p in drugs["patterns"]) == [0, 3]
+    by_score = await index.query(str(job_dir), sort="score")
+    assert [p["score"] for p in by_score["patterns"]] == [0.9, 0.5, None, None]
+    with pytest.raises(ValueError):
+        await index.query(str(job_dir), sort="colour")
+
+
+@pytest.mark.asyncio
+async def test_single_pattern_pages_its_instances(job_dir):
+    index = ResultsIndex()
+    pattern = await index.pattern(str(job_dir), 2, instance_offset=100, instance_limit=20)
+
+    assert pattern["count"] == 40
+    assert pattern["instance_total"] == 250
+    assert pattern["instances"][0] == {"nodes": [100, 101]}
+    assert len(pattern["instances"]) == 20
+    assert [n["label"] for n in pattern["record"]["nodes"]] == ["gene", "protein", "gene"]
+
+    triangle = await index.pattern(str(job_dir), 0)
+    assert len(triangle["record"]["edges"]) == 3
+    with pytest.raises(KeyError):
+        await index.pattern(str(job_dir), 4)
+
+
+@pytest.mark.asyncio
+async def test_persisted_index_is_reused_until_results_change(job_dir, monkeypatch):
+    await ResultsIndex().query(str(job_dir))
+    assert (job_dir / INDEX_DIR / "index.json").exists()
+
+    def refuse(results_dir):
+        raise AssertionError("results parsed again")
+
+    monkeypatch.setattr(results_index_module, "load_patterns", refuse)
+    # A fresh process (empty LRU) loads the persisted index instead of parsing
+    page = await ResultsIndex().query(str(job_dir))
+    assert page["total"] == 4
+
+    monkeypatch.undo()
+    patterns_file = job_dir / "results" / "patterns.json"
+    patterns_file.write_text(json.dumps([_pattern(["gene"], 1)]))
+    os.utime(patterns_file, ns=(1, 1))
+    assert (await ResultsIndex().query(str(job_dir)))["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_is_bounded(tmp_path):
+    index = ResultsIndex(cache_size=1)
+    for job_id in ("a", "b"):
+        (tmp_path / job_id / "results").mkdir(parents=True)
+        (tmp_path / job_id / "results" / "patterns.json").write_text(json.dumps([_pattern(["x"], 1)]))
+        await index.query(str(tmp_path / job_id))
+    assert list(index._cache) == [str(tmp_path / "b")]
+    # Build locks do not outlive the loads that took them
+    assert len(index._locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_pattern_routes(job_dir, monkeypatch):
+    monkeypatch.setattr(pipeline.orchestration_service, "results_index", ResultsIndex())
+    monkeypatch.setattr(pipeline.orchestration_service, "_job_output_dir", lambda job_id: str(job_dir.parent / job_id))
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        listing = await client.get("/api/results/job-1/patterns", params={"limit": 1, "min_count": 10})
+        detail = await client.get("/api/results/job-1/patterns/2", params={"instance_limit": 5})
+        missing_job = await client.get("/api/results/job-2/patterns")
+        missing_pattern = await client.get("/api/results/job-1/patterns/9")
+        bad_sort = await client.get("/api/results/job-1/patterns", params={"sort": "colour"})
+        too_big = await client.get("/api/results/job-1/patterns", params={"limit": 100000})
+
+    assert listing.status_code == 200
+    assert listing.json()["total"] == 2
+    assert listing.json()["patterns"][0]["count"] == 40
+    assert len(detail.json()["instances"]) == 5
+    assert missing_job.status_code == 404
+    assert missing_pattern.status_code == 404
+    assert bad_sort.status_code == 400
+    assert too_big.status_code == 400
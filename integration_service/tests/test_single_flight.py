@@ -0,0 +1,167 @@
+"""Tests for coalescing identical concurrent ingest and mining requests."""
+import asyncio
+import pickle
+import time
+import httpx
+import networkx as nx
+import pytest
+import pytest_asyncio
+from ..services.http_client import http_clients
+from ..services.materializer import Materializer
+from ..services.orchestration_service import OrchestrationService
+from ..services.single_flight import SingleFlight
+from ..config.settings import settings
+from .stand_ins import serve
+
+MINER_APP = "integration_service.tests.stand_ins:miner_app"
+ATOMSPACE_APP = "integration_service.tests.stand_ins:atomspace_app"
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+class Call:
+    def __init__(self, result="done"):
+        self.runs = 0
+        self.result = result
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flights = SingleFlight("test")
+    call = Call()
+    waiters = [asyncio.create_task(flights.run("k", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert "k" in flights and len(flights) == 1
+
+    call.release.set()
+    assert await asyncio.gather(*waiters) == ["done"] * 3
+    assert call.runs == 1
+    assert "k" not in flights
+
+    failing = Call(RuntimeError("boom"))
+    failing.release.set()
+    results = await asyncio.gather(flights.run("k", failing), flights.run("k", failing), return_exceptions=True)
+    assert [str(r) for r in results] == ["boom", "boom"] and failing.runs == 1
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_only_when_its_callers_leave():
+    flights = SingleFlight("test")
+    call = Call()
+    first = asyncio.create_task(flights.run("k", call))
+    second = asyncio.create_task(flights.run("k", call))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    assert "k" in flights
+    second.cancel()
+    await asyncio.gather(first, second, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert "k" not in flights
+
+
+@pytest.mark.asyncio
+async def test_leader_owned_call_restarts_for_remaining_callers():
+    flights = SingleFlight("test", leader_owned=True)
+    leader_call, follower_call = Call("leader"), Call("follower")
+    leader = asyncio.create_task(flights.run("k", leader_call))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.run("k", follower_call))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0.01)
+    follower_call.release.set()
+
+    assert await follower == "follower"
+    assert (leader_call.runs, follower_call.runs) == (1, 1)
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    (shared / "job-1").mkdir(parents=True)
+    (shared / "job-1" / "networkx_graph.pkl").write_bytes(pickle.dumps(nx.path_graph(4)))
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "mining_cache_enabled", False)
+    monkeypatch.setattr(settings, "miner_health_interval", 0)
+    return shared
+
+
+def _service(tmp_path, miner_url=None):
+    service = OrchestrationService()
+    service.local_output_dir = str(tmp_path / "local")
+    service.materializer = Materializer("copy")
+    if miner_url:
+        service.miner_service.miner_url = miner_url
+    return service
+
+
+@pytest.mark.asyncio
+async def test_identical_mining_requests_run_once(shared_dir, tmp_path):
+    env = {"STAND_IN_MINER_DELAY": "0.3", "STAND_IN_MINER_SLOTS": "4", "STAND_IN_SHARED_DIR": str(shared_dir)}
+    with serve(MINER_APP, env=env) as miner_url:
+        service = _service(tmp_path, miner_url)
+        config = {"graph_type": "undirected", "n_trials": 50}
+        results = await asyncio.gather(
+            service.mine_patterns("job-1", dict(config)),
+            service.mine_patterns("job-1", {**config, "n_trials": "50"}),
+            service.mine_patterns("job-1", dict(config))
+        )
+        calls = httpx.get(f"{miner_url}/calls").json()
+
+    assert len(calls) == 1
+    assert [r["status"] for r in results] == ["success"] * 3
+    # Which request leads depends on scheduling; the other two join it
+    assert sorted(r.get("coalesced", False) for r in results) == [False, True, True]
+    assert results[1]["output_paths"] == results[0]["output_paths"]
+
+
+@pytest.mark.asyncio
+async def test_different_configs_for_one_job_take_turns(shared_dir, tmp_path):
+    env = {"STAND_IN_MINER_DELAY": "0.3", "STAND_IN_MINER_SLOTS": "4", "STAND_IN_SHARED_DIR": str(shared_dir)}
+    with serve(MINER_APP, env=env) as miner_url:
+        service = _service(tmp_path, miner_url)
+        started = time.monotonic()
+        results = await asyncio.gather(*(
+            service.mine_patterns("job-1", {"graph_type": "undirected", "n_trials": n}) for n in (10, 20)
+        ))
+        elapsed = time.monotonic() - started
+        calls = httpx.get(f"{miner_url}/calls").json()
+
+    assert len(calls) == 2
+    assert all(r["status"] == "success" for r in results)
+    # The miner has free slots, so only the per-job lock keeps the runs apart
+    assert elapsed >= 0.6
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_atomspace_load(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "csv_cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "ingest_cache_enabled", True)
+    csv = tmp_path / "edges.csv"
+    csv.write_text("source,target\n0,1\n")
+
+    with serve(ATOMSPACE_APP, env={"STAND_IN_ATOMSPACE_DELAY": "0.3"}) as atomspace_url:
+        service = _service(tmp_path)
+        service.atomspace_url = atomspace_url
+        results = await asyncio.gather(*(
+            service.generate_networkx([str(csv)], "{}", "{}", "networkx") for _ in range(3)
+        ))
+
+    assert len({r["job_id"] for r in results}) == 1
+    assert not any(r["cache_hit"] for r in results)
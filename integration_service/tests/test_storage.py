@@ -0,0 +1,132 @@
+"""Tests for the non-blocking storage layer."""
+import asyncio
+import json
+import os
+import time
+import httpx
+import pytest
+import pytest_asyncio
+from ..api import pipeline
+from ..main import app
+from ..services.archive_service import ArchiveService
+from ..services.http_client import http_clients
+from ..services.orchestration_service import OrchestrationService
+from ..services.storage import Storage
+from ..config.settings import settings
+from .stand_ins import serve
+
+MiB = 1024 * 1024
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.mark.asyncio
+async def test_read_write_and_ranges(tmp_path):
+    storage = Storage(max_workers=2)
+    path = str(tmp_path / "job-1" / "data.bin")
+
+    await storage.write_bytes(path, bytes(range(256)) * 4)
+    assert await storage.exists(path)
+    assert (await storage.stat(path)).st_size == 1024
+    assert await storage.stat(str(tmp_path / "missing")) is None
+    assert await storage.listdir(str(tmp_path / "job-1")) == ["data.bin"]
+
+    chunks = [c async for c in storage.iter_chunks(path, chunk_size=100, start=10, end=309)]
+    assert b"".join(chunks) == (bytes(range(256)) * 4)[10:310]
+    assert max(len(c) for c in chunks) == 100
+
+
+@pytest.mark.asyncio
+async def test_cached_json_is_revalidated_on_change(tmp_path):
+    storage = Storage(max_workers=2, json_cache_size=1)
+    path = str(tmp_path / "networkx_metadata.json")
+    await storage.write_json(path, {"graph_type": "directed"})
+
+    first = await storage.read_json(path, cached=True)
+    assert await storage.read_json(path, cached=True) is first
+
+    await storage.write_json(path, {"graph_type": "undirected", "nodes": 10})
+    assert (await storage.read_json(path, cached=True))["graph_type"] == "undirected"
+
+    os.unlink(path)
+    with pytest.raises(FileNotFoundError):
+        await storage.read_json(path, cached=True)
+    assert storage.cache_info()["json_entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_graph_type_from_metadata(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "shared_volume_path", str(tmp_path))
+    (tmp_path / "job-1").mkdir()
+    (tmp_path / "job-1" / "job_metadata.json").write_text(json.dumps({"graph_type": "undirected"}))
+
+    service = OrchestrationService()
+    assert await service.get_graph_type_from_metadata("job-1") == "undirected"
+    with pytest.raises(FileNotFoundError):
+        await service.get_graph_type_from_metadata("job-2")
+
+
+def _p99(samples):
+    samples = sorted(samples)
+    return samples[int(len(samples) * 0.99) - 1]
+
+
+async def _health_latencies(client, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+@pytest.mark.asyncio
+async def test_health_stays_responsive_during_uploads_and_archives(tmp_path, monkeypatch):
+    """/health p99 stays flat while a large gzip upload and an archive are in progress."""
+    output = tmp_path / "output"
+    plots = output / "job-1" / "plots"
+    plots.mkdir(parents=True)
+    for i in range(4):
+        (plots / f"instances_{i}.json").write_bytes(os.urandom(MiB).hex().encode())
+    monkeypatch.setattr(settings, "ingest_cache_enabled", False)
+    monkeypatch.setattr(settings, "atomspace_upload_gzip", True)
+    monkeypatch.setattr(pipeline.orchestration_service, "local_output_dir", str(output))
+    monkeypatch.setattr(pipeline.orchestration_service, "archive_service", ArchiveService(compression_level=9))
+
+    csv_path = tmp_path / "edges.csv"
+    with open(csv_path, "wb") as f:
+        for _ in range(32):
+            f.write(os.urandom(MiB // 2).hex().encode())
+
+    transport = httpx.ASGITransport(app=app)
+    with serve("integration_service.tests.stand_ins:atomspace_app") as atomspace_url:
+        monkeypatch.setattr(pipeline.orchestration_service, "atomspace_url", atomspace_url)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            baseline = await _health_latencies(client, 0.5)
+
+            async def heavy_work():
+                upload = pipeline.orchestration_service.generate_networkx(
+                    csv_files=[str(csv_path)], config="{}", schema_json="{}", writer_type="networkx"
+                )
+                archive = client.get("/api/download-result?job_id=job-1")
+                return await asyncio.gather(upload, archive)
+
+            work = asyncio.create_task(heavy_work())
+            under_load = []
+            while not work.done():
+                under_load += await _health_latencies(client, 0.2)
+            upload_result, archive_response = await work
+
+    assert upload_result["status"] == "success", upload_result
+    assert archive_response.status_code == 200
+    assert len(under_load) >= 20
+    # Blocking the loop on compression or disk I/O would show up as
+    # hundreds of milliseconds here.
+    assert _p99(under_load) < max(10 * _p99(baseline), 0.1), (_p99(baseline), _p99(under_load))
@@ -0,0 +1,126 @@
+"""Tests for streaming CSV uploads to AtomSpace."""
+import hashlib
+import os
+import threading
+import httpx
+import pytest
+import pytest_asyncio
+from starlette.datastructures import UploadFile
+from ..services.http_client import http_clients
+from ..services.orchestration_service import OrchestrationService
+from ..config.settings import settings
+from .stand_ins import serve
+
+MiB = 1024 * 1024
+STATM = "/proc/self/statm"
+
+
+@pytest.fixture(scope="module")
+def atomspace_url():
+    with serve("integration_service.tests.stand_ins:atomspace_app") as url:
+        yield url
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+def _write_csv(path, size):
+    row = b"source,target,label,weight,0123456789abcdef\n"
+    digest = hashlib.sha256()
+    written = 0
+    with open(path, "wb") as f:
+        f.write(b"source,target,label,weight,pad\n")
+        digest.update(b"source,target,label,weight,pad\n")
+        written += 31
+        block = row * (MiB // len(row))
+        while written < size:
+            f.write(block)
+            digest.update(block)
+            written += len(block)
+    return written, digest.hexdigest()
+
+
+def _rss():
+    with open(STATM) as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def _upload_rss_growth(service, sources):
+    """Run an upload and return its result and how far the process RSS rose above where it started."""
+    baseline = peak = _rss()
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        # A thread, so samples keep coming while the event loop is busy
+        while not done.wait(0.002):
+            peak = max(peak, _rss())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        result = await service.generate_networkx(
+            csv_files=sources,
+            config="{}",
+            schema_json="{}",
+            writer_type="networkx"
+        )
+    finally:
+        done.set()
+        sampler.join()
+    return result, max(peak, _rss()) - baseline
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.path.exists(STATM), reason="RSS is read from /proc")
+async def test_upload_is_streamed_with_bounded_memory(tmp_path, atomspace_url):
+    """Process RSS stays flat as the CSV grows and the bytes arrive intact."""
+    service = OrchestrationService()
+    service.atomspace_url = atomspace_url
+
+    growth = {}
+    for size in (8 * MiB, 128 * MiB):
+        csv_path = tmp_path / f"edges_{size}.csv"
+        expected_size, expected_sha = _write_csv(csv_path, size)
+
+        with open(csv_path, "rb") as raw:
+            upload = UploadFile(file=raw, filename="edges.csv")
+            result, growth[size] = await _upload_rss_growth(service, [upload])
+
+        assert result["status"] == "success", result
+        received = httpx.get(f"{atomspace_url}/received/{result['job_id']}").json()
+        assert received == [{"filename": "edges.csv", "size": expected_size, "sha256": expected_sha}]
+
+    # Buffering the upload would grow RSS by at least its size; streaming only by a few chunks
+    assert growth[128 * MiB] < 8 * settings.upload_chunk_size + 16 * MiB, growth
+    assert growth[128 * MiB] < growth[8 * MiB] + 16 * MiB, growth
+
+
+@pytest.mark.asyncio
+async def test_upload_gzip_on_the_fly(tmp_path, atomspace_url, monkeypatch):
+    """With gzip enabled, file parts arrive compressed and decompress to the original."""
+    monkeypatch.setattr(settings, "atomspace_upload_gzip", True)
+    service = OrchestrationService()
+    service.atomspace_url = atomspace_url
+
+    nodes = tmp_path / "nodes.csv"
+    edges = tmp_path / "edges.csv"
+    nodes_size, nodes_sha = _write_csv(nodes, 2 * MiB)
+    edges_size, edges_sha = _write_csv(edges, 3 * MiB)
+
+    result = await service.generate_networkx(
+        csv_files=[str(nodes), str(edges)],
+        config="{}",
+        schema_json="{}",
+        writer_type="networkx"
+    )
+
+    assert result["status"] == "success", result
+    received = httpx.get(f"{atomspace_url}/received/{result['job_id']}").json()
+    assert received == [
+        {"filename": "nodes.csv.gz", "size": nodes_size, "sha256": nodes_sha},
+        {"filename": "edges.csv.gz", "size": edges_size, "sha256": edges_sha},
+    ]
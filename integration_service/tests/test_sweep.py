@@ -0,0 +1,156 @@
+"""Tests for parameter-sweep mining."""
+import asyncio
+import json
+import time
+import httpx
+import pytest
+import pytest_asyncio
+from ..api import pipeline
+from ..main import app
+from ..services.http_client import http_clients
+from ..services.job_scheduler import MiningScheduler
+from ..services.materializer import Materializer
+from ..services.sweep_service import SweepService, config_key, expand_configs
+from ..config.settings import settings
+from .stand_ins import serve
+
+MINER_APP = "integration_service.tests.stand_ins:miner_app"
+MINER_DELAY = 0.2
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_clients.close()
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    (shared / "job-1").mkdir(parents=True)
+    (shared / "job-1" / "networkx_graph.pkl").write_bytes(b"\x80\x04graph")
+    (shared / "job-1" / "networkx_metadata.json").write_text('{"graph_type": "undirected"}')
+    monkeypatch.setattr(settings, "shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "miner_shared_volume_path", str(shared))
+    monkeypatch.setattr(settings, "mining_cache_enabled", False)
+    monkeypatch.setattr(settings, "miner_health_interval", 0)
+    return shared
+
+
+def test_expand_and_dedupe_configs():
+    configs = expand_configs(
+        {"n_trials": 10},
+        grid={"min_pattern_size": [3, 4], "search_strategy": ["greedy", "mcts"]},
+        configs=[{"min_pattern_size": "3", "search_strategy": "greedy"}]
+    )
+    assert len(configs) == 5
+    assert configs[0] == {"n_trials": 10, "min_pattern_size": 3, "search_strategy": "greedy"}
+    # The explicit config only differs in spelling from the first grid point
+    assert len({config_key(c) for c in configs}) == 4
+    # Omitting a default is the same config as spelling it out
+    assert config_key({"n_trials": 100}) == config_key({})
+
+    with pytest.raises(ValueError, match="Unknown sweep parameters"):
+        expand_configs({}, grid={"min_pattern_sise": [3]})
+
+
+@pytest.mark.asyncio
+async def test_sweep_streams_results_in_fraction_of_serial_time(shared_dir, tmp_path, monkeypatch):
+    env = {
+        "STAND_IN_SHARED_DIR": str(shared_dir),
+        "STAND_IN_MINER_DELAY": str(MINER_DELAY),
+        "STAND_IN_MINER_SLOTS": "8",
+        "STAND_IN_MINER_EMIT_PATTERNS": "true",
+    }
+    monkeypatch.setattr(settings, "miner_max_in_flight", 8)
+    service = pipeline.orchestration_service
+    scheduler = MiningScheduler(service.mine_patterns, max_in_flight=8)
+    monkeypatch.setattr(service, "local_output_dir", str(tmp_path / "local"))
+    monkeypatch.setattr(service, "materializer", Materializer("copy"))
+    monkeypatch.setattr(pipeline, "sweep_service", SweepService(service, scheduler, max_concurrency=8))
+
+    body = {
+        "job_id": "job-1",
+        "base_config": {"max_pattern_size": 8},
+        "grid": {
+            "min_pattern_size": [3, 4, 5, 6, 7],
+            "n_trials": [10, 20],
+            "search_strategy": ["greedy", "mcts"],
+        },
+        "configs": [{"min_pattern_size": "3", "n_trials": "10", "search_strategy": "greedy"}],
+    }
+
+    with serve(MINER_APP, env=env) as url:
+        monkeypatch.setattr(service.miner_service, "miner_url", url)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            start = time.perf_counter()
+            response = await client.post("/api/mine-patterns/sweep", json=body)
+            elapsed = time.perf_counter() - start
+        mined = httpx.get(f"{url}/calls").json()
+    await scheduler.stop()
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    events = [json.loads(line) for line in response.text.splitlines()]
+    accepted, results, summary = events[0], events[1:-1], events[-1]
+
+    assert accepted["event"] == "accepted"
+    assert (accepted["total"], accepted["unique"], accepted["duplicates"]) == (21, 20, 1)
+    assert len(mined) == 20
+    assert all(r["event"] == "result" and r["status"] == "success" for r in results)
+    assert len({r["job_id"] for r in results}) == 20
+    assert all(r["job_id"].startswith("job-1__sweep_") for r in results)
+
+    first = next(r for r in results if 0 in r["indices"])
+    assert first["indices"] == [0, 20]
+    assert first["config"]["graph_type"] == "undirected"
+    assert first["pattern_count"] == 3
+
+    assert summary["event"] == "summary"
+    assert summary["succeeded"] == 20 and summary["failed"] == 0
+    assert [c["pattern_count"] for c in summary["configs"]][:4] == [3, 3, 3, 3]
+    assert all(c["download_url"].endswith(c["job_id"]) for c in summary["configs"])
+
+    serial = 20 * MINER_DELAY
+    assert elapsed < serial / 2, (elapsed, serial)
+
+
+@pytest.mark.asyncio
+async def test_sweep_rejects_bad_requests(shared_dir):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        unknown = await client.post("/api/mine-patterns/sweep", json={"job_id": "job-1", "grid": {"foo": [1]}})
+        missing = await client.post("/api/mine-patterns/sweep", json={"job_id": "nope", "configs": [{}]})
+        too_many = await client.post("/api/mine-patterns/sweep", json={
+            "job_id": "job-1", "grid": {"n_trials": list(range(settings.sweep_max_configs + 1))}
+        })
+
+    assert unknown.status_code == 400
+    assert missing.status_code == 404
+    assert too_many.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_leaving_a_sweep_early_cancels_remaining_configs(shared_dir, tmp_path):
+    started = []
+
+    async def slow_mine(job_id, mining_config):
+        started.append(job_id)
+        await asyncio.sleep(0.05 if mining_config["n_trials"] == 1 else 30)
+        return {"status": "success", "job_id": job_id}
+
+    class Outputs:
+        def _job_output_dir(self, job_id):
+            return str(tmp_path / "local" / job_id)
+
+    scheduler = MiningScheduler(slow_mine, max_in_flight=4)
+    sweep = SweepService(Outputs(), scheduler, max_concurrency=4)
+    events = sweep.run("job-1", expand_configs({}, grid={"n_trials": [1, 2, 3, 4]}))
+
+    assert (await events.__anext__())["event"] == "accepted"
+    assert (await events.__anext__())["config"] == {"n_trials": 1}
+    await events.aclose()
+
+    assert len(started) == 4
+    assert sorted(job.state for job in scheduler.jobs.values()) == ["cancelled"] * 3 + ["done"]
+    await scheduler.stop()